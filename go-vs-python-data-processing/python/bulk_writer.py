@@ -0,0 +1,218 @@
+import csv
+import io
+import itertools
+import json
+import queue
+import struct
+import threading
+
+# Formatos suportados pelo BulkWriter
+WRITE_FORMATS = ('csv', 'binary')
+
+# Formato binário colunar: cabeçalho + blocos [n_linhas][coluna 1]...[coluna N]
+BINARY_MAGIC = b'PYCOLS1\n'
+BINARY_DTYPES = {'int': 'int64', 'float': 'float64'}
+
+
+class BulkWriter:
+    """
+    Escrita em lote: formata colunas inteiras de uma vez em buffers grandes
+    em vez de chamar csv.writer linha a linha.
+
+    csv: cada bloco vira um único texto via template '%s,%s\\n' * n; se algum
+         campo tem vírgula, aspas ou quebra de linha, o bloco é refeito com o
+         módulo csv (campos entre aspas)
+    binary: colunas numéricas gravadas como arrays contíguos (int64/float64);
+            tipos de column_types ou, para as colunas ausentes, inferidos do
+            primeiro bloco escrito
+
+    Com background=True os buffers prontos vão para uma fila e uma thread
+    faz a escrita no arquivo, sobrepondo formatação e I/O (write libera a GIL).
+    """
+
+    def __init__(self, filepath, columns, fmt='csv', buffer_size=4 * 1024 * 1024,
+                 background=False, queue_depth=4, column_types=None, line_terminator='\n'):
+        if fmt not in WRITE_FORMATS:
+            raise ValueError(f"Formato desconhecido: {fmt}")
+        column_types = dict(column_types or {})
+        for name, column_type in column_types.items():
+            if column_type not in BINARY_DTYPES:
+                raise ValueError(f"Tipo desconhecido para a coluna '{name}': {column_type}")
+        self.filepath = filepath
+        self.columns = list(columns)
+        self.fmt = fmt
+        self.buffer_size = buffer_size
+        self.line_terminator = line_terminator
+        self.rows_written = 0
+        self.bytes_written = 0
+
+        self._buffer = bytearray()
+        self._template = ','.join(['%s'] * len(self.columns)) + line_terminator
+        # Separadores esperados por linha: a mais no texto = campo que precisa de aspas
+        self._separators = {char: line_terminator.count(char) for char in '\r\n'}
+        self._separators[','] = len(self.columns) - 1
+        self._column_types = column_types
+        self._dtypes = None
+
+        self._file = open(filepath, 'wb', buffering=0)
+        self._queue = None
+        self._thread = None
+        self._error = None
+        if background:
+            self._queue = queue.Queue(maxsize=queue_depth)
+            self._thread = threading.Thread(target=self._drain, name='bulk-writer', daemon=True)
+            self._thread.start()
+
+        if fmt == 'csv':
+            self._append(self._format_rows([[name] for name in self.columns], 1).encode('utf-8'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _drain(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            try:
+                self._file.write(chunk)
+            except Exception as e:
+                self._error = e
+
+    def _append(self, data):
+        self._buffer += data
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        self.bytes_written += len(chunk)
+        if self._queue is not None:
+            if self._error:
+                raise self._error
+            self._queue.put(chunk)
+        else:
+            self._file.write(chunk)
+
+    def _format_rows(self, columns, num_rows):
+        """
+        Texto CSV das linhas; usa o módulo csv só se algum campo precisa de
+        aspas. None e NaN viram campo vazio, como no to_csv do pandas.
+        """
+        values = tuple(itertools.chain.from_iterable(zip(*columns)))
+        text = (self._template * num_rows) % values
+        if 'None' in text or 'nan' in text:
+            # Candidato a nulo (ou texto que contém a palavra): confere valor a valor
+            columns = [['' if value is None or (isinstance(value, float) and value != value) else value
+                        for value in column] for column in columns]
+            values = tuple(itertools.chain.from_iterable(zip(*columns)))
+            text = (self._template * num_rows) % values
+        if '"' in text or any(text.count(char) != count * num_rows for char, count in self._separators.items()):
+            output = io.StringIO()
+            csv.writer(output, lineterminator=self.line_terminator).writerows(zip(*columns))
+            text = output.getvalue()
+        return text
+
+    def _binary_header(self, data):
+        """
+        Fixa os dtypes das colunas (column_types ou o dtype do primeiro bloco)
+        e grava o cabeçalho do formato binário
+        """
+        import numpy as np
+
+        dtypes = []
+        for position, name in enumerate(self.columns):
+            column_type = self._column_types.get(name)
+            if column_type is None:
+                kind = np.asarray(data[position]).dtype.kind if data is not None else 'i'
+                if kind not in 'iubf':
+                    raise ValueError(f"Coluna '{name}' não numérica não cabe no formato binário")
+                column_type = 'float' if kind == 'f' else 'int'
+            dtypes.append(BINARY_DTYPES[column_type])
+        self._dtypes = dtypes
+        header = json.dumps({'columns': self.columns, 'dtypes': self._dtypes}).encode('utf-8')
+        self._append(BINARY_MAGIC + struct.pack('<I', len(header)) + header)
+
+    def write_columns(self, data):
+        """
+        Escreve um bloco de linhas dado como colunas (listas ou arrays numpy),
+        na mesma ordem de self.columns.
+        """
+        if len(data) != len(self.columns):
+            raise ValueError(f"Esperadas {len(self.columns)} colunas, recebidas {len(data)}")
+        num_rows = len(data[0])
+        if num_rows == 0:
+            return
+
+        if self.fmt == 'csv':
+            # tolist() devolve escalares Python: formatação igual à de listas
+            columns = [c.tolist() if hasattr(c, 'tolist') else c for c in data]
+            self._append(self._format_rows(columns, num_rows).encode('utf-8'))
+        else:
+            import numpy as np
+
+            if self._dtypes is None:
+                self._binary_header(data)
+            block = [struct.pack('<Q', num_rows)]
+            for name, column, dtype in zip(self.columns, data, self._dtypes):
+                column = np.asarray(column)
+                if dtype == 'int64' and column.dtype.kind not in 'iub':
+                    # Conversão para int64 truncaria/descartaria os valores
+                    raise ValueError(f"Coluna '{name}' ({column.dtype}) gravada como int: "
+                                     f"use column_types={{'{name}': 'float'}}")
+                block.append(np.ascontiguousarray(column, dtype=dtype).tobytes())
+            self._append(b''.join(block))
+        self.rows_written += num_rows
+
+    def write_dataframe(self, df, block_rows=65536):
+        """Escreve um DataFrame em blocos de linhas (no binário, dtypes de df.dtypes)"""
+        if self.fmt == 'binary' and self._dtypes is None:
+            self._binary_header([df[name].iloc[:0].to_numpy() for name in self.columns])
+        for start in range(0, len(df), block_rows):
+            block = df.iloc[start:start + block_rows]
+            self.write_columns([block[name].to_numpy() for name in self.columns])
+
+    def close(self):
+        """Esvazia o buffer, espera a thread de escrita e fecha o arquivo"""
+        if self._file.closed:
+            return
+        if self.fmt == 'binary' and self._dtypes is None:
+            # Nada escrito: cabeçalho só com column_types (int nas demais)
+            self._binary_header(None)
+        self._flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+        self._file.close()
+        if self._error:
+            raise self._error
+
+
+def read_binary(filepath):
+    """Lê um arquivo do formato binário colunar e retorna {coluna: array numpy}"""
+    import numpy as np
+
+    with open(filepath, 'rb') as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{filepath} não está no formato binário colunar")
+        header_size, = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(header_size))
+        dtypes = [np.dtype(d) for d in header['dtypes']]
+
+        blocks = {name: [] for name in header['columns']}
+        while True:
+            size = f.read(8)
+            if not size:
+                break
+            num_rows, = struct.unpack('<Q', size)
+            for name, dtype in zip(header['columns'], dtypes):
+                blocks[name].append(np.frombuffer(f.read(num_rows * dtype.itemsize), dtype=dtype))
+
+    return {name: (np.concatenate(parts) if parts else np.array([], dtype=dtype))
+            for (name, parts), dtype in zip(blocks.items(), dtypes)}
@@ -0,0 +1,352 @@
+"""
+CLI única dos benchmarks Python.
+
+Uso (a partir do diretório python/):
+    python -m cli suite --benchmarks csv,calc --sizes small,medium --backends pandas,csv
+    python -m cli process --backends pandas,csv
+    python -m cli parallel --workers 8 --scenarios cpu
+    python -m cli parallel --scenarios dispatch --encodings pickle5,array
+    python -m cli parallel --scenarios mixed --cpu-ratios 0.2,0.5,0.8
+    python -m cli startup --repeats 10
+    python -m cli expr "(value ** 2 + 3 * value + 17) % 1000" --sizes large --workers 4
+    python -m cli serve --port 8765 --preload dataset_large.csv
+    python -m cli incremental ../data/dataset_100k.csv --watch
+    python -m cli rows ../data/dataset_100k.csv --id 73512
+    python -m cli parallel --scenarios distributed
+    DP_CLUSTER_AUTHKEY=... python -m cli worker --connect coordenador:8766
+
+Dependências pesadas (pandas, psutil) só são importadas pelos subcomandos
+que precisam delas.
+"""
+
+import argparse
+import os
+import sys
+
+from benchmark_suite import BENCHMARKS, CACHE_MODES, DATASET_SIZES
+from page_cache import PAGE_CACHE_MODES
+from process_dispatch import PAYLOAD_ENCODINGS
+from hybrid_executor import MIXED_STRATEGIES
+from cpu_topology import PLACEMENTS
+from expression_engine import DEFAULT_BLOCK_SIZE, ExpressionError, compile_expression
+from process_data import READ_METHODS
+from row_index import ROW_INDEX_STRIDE
+
+# Caminhos padrão relativos ao repositório, não ao diretório atual
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATA_DIR = os.path.join(PROJECT_DIR, 'data')
+DEFAULT_RESULTS_DIR = os.path.join(PROJECT_DIR, 'results')
+
+PARALLEL_SCENARIOS = ('cpu', 'io', 'dispatch', 'mixed', 'placement', 'distributed')
+
+
+def positive_int(value):
+    """Tipo argparse para inteiros >= 1 (ex.: número de workers)"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"inteiro inválido: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"deve ser >= 1, recebido {number}")
+    return number
+
+
+def comma_list(choices):
+    """Tipo argparse para listas separadas por vírgula validadas contra choices"""
+    def parse(value):
+        items = [item.strip() for item in value.split(',') if item.strip()]
+        invalid = [item for item in items if item not in choices]
+        if invalid:
+            raise argparse.ArgumentTypeError(
+                f"valores inválidos {invalid}; opções: {', '.join(choices)}")
+        return items
+    return parse
+
+
+def ratio_list(value):
+    """Tipo argparse para frações entre 0 e 1 separadas por vírgula"""
+    try:
+        ratios = [float(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"frações inválidas: {value}")
+    if not ratios or any(ratio < 0 or ratio > 1 for ratio in ratios):
+        raise argparse.ArgumentTypeError(f"frações devem estar entre 0 e 1: {value}")
+    return ratios
+
+
+def expression(value):
+    """Tipo argparse para expressões sobre colunas (validadas na compilação)"""
+    try:
+        compile_expression(value)
+    except ExpressionError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def run_suite(args):
+    """Subcomando suite: BenchmarkSuite com filtros"""
+    from benchmark_suite import BenchmarkSuite
+
+    suite = BenchmarkSuite(profile=args.profile, trace_memory=args.trace_memory,
+                           data_dir=args.data_dir, results_dir=args.results_dir,
+                           cache_budget_mb=args.cache_budget_mb, trace=args.trace)
+    return suite.run_full_benchmark(benchmarks=args.benchmarks, sizes=args.sizes,
+                                    backends=args.backends, max_workers=args.workers,
+                                    cache_modes=args.cache_modes,
+                                    page_cache_modes=args.page_cache_modes, placement=args.placement)
+
+
+def run_process(args):
+    """Subcomando process: leitura + cálculos do process_data"""
+    import process_data
+
+    return process_data.main(data_dir=args.data_dir, methods=args.backends,
+                             trace_memory=args.trace_memory, trace=args.trace,
+                             results_dir=args.results_dir)
+
+
+def run_parallel(args):
+    """Subcomando parallel: comparação CPU/I-O do parallel_threads"""
+    import parallel_threads
+
+    return parallel_threads.main(data_dir=args.data_dir, max_workers=args.workers,
+                                 scenarios=args.scenarios, trace_memory=args.trace_memory,
+                                 trace=args.trace, results_dir=args.results_dir,
+                                 encodings=args.encodings, cpu_ratios=args.cpu_ratios,
+                                 strategies=args.strategies, placement=args.placement,
+                                 listen=args.listen, remote_workers=args.remote_workers)
+
+
+def run_startup(args):
+    """Subcomando startup: apenas o benchmark de startup, sem datasets"""
+    from benchmark_suite import BenchmarkSuite
+
+    suite = BenchmarkSuite(data_dir=args.data_dir, results_dir=args.results_dir)
+    results = suite.benchmark_startup(repeats=args.repeats)
+    suite.generate_performance_report(results)
+    return results
+
+
+def run_expr(args):
+    """Subcomando expr: avaliador de expressões (loop, numpy, blocos, blocos em threads)"""
+    from benchmark_suite import BenchmarkSuite
+
+    suite = BenchmarkSuite(data_dir=args.data_dir, results_dir=args.results_dir)
+    datasets = suite.generate_test_datasets(args.sizes)
+    expressions = {'custom': args.expression} if args.expression else None
+    results = suite.benchmark_expressions(datasets, expressions=expressions, block_size=args.block_size,
+                                          workers=args.workers)
+    suite.generate_performance_report(results)
+    return results
+
+
+def run_serve(args):
+    """Subcomando serve: serviço de consultas com datasets residentes"""
+    import query_service
+
+    query_service.serve(data_dir=args.data_dir, host=args.host, port=args.port,
+                        cache_budget_mb=args.cache_budget_mb,
+                        result_cache_size=args.result_cache_size, preload=args.preload)
+
+
+def run_incremental(args):
+    """Subcomando incremental: estatísticas só dos bytes acrescentados"""
+    from incremental_stats import IncrementalStats
+    from process_data import DataProcessor
+
+    if args.reset:
+        IncrementalStats(args.file, args.column).reset()
+    return DataProcessor().incremental_calculations(args.file, args.column, watch=args.watch,
+                                                    interval=args.interval, row_index=args.row_index)
+
+
+def id_range(value):
+    """Tipo argparse para faixas 'início:fim' (inclusivas)"""
+    try:
+        low, high = (int(item) for item in value.split(':'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"faixa inválida: {value} (use início:fim)")
+    return low, high
+
+
+def run_rows(args):
+    """Subcomando rows: acesso aleatório via índice de offsets de linha"""
+    import time
+    from row_index import open_row_index, discard_row_index
+
+    if args.rebuild:
+        discard_row_index(args.file)
+    start_time = time.perf_counter()
+    index, built = open_row_index(args.file, stride=args.stride)
+    print(f"🗂️ Índice {'construído' if built else 'carregado'} em {time.perf_counter() - start_time:.4f}s: "
+          f"{index.rows:,} linhas, {len(index.offsets)} entradas")
+
+    start_time = time.perf_counter()
+    if args.id is not None:
+        result = index.find_id(args.id)
+    elif args.row is not None:
+        result = index.get_row(args.row)
+    elif args.range is not None:
+        result = index.read_id_range(*args.range)
+    else:
+        result = index.sample(args.sample, seed=args.seed)
+    print(result if result is not None else '(não encontrado)')
+    print(f"⏱️ {time.perf_counter() - start_time:.4f}s")
+    return result
+
+
+def run_worker(args):
+    """Subcomando worker: worker remoto do cenário distributed"""
+    from distributed_executor import authkey_from_env, parse_address, run_worker as start_worker
+
+    address = parse_address(args.connect)
+    print(f"👷 Worker conectando em {address[0]}:{address[1]}")
+    completed = start_worker(address, authkey_from_env(), heartbeat_interval=args.heartbeat_interval)
+    print(f"✅ Worker encerrado após {completed} tarefas")
+    return completed
+
+
+def build_parser():
+    """Monta o parser com os subcomandos"""
+    parser = argparse.ArgumentParser(prog='python -m cli',
+                                     description='Benchmarks de processamento de dados em Python')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    size_names = [d['name'] for d in DATASET_SIZES]
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help='diretório dos datasets (padrão: %(default)s)')
+    common.add_argument('--results-dir', default=DEFAULT_RESULTS_DIR,
+                        help='diretório dos resultados (padrão: %(default)s)')
+
+    suite = subparsers.add_parser('suite', parents=[common], help='benchmark suite completo')
+    suite.add_argument('--benchmarks', type=comma_list(BENCHMARKS), default=list(BENCHMARKS),
+                       help=f"benchmarks a executar ({','.join(BENCHMARKS)})")
+    suite.add_argument('--sizes', type=comma_list(size_names), default=None,
+                       help=f"tamanhos de dataset ({','.join(size_names)})")
+    suite.add_argument('--backends', type=comma_list(READ_METHODS), default=['pandas'],
+                       help=f"backends de leitura ({','.join(READ_METHODS)})")
+    suite.add_argument('--workers', type=positive_int, default=4, help='workers do benchmark paralelo')
+    suite.add_argument('--cache-modes', type=comma_list(CACHE_MODES), default=list(CACHE_MODES),
+                       help=f"modos do cache de datasets ({','.join(CACHE_MODES)})")
+    suite.add_argument('--page-cache-modes', type=comma_list(PAGE_CACHE_MODES),
+                       default=list(PAGE_CACHE_MODES),
+                       help=f"estado do page cache do SO na leitura ({','.join(PAGE_CACHE_MODES)})")
+    suite.add_argument('--placement', choices=PLACEMENTS, default='none',
+                       help='afinidade de CPU dos workers de processo (padrão: %(default)s)')
+    suite.add_argument('--cache-budget-mb', type=int, default=512,
+                       help='orçamento do cache de datasets em MB (LRU)')
+    suite.add_argument('--profile', action='store_true', help='gera .pstats e .collapsed por caso')
+    suite.add_argument('--trace-memory', action='store_true',
+                       help='atribuição de alocações por fase (tempos não comparáveis)')
+    suite.add_argument('--trace', action='store_true', help='timeline de spans (JSON + Chrome trace)')
+    suite.set_defaults(handler=run_suite)
+
+    process = subparsers.add_parser('process', parents=[common], help='leitura e cálculos básicos')
+    process.add_argument('--backends', type=comma_list(READ_METHODS), default=['pandas'],
+                         help=f"backends de leitura ({','.join(READ_METHODS)})")
+    process.add_argument('--trace-memory', action='store_true',
+                         help='atribuição de alocações (tempos não comparáveis)')
+    process.add_argument('--trace', action='store_true', help='timeline de spans (JSON + Chrome trace)')
+    process.set_defaults(handler=run_process)
+
+    parallel = subparsers.add_parser('parallel', parents=[common], help='threads vs processos')
+    parallel.add_argument('--workers', type=positive_int, default=None,
+                          help='workers de threads e processos (padrão: 4 threads, 2 processos)')
+    parallel.add_argument('--scenarios', type=comma_list(PARALLEL_SCENARIOS), default=['cpu', 'io'],
+                          help=f"cenários ({','.join(PARALLEL_SCENARIOS)}; padrão: cpu,io)")
+    parallel.add_argument('--encodings', type=comma_list(PAYLOAD_ENCODINGS),
+                          default=list(PAYLOAD_ENCODINGS),
+                          help=f"codificações do payload no cenário dispatch ({','.join(PAYLOAD_ENCODINGS)})")
+    parallel.add_argument('--cpu-ratios', type=ratio_list, default=[0.2, 0.5, 0.8],
+                          help='frações de CPU por job no cenário mixed (padrão: 0.2,0.5,0.8)')
+    parallel.add_argument('--strategies', type=comma_list(MIXED_STRATEGIES), default=list(MIXED_STRATEGIES),
+                          help=f"estratégias do cenário mixed ({','.join(MIXED_STRATEGIES)})")
+    parallel.add_argument('--placement', choices=PLACEMENTS, default='none',
+                          help='afinidade de CPU dos workers de processo (padrão: %(default)s)')
+    parallel.add_argument('--listen', default=None,
+                          help='host:porta para workers remotos no cenário distributed '
+                               '(chave em DP_CLUSTER_AUTHKEY; padrão: cluster local)')
+    parallel.add_argument('--remote-workers', type=positive_int, default=None,
+                          help='workers remotos aguardados com --listen')
+    parallel.add_argument('--trace-memory', action='store_true',
+                          help='atribuição de alocações (tempos não comparáveis)')
+    parallel.add_argument('--trace', action='store_true', help='timeline de spans (JSON + Chrome trace)')
+    parallel.set_defaults(handler=run_parallel)
+
+    startup = subparsers.add_parser('startup', parents=[common], help='tempo de startup e imports')
+    startup.add_argument('--repeats', type=int, default=5, help='repetições por alvo')
+    startup.set_defaults(handler=run_startup)
+
+    expr = subparsers.add_parser('expr', parents=[common], help='avaliação vetorizada de expressões')
+    expr.add_argument('expression', nargs='?', type=expression, default=None,
+                      help='expressão sobre as colunas id/value (padrão: expression_engine.EXPRESSIONS)')
+    expr.add_argument('--sizes', type=comma_list(size_names), default=['medium', 'large'],
+                      help=f"tamanhos de dataset ({','.join(size_names)}; padrão: medium,large)")
+    expr.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                      help='elementos por bloco (padrão: %(default)s)')
+    expr.add_argument('--workers', type=positive_int, default=4, help='threads da avaliação em blocos paralela')
+    expr.set_defaults(handler=run_expr)
+
+    serve = subparsers.add_parser('serve', parents=[common],
+                                  help='serviço de consultas em loopback (HTTP)')
+    serve.add_argument('--host', default='127.0.0.1', help='endereço (padrão: %(default)s)')
+    serve.add_argument('--port', type=int, default=8765, help='porta (padrão: %(default)s)')
+    serve.add_argument('--cache-budget-mb', type=int, default=512,
+                       help='orçamento do cache de datasets em MB (LRU)')
+    serve.add_argument('--result-cache-size', type=int, default=1024,
+                       help='entradas do cache de resultados (0 desliga)')
+    serve.add_argument('--preload', type=lambda value: [v for v in value.split(',') if v],
+                       default=[], help='datasets carregados na inicialização (a,b,...)')
+    serve.set_defaults(handler=run_serve)
+
+    incremental = subparsers.add_parser('incremental',
+                                        help='estatísticas incrementais de CSV append-only')
+    incremental.add_argument('file', help='CSV que só recebe linhas no final')
+    incremental.add_argument('--column', default='value', help='coluna numérica (padrão: %(default)s)')
+    incremental.add_argument('--watch', action='store_true', help='acompanha o arquivo até Ctrl+C')
+    incremental.add_argument('--interval', type=float, default=1.0,
+                             help='intervalo de verificação do --watch em segundos')
+    incremental.add_argument('--reset', action='store_true', help='descarta o estado salvo antes')
+    row_index = incremental.add_mutually_exclusive_group()
+    row_index.add_argument('--row-index', dest='row_index', action='store_const', const=True, default=None,
+                           help='estende o índice de linhas (<csv>.rowindex.json) também nos updates '
+                                'incrementais (padrão: só no recálculo completo)')
+    row_index.add_argument('--no-row-index', dest='row_index', action='store_const', const=False,
+                           help='não gera o índice de linhas')
+    incremental.set_defaults(handler=run_incremental)
+
+    rows = subparsers.add_parser('rows', help='acesso aleatório ao CSV via índice de linhas')
+    rows.add_argument('file', help='CSV (o índice fica em <arquivo>.rowindex.json)')
+    query = rows.add_mutually_exclusive_group(required=True)
+    query.add_argument('--id', type=int, help='linha com esse id (coluna id ordenada)')
+    query.add_argument('--row', type=int, help='linha pela posição (0 = primeira linha de dados)')
+    query.add_argument('--range', type=id_range, help='linhas com id entre início:fim')
+    query.add_argument('--sample', type=int, help='amostra uniforme de N linhas')
+    rows.add_argument('--seed', type=int, default=None, help='semente da amostra')
+    rows.add_argument('--stride', type=int, default=ROW_INDEX_STRIDE,
+                      help='linhas por entrada do índice (padrão: %(default)s)')
+    rows.add_argument('--rebuild', action='store_true', help='descarta o índice salvo antes')
+    rows.set_defaults(handler=run_rows)
+
+    worker = subparsers.add_parser('worker', help='worker remoto (chave em DP_CLUSTER_AUTHKEY)')
+    worker.add_argument('--connect', required=True, help='host:porta do coordenador')
+    worker.add_argument('--heartbeat-interval', type=float, default=0.5,
+                        help='intervalo entre heartbeats em segundos')
+    worker.set_defaults(handler=run_worker)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Função principal
+    """
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+import multiprocessing
+import os
+
+# Estratégias de posicionamento dos workers nos CPUs
+# none: sem afinidade (o escalonador do SO decide)
+# compact: preenche um núcleo (com seus hyperthreads) antes do próximo, nó a nó
+# spread: um CPU por núcleo físico alternando sockets/nós; hyperthreads por último
+# physical: só o primeiro hyperthread de cada núcleo físico
+PLACEMENTS = ('none', 'compact', 'spread', 'physical')
+
+SYS_CPU_DIR = '/sys/devices/system/cpu'
+
+
+def parse_cpu_list(text):
+    """'0-3,8,10-11' -> [0, 1, 2, 3, 8, 10, 11] (formato das listas do /sys)"""
+    cpus = []
+    for part in text.strip().split(','):
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-')
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def _read(path, default):
+    try:
+        with open(path, 'r', encoding='ascii') as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+def affinity_supported():
+    """os.sched_setaffinity só existe no Linux"""
+    return hasattr(os, 'sched_setaffinity')
+
+
+def read_topology(sys_dir=SYS_CPU_DIR):
+    """
+    CPUs online que este processo pode usar, com socket (package), nó NUMA,
+    núcleo físico e irmãos de hyperthread, lidos do /sys. Sem /sys (ou fora
+    do Linux) cada CPU vira um núcleo próprio no socket 0.
+    """
+    allowed = os.sched_getaffinity(0) if hasattr(os, 'sched_getaffinity') else None
+    online = parse_cpu_list(_read(os.path.join(sys_dir, 'online'), f"0-{(os.cpu_count() or 1) - 1}"))
+
+    topology = []
+    for cpu in online:
+        if allowed is not None and cpu not in allowed:
+            continue
+        cpu_dir = os.path.join(sys_dir, f"cpu{cpu}")
+        base = os.path.join(cpu_dir, 'topology')
+        try:
+            nodes = [int(entry[4:]) for entry in os.listdir(cpu_dir)
+                     if entry.startswith('node') and entry[4:].isdigit()]
+        except OSError:
+            nodes = []
+        topology.append({
+            'cpu': cpu,
+            'package': int(_read(os.path.join(base, 'physical_package_id'), '0')),
+            'node': min(nodes) if nodes else 0,
+            'core': int(_read(os.path.join(base, 'core_id'), str(cpu))),
+            'siblings': parse_cpu_list(_read(os.path.join(base, 'thread_siblings_list'), str(cpu)))
+        })
+    return topology
+
+
+def placement_cpus(topology, workers, placement='compact'):
+    """
+    CPU de cada worker (lista com workers itens) segundo a estratégia.
+    Com mais workers que CPUs elegíveis a lista recomeça do início.
+    placement='none' retorna None.
+    """
+    if placement not in PLACEMENTS:
+        raise ValueError(f"Posicionamento inválido: {placement} (opções: {', '.join(PLACEMENTS)})")
+    if placement == 'none' or not topology:
+        return None
+
+    def compact_key(entry):
+        return entry['node'], entry['package'], entry['core'], entry['cpu']
+
+    if placement == 'compact':
+        order = sorted(topology, key=compact_key)
+    elif placement == 'physical':
+        order = sorted((entry for entry in topology if entry['cpu'] == min(entry['siblings'])),
+                       key=compact_key)
+    else:
+        # Posição do núcleo dentro do seu socket, para alternar entre sockets
+        cores = sorted({(entry['node'], entry['package'], entry['core']) for entry in topology})
+        core_rank = {}
+        for node, package, core in cores:
+            same_socket = [c for c in cores if c[:2] == (node, package)]
+            core_rank[(node, package, core)] = same_socket.index((node, package, core))
+        order = sorted(topology, key=lambda entry: (sorted(entry['siblings']).index(entry['cpu'])
+                                                    if entry['cpu'] in entry['siblings'] else 0,
+                                                    core_rank[(entry['node'], entry['package'],
+                                                               entry['core'])],
+                                                    entry['node'], entry['package']))
+    return [order[i % len(order)]['cpu'] for i in range(workers)]
+
+
+def _pin_worker(cpu_queue):
+    """Initializer do pool: cada processo novo retira um CPU da fila e se fixa nele"""
+    os.sched_setaffinity(0, {cpu_queue.get()})
+
+
+def pinned_pool_kwargs(workers, placement='none', topology=None):
+    """
+    Argumentos extras do ProcessPoolExecutor para fixar cada worker em um
+    CPU, e a lista de CPUs usada. ({}, None) se placement='none' ou se o
+    SO não suporta afinidade.
+    """
+    if placement == 'none' or not affinity_supported():
+        return {}, None
+    cpus = placement_cpus(topology if topology is not None else read_topology(), workers, placement)
+    if cpus is None:
+        return {}, None
+    cpu_queue = multiprocessing.Queue()
+    for cpu in cpus:
+        cpu_queue.put(cpu)
+    return {'initializer': _pin_worker, 'initargs': (cpu_queue,)}, cpus
+
+
+def describe_topology(topology):
+    """Resumo: CPUs, núcleos físicos, sockets e nós NUMA"""
+    return {
+        'cpus': len(topology),
+        'physical_cores': len({(entry['package'], entry['core']) for entry in topology}),
+        'packages': len({entry['package'] for entry in topology}),
+        'nodes': len({entry['node'] for entry in topology})
+    }
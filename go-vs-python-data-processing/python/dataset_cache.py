@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+
+
+def estimate_size(obj):
+    """
+    Estima o tamanho em bytes de um objeto carregado (DataFrame ou lista).
+    Para listas usa o primeiro elemento como amostra em vez de percorrer tudo.
+    """
+    if hasattr(obj, 'memory_usage'):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (list, tuple)):
+        item_size = sys.getsizeof(obj[0]) if obj else 0
+        return sys.getsizeof(obj) + item_size * len(obj)
+    return sys.getsizeof(obj)
+
+
+class DatasetCache:
+    """
+    Cache em processo de datasets carregados, compartilhado entre as fases
+    do BenchmarkSuite.
+
+    As entradas são indexadas por (arquivo, tipo) e validadas pelo tamanho e
+    mtime do arquivo: se o CSV for regerado a entrada é recarregada. A
+    remoção segue LRU até o total estimado caber em max_bytes.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _file_version(filepath):
+        stat = os.stat(filepath)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def get(self, filepath, kind, loader):
+        """
+        Retorna o objeto do cache ou o carrega com loader() em caso de miss
+        """
+        key = (os.path.abspath(filepath), kind)
+        version = self._file_version(filepath)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry['version'] == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['value']
+
+        self.misses += 1
+        value = loader()
+        self.put(filepath, kind, value, version)
+        return value
+
+    def put(self, filepath, kind, value, version=None):
+        """Insere um objeto já carregado (ex.: pelo benchmark de leitura)"""
+        key = (os.path.abspath(filepath), kind)
+        if version is None:
+            version = self._file_version(filepath)
+
+        self._discard(key)
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            # Maior que o orçamento inteiro: não vale a pena esvaziar o cache
+            return value
+
+        self._entries[key] = {'value': value, 'version': version, 'size': size}
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted['size']
+            self.evictions += 1
+        return value
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry['size']
+
+    def invalidate(self, filepath=None):
+        """Remove as entradas de um arquivo (todos os tipos), ou tudo se filepath=None"""
+        if filepath is None:
+            self._entries.clear()
+            self.current_bytes = 0
+            return
+        path = os.path.abspath(filepath)
+        for key in [k for k in self._entries if k[0] == path]:
+            self._discard(key)
+
+    def get_dataframe(self, filepath, method='pandas'):
+        """DataFrame do CSV, lido uma única vez por versão do arquivo"""
+        from process_data import load_csv
+
+        return self.get(filepath, f'dataframe:{method}', lambda: load_csv(filepath, method))
+
+    def get_values(self, filepath, column='value'):
+        """Coluna como lista Python (derivada do DataFrame em cache)"""
+        return self.get(filepath, f'values:{column}',
+                        lambda: self.get_dataframe(filepath)[column].tolist())
+
+    def timed(self, loader, cache_mode, filepath):
+        """
+        Executa loader no modo pedido e retorna (objeto, tempo de carga).
+        cold: invalida o arquivo antes, forçando a leitura do disco
+        warm: usa o que já estiver em cache
+        """
+        if cache_mode == 'cold':
+            self.invalidate(filepath)
+        elif cache_mode != 'warm':
+            raise ValueError(f"Modo de cache desconhecido: {cache_mode}")
+
+        start_time = time.perf_counter()
+        value = loader(filepath)
+        return value, time.perf_counter() - start_time
+
+    def stats(self):
+        """Estatísticas do cache para o relatório"""
+        return {
+            'entries': len(self._entries),
+            'current_mb': self.current_bytes / (1024 * 1024),
+            'max_mb': self.max_bytes / (1024 * 1024),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,194 @@
+import csv
+import random
+import string
+from datetime import datetime, timedelta
+
+# Tipos de coluna suportados pelo gerador
+COLUMN_TYPES = ('int', 'float', 'string', 'category', 'timestamp')
+
+# Dataset "largo" parecido com os feeds reais: tipos mistos, nulos e muitas colunas
+DEFAULT_WIDE_SCHEMA = [
+    {'name': 'id', 'type': 'int', 'sequential': True},
+    {'name': 'value', 'type': 'int', 'min': 50, 'max': 5000},
+    {'name': 'quantity', 'type': 'int', 'min': 0, 'max': 1000, 'null_rate': 0.02},
+    {'name': 'price', 'type': 'float', 'min': 0.5, 'max': 9999.0, 'decimals': 2},
+    {'name': 'score', 'type': 'float', 'min': -1.0, 'max': 1.0, 'decimals': 6, 'null_rate': 0.05},
+    {'name': 'customer', 'type': 'string', 'min_length': 5, 'max_length': 20},
+    {'name': 'comment', 'type': 'string', 'min_length': 0, 'max_length': 60, 'null_rate': 0.3},
+    {'name': 'city', 'type': 'category', 'levels': 50},
+    {'name': 'status', 'type': 'category',
+     'levels': ['pending', 'processing', 'shipped', 'delivered', 'cancelled']},
+    {'name': 'channel', 'type': 'category', 'levels': 8, 'null_rate': 0.1},
+    {'name': 'created_at', 'type': 'timestamp'},
+    {'name': 'updated_at', 'type': 'timestamp', 'null_rate': 0.15},
+]
+
+
+def build_wide_schema(extra_numeric=12, extra_categories=4, base=DEFAULT_WIDE_SCHEMA):
+    """
+    Schema padrão acrescido de colunas numéricas e categóricas extras
+    para simular tabelas com dezenas de colunas.
+    """
+    schema = [dict(column) for column in base]
+    for i in range(extra_numeric):
+        if i % 2 == 0:
+            schema.append({'name': f'metric_{i:02d}', 'type': 'float', 'min': 0.0, 'max': 1e6,
+                           'decimals': 3, 'null_rate': 0.01})
+        else:
+            schema.append({'name': f'counter_{i:02d}', 'type': 'int', 'min': 0, 'max': 10**9})
+    for i in range(extra_categories):
+        schema.append({'name': f'tag_{i:02d}', 'type': 'category', 'levels': 10 * (i + 1)})
+    return schema
+
+
+def columns_of_type(schema, column_type):
+    """Nomes das colunas do schema com o tipo pedido"""
+    return [column['name'] for column in schema if column['type'] == column_type]
+
+
+def _category_levels(column):
+    levels = column.get('levels', 10)
+    if isinstance(levels, int):
+        return [f"{column['name']}_{i:03d}" for i in range(levels)]
+    return list(levels)
+
+
+def generate_column(column, num_rows, rng, first_id=1):
+    """
+    Gera os valores (já formatados como texto) de uma coluna do schema.
+    first_id é o início das colunas sequenciais quando a geração é em blocos.
+    """
+    column_type = column['type']
+
+    if column_type == 'int':
+        if column.get('sequential'):
+            values = [str(i) for i in range(first_id, first_id + num_rows)]
+        else:
+            low, high = column.get('min', 0), column.get('max', 1000)
+            values = [str(rng.randint(low, high)) for _ in range(num_rows)]
+    elif column_type == 'float':
+        low, high = column.get('min', 0.0), column.get('max', 1.0)
+        fmt = f"{{:.{column.get('decimals', 4)}f}}"
+        values = [fmt.format(rng.uniform(low, high)) for _ in range(num_rows)]
+    elif column_type == 'string':
+        alphabet = string.ascii_letters + string.digits + ' '
+        low, high = column.get('min_length', 1), column.get('max_length', 16)
+        values = [''.join(rng.choices(alphabet, k=rng.randint(low, high))).strip() or 'x'
+                  for _ in range(num_rows)]
+    elif column_type == 'category':
+        values = rng.choices(_category_levels(column), k=num_rows)
+    elif column_type == 'timestamp':
+        start = column.get('start', datetime(2024, 1, 1))
+        span = int(column.get('span_days', 365) * 86400)
+        values = [(start + timedelta(seconds=rng.randrange(span))).isoformat(timespec='seconds')
+                  for _ in range(num_rows)]
+    else:
+        raise ValueError(f"Tipo de coluna desconhecido: {column_type}")
+
+    # Nulos viram campos vazios, como nos exports reais
+    null_rate = column.get('null_rate', 0)
+    if null_rate:
+        for i in range(num_rows):
+            if rng.random() < null_rate:
+                values[i] = ''
+    return values
+
+
+def write_schema_dataset(filepath, schema, num_rows, seed=42, block_rows=50000):
+    """
+    Escreve um CSV seguindo o schema. Gera em blocos de linhas, coluna a
+    coluna, para não manter o dataset inteiro em memória.
+    """
+    rng = random.Random(seed)
+    with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow([column['name'] for column in schema])
+
+        for block_start in range(0, num_rows, block_rows):
+            block_size = min(block_rows, num_rows - block_start)
+            columns = [generate_column(column, block_size, rng, first_id=block_start + 1)
+                       for column in schema]
+            writer.writerows(zip(*columns))
+    return filepath
+
+
+def read_columns(filepath, schema, column_type, fast=True):
+    """
+    Lê apenas as colunas de um tipo.
+
+    fast=False: inferência genérica do pandas (strings e timestamps ficam
+    como object e o timestamp é convertido sem formato conhecido).
+    fast=True: caminhos específicos por tipo - dtype explícito para números,
+    'category' (decodificação por dicionário durante o parse) e timestamps
+    ISO 8601 convertidos com formato fixo.
+    """
+    import pandas as pd
+
+    columns = columns_of_type(schema, column_type)
+    if not columns:
+        return None
+
+    if not fast:
+        df = pd.read_csv(filepath, usecols=columns)
+        if column_type == 'timestamp':
+            for name in columns:
+                df[name] = pd.to_datetime(df[name])
+        return df
+
+    if column_type == 'int':
+        # Inteiros com nulos precisam do tipo nullable
+        nullable = {c['name'] for c in schema if c.get('null_rate')}
+        dtypes = {name: ('Int64' if name in nullable else 'int64') for name in columns}
+        return pd.read_csv(filepath, usecols=columns, dtype=dtypes)
+    if column_type == 'float':
+        return pd.read_csv(filepath, usecols=columns, dtype={name: 'float64' for name in columns})
+    if column_type == 'string':
+        return pd.read_csv(filepath, usecols=columns, dtype={name: 'string' for name in columns})
+    if column_type == 'category':
+        return pd.read_csv(filepath, usecols=columns, dtype={name: 'category' for name in columns})
+    if column_type == 'timestamp':
+        df = pd.read_csv(filepath, usecols=columns, dtype={name: 'string' for name in columns})
+        for name in columns:
+            df[name] = pd.to_datetime(df[name], format='%Y-%m-%dT%H:%M:%S')
+        return df
+    raise ValueError(f"Tipo de coluna desconhecido: {column_type}")
+
+
+def calculate_by_type(df, column_type):
+    """Cálculos típicos de cada tipo de coluna"""
+    results = {}
+    for name in df.columns:
+        series = df[name]
+        if column_type in ('int', 'float'):
+            results[name] = {
+                'sum': series.sum(),
+                'mean': series.mean(),
+                'std': series.std(),
+                'min': series.min(),
+                'max': series.max(),
+                'nulls': int(series.isna().sum())
+            }
+        elif column_type == 'string':
+            lengths = series.str.len()
+            results[name] = {
+                'mean_length': lengths.mean(),
+                'max_length': lengths.max(),
+                'unique': series.nunique(),
+                'nulls': int(series.isna().sum())
+            }
+        elif column_type == 'category':
+            counts = series.value_counts()
+            results[name] = {
+                'levels': int(counts.size),
+                'top': str(counts.index[0]) if counts.size else None,
+                'top_count': int(counts.iloc[0]) if counts.size else 0,
+                'nulls': int(series.isna().sum())
+            }
+        elif column_type == 'timestamp':
+            results[name] = {
+                'min': str(series.min()),
+                'max': str(series.max()),
+                'busiest_hour': int(series.dt.hour.value_counts().idxmax()),
+                'nulls': int(series.isna().sum())
+            }
+    return results
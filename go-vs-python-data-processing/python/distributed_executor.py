@@ -0,0 +1,432 @@
+import itertools
+import os
+import pickle
+import socket
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+# Componentes do custo de uma tarefa enviada a um worker remoto
+DISTRIBUTED_COMPONENTS = ('serialize', 'network', 'deserialize', 'compute', 'serialize_result',
+                          'deserialize_result')
+
+# Variável de ambiente com a chave compartilhada entre coordenador e workers
+AUTHKEY_ENV = 'DP_CLUSTER_AUTHKEY'
+
+_clock = time.monotonic_ns
+
+
+def authkey_from_env():
+    """Chave do cluster (bytes) lida de DP_CLUSTER_AUTHKEY"""
+    value = os.environ.get(AUTHKEY_ENV)
+    if not value:
+        raise ValueError(f"Defina {AUTHKEY_ENV} com a chave compartilhada do cluster")
+    return value.encode()
+
+
+def parse_address(text):
+    """'host:porta' -> (host, porta)"""
+    host, _, port = text.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def run_worker(address, authkey, heartbeat_interval=0.5, fail_after=None, fail_mode='crash'):
+    """
+    Worker remoto: conecta ao coordenador, envia heartbeats em uma thread
+    e executa as tarefas recebidas uma a uma, medindo desserialização,
+    compute e serialização do resultado.
+
+    fail_after/fail_mode simulam falhas para testes: depois de fail_after
+    tarefas o worker morre sem responder ('crash') ou para de responder e
+    de enviar heartbeats ('hang').
+    """
+    connection = Client(address, authkey=authkey)
+    send_lock = threading.Lock()
+    stop = threading.Event()
+
+    def send(message):
+        data = pickle.dumps(message)
+        with send_lock:
+            connection.send_bytes(data)
+
+    def heartbeat():
+        while not stop.wait(heartbeat_interval):
+            try:
+                send(('heartbeat',))
+            except OSError:
+                return
+
+    send(('hello', {'pid': os.getpid(), 'host': socket.gethostname()}))
+    threading.Thread(target=heartbeat, name='heartbeat', daemon=True).start()
+
+    completed = 0
+    try:
+        while True:
+            try:
+                message = pickle.loads(connection.recv_bytes())
+            except (EOFError, OSError):
+                break
+            if message[0] == 'shutdown':
+                break
+            received_ns = _clock()
+            _, task_id, payload = message
+
+            start_ns = _clock()
+            function, args = pickle.loads(payload)
+            decoded_ns = _clock()
+            try:
+                result, status = function(*args), 'result'
+            except Exception:
+                result, status = traceback.format_exc(), 'error'
+            computed_ns = _clock()
+            encoded = pickle.dumps(result)
+            end_ns = _clock()
+
+            completed += 1
+            if fail_after is not None and completed > fail_after:
+                if fail_mode == 'hang':
+                    stop.set()
+                    while True:
+                        time.sleep(3600)
+                os._exit(1)
+
+            try:
+                send((status, task_id, encoded, {
+                    'deserialize_ns': decoded_ns - start_ns,
+                    'compute_ns': computed_ns - decoded_ns,
+                    'serialize_result_ns': end_ns - computed_ns,
+                    'worker_ns': end_ns - received_ns
+                }))
+            except OSError:
+                # Coordenador encerrado com a tarefa em andamento
+                break
+    finally:
+        stop.set()
+        connection.close()
+    return completed
+
+
+class _WorkerHandle:
+    """Estado de um worker conectado, visto pelo coordenador"""
+
+    def __init__(self, worker_id, connection, info):
+        self.worker_id = worker_id
+        self.connection = connection
+        self.info = info
+        self.send_lock = threading.Lock()
+        self.in_flight = {}
+        self.last_seen = time.monotonic()
+        self.alive = True
+        self.completed = 0
+
+    @property
+    def name(self):
+        return f"{self.info.get('host', '?')}:{self.info.get('pid', '?')}"
+
+
+class DistributedExecutor:
+    """
+    Coordenador de workers remotos sobre TCP (multiprocessing.connection,
+    com autenticação HMAC por authkey).
+
+    Cada tarefa é serializada com pickle e enviada a um worker com vaga
+    (tasks_per_worker em voo por worker). Workers que fecham a conexão ou
+    ficam heartbeat_timeout segundos sem enviar nada são descartados e as
+    tarefas deles voltam para a fila (até max_attempts tentativas). Se
+    todos os workers que já conectaram caírem e nenhum novo chegar em
+    no_worker_timeout segundos (padrão: heartbeat_timeout), as tarefas
+    pendentes falham com RuntimeError em vez de esperar para sempre.
+    Como pickle executa código ao desserializar, só conecte workers e
+    coordenadores confiáveis e use uma authkey forte.
+    """
+
+    def __init__(self, address=('127.0.0.1', 0), authkey=None, tasks_per_worker=1,
+                 heartbeat_timeout=3.0, max_attempts=3, no_worker_timeout=None):
+        if not authkey:
+            raise ValueError("authkey é obrigatória para aceitar workers")
+        self.listener = Listener(address, authkey=authkey)
+        self.address = self.listener.address
+        self.tasks_per_worker = tasks_per_worker
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        self.no_worker_timeout = heartbeat_timeout if no_worker_timeout is None else no_worker_timeout
+
+        self._lock = threading.Condition()
+        self._pending = deque()
+        self._workers = {}
+        self._worker_ids = itertools.count()
+        self._task_ids = itertools.count()
+        self._closed = False
+        self._orphaned_since = None
+        self.records = []
+        self.stats = {'redispatched': 0, 'failed_workers': 0, 'failures': []}
+
+        threading.Thread(target=self._accept_loop, name='accept', daemon=True).start()
+        threading.Thread(target=self._monitor_loop, name='heartbeat-monitor', daemon=True).start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
+
+    @property
+    def alive_workers(self):
+        with self._lock:
+            return [handle for handle in self._workers.values() if handle.alive]
+
+    def wait_for_workers(self, count, timeout=30.0):
+        """Bloqueia até count workers conectados (TimeoutError se não chegarem)"""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while sum(handle.alive for handle in self._workers.values()) < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Só {len(self.alive_workers)} de {count} workers conectaram")
+                self._lock.wait(remaining)
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                connection = self.listener.accept()
+                _, info = pickle.loads(connection.recv_bytes())
+            except OSError:
+                # Listener fechado no shutdown, ou falha de autenticação de um cliente
+                if self._closed:
+                    return
+                continue
+            except (AuthenticationError, EOFError, pickle.UnpicklingError, ValueError):
+                # Cliente com authkey errada ou que não seguiu o protocolo
+                continue
+            with self._lock:
+                handle = _WorkerHandle(next(self._worker_ids), connection, info)
+                self._workers[handle.worker_id] = handle
+                self._dispatch_locked()
+                self._lock.notify_all()
+            threading.Thread(target=self._reader_loop, args=(handle,), name=f"worker-{handle.worker_id}",
+                             daemon=True).start()
+
+    def _reader_loop(self, handle):
+        while True:
+            try:
+                message = pickle.loads(handle.connection.recv_bytes())
+            except (EOFError, OSError, TypeError):
+                # TypeError: conexão fechada por shutdown() durante o recv
+                self._worker_failed(handle, 'conexão encerrada')
+                return
+            received_ns = _clock()
+            handle.last_seen = time.monotonic()
+            if message[0] == 'heartbeat':
+                continue
+
+            status, task_id, encoded, timings = message
+            with self._lock:
+                task = handle.in_flight.pop(task_id, None)
+                if task is not None:
+                    handle.completed += 1
+                    self._dispatch_locked()
+            # Resposta atrasada de uma tarefa já reenviada a outro worker
+            if task is None or task['future'].done():
+                continue
+
+            decode_start = _clock()
+            value = pickle.loads(encoded)
+            deserialize_result_ns = _clock() - decode_start
+            roundtrip_ns = received_ns - task['sent_ns']
+            self.records.append({
+                'task_id': task_id,
+                'worker': handle.name,
+                'attempts': task['attempts'],
+                'serialize_ns': task['serialize_ns'],
+                'network_ns': max(roundtrip_ns - timings['worker_ns'], 0),
+                'deserialize_ns': timings['deserialize_ns'],
+                'compute_ns': timings['compute_ns'],
+                'serialize_result_ns': timings['serialize_result_ns'],
+                'deserialize_result_ns': deserialize_result_ns,
+                'bytes_sent': task['bytes_sent'],
+                'bytes_received': len(encoded)
+            })
+            if status == 'error':
+                task['future'].set_exception(RuntimeError(f"Tarefa falhou em {handle.name}:\n{value}"))
+            else:
+                task['future'].set_result(value)
+
+    def _monitor_loop(self):
+        while not self._closed:
+            time.sleep(self.heartbeat_timeout / 4)
+            now = time.monotonic()
+            for handle in self.alive_workers:
+                if now - handle.last_seen > self.heartbeat_timeout:
+                    self._worker_failed(handle, f"sem heartbeat há {now - handle.last_seen:.1f}s")
+            self._check_orphaned(now)
+
+    def _check_orphaned(self, now):
+        """Falha as tarefas pendentes se não há worker vivo há no_worker_timeout segundos"""
+        with self._lock:
+            # Antes do primeiro worker conectar as tarefas esperam (ver wait_for_workers)
+            orphaned = (self._pending and self._workers and
+                        not any(handle.alive for handle in self._workers.values()))
+            if not orphaned:
+                self._orphaned_since = None
+                return
+            if self._orphaned_since is None:
+                self._orphaned_since = now
+                return
+            if now - self._orphaned_since < self.no_worker_timeout:
+                return
+            tasks = list(self._pending)
+            self._pending.clear()
+            self._orphaned_since = None
+        for task in tasks:
+            task['future'].set_exception(RuntimeError(
+                f"Tarefa {task['id']} sem workers vivos há {self.no_worker_timeout:.1f}s"))
+
+    def _worker_failed(self, handle, reason):
+        """Descarta o worker e devolve as tarefas em voo dele para a fila"""
+        with self._lock:
+            if not handle.alive or self._closed:
+                return
+            handle.alive = False
+            self.stats['failed_workers'] += 1
+            self.stats['failures'].append({'worker': handle.name, 'reason': reason,
+                                           'tasks_lost': len(handle.in_flight)})
+            tasks = list(handle.in_flight.values())
+            handle.in_flight.clear()
+            for task in tasks:
+                if task['attempts'] >= self.max_attempts:
+                    task['future'].set_exception(RuntimeError(
+                        f"Tarefa {task['id']} falhou em {task['attempts']} workers"))
+                else:
+                    self._pending.appendleft(task)
+                    self.stats['redispatched'] += 1
+            self._dispatch_locked()
+            self._lock.notify_all()
+        try:
+            handle.connection.close()
+        except OSError:
+            pass
+
+    def _dispatch_locked(self):
+        """Envia tarefas pendentes aos workers com vaga (chamado com o lock)"""
+        for handle in self._workers.values():
+            while self._pending and handle.alive and len(handle.in_flight) < self.tasks_per_worker:
+                task = self._pending.popleft()
+                task['attempts'] += 1
+                handle.in_flight[task['id']] = task
+                message = pickle.dumps(('task', task['id'], task['payload']))
+                task['sent_ns'] = _clock()
+                try:
+                    with handle.send_lock:
+                        handle.connection.send_bytes(message)
+                except OSError:
+                    # O reader deste worker vai detectar a falha e reenviar a tarefa
+                    break
+
+    def submit(self, function, *args):
+        """Agenda function(*args) em algum worker e retorna um Future"""
+        serialize_start = _clock()
+        payload = pickle.dumps((function, args))
+        task = {'id': next(self._task_ids), 'payload': payload, 'future': Future(), 'attempts': 0,
+                'serialize_ns': _clock() - serialize_start, 'bytes_sent': len(payload)}
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Executor encerrado")
+            self._pending.append(task)
+            self._dispatch_locked()
+        return task['future']
+
+    def map(self, function, iterable, timeout=None):
+        """Resultados de function(item) na ordem de iterable"""
+        futures = [self.submit(function, item) for item in iterable]
+        return [future.result(timeout) for future in futures]
+
+    def breakdown(self, records=None):
+        """Tempo total (s) de cada componente, bytes trafegados e tarefas"""
+        records = self.records if records is None else records
+        totals = {component: sum(record[f"{component}_ns"] for record in records) / 1e9
+                  for component in DISTRIBUTED_COMPONENTS}
+        totals['overhead'] = sum(totals[component] for component in DISTRIBUTED_COMPONENTS
+                                 if component != 'compute')
+        totals['bytes_sent'] = sum(record['bytes_sent'] for record in records)
+        totals['bytes_received'] = sum(record['bytes_received'] for record in records)
+        totals['tasks'] = len(records)
+        return totals
+
+    def worker_summary(self):
+        """Tarefas concluídas e estado de cada worker que já conectou"""
+        with self._lock:
+            return {handle.name: {'completed': handle.completed, 'alive': handle.alive}
+                    for handle in self._workers.values()}
+
+    def shutdown(self):
+        """Encerra workers e listener; tarefas não concluídas falham com RuntimeError"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            handles = list(self._workers.values())
+            tasks = list(self._pending)
+            self._pending.clear()
+            for handle in handles:
+                tasks.extend(handle.in_flight.values())
+                handle.in_flight.clear()
+        for task in tasks:
+            if not task['future'].done():
+                task['future'].set_exception(RuntimeError("Executor encerrado"))
+        for handle in handles:
+            try:
+                if handle.alive:
+                    with handle.send_lock:
+                        handle.connection.send_bytes(pickle.dumps(('shutdown',)))
+                handle.connection.close()
+            except OSError:
+                pass
+        self.listener.close()
+
+
+class LocalCluster:
+    """
+    Modo de teste: coordenador em 127.0.0.1 e N processos worker locais
+    falando TCP de verdade, para testar o caminho distribuído offline.
+    failing_workers workers recebem fail_after/fail_mode (injeção de falha).
+    """
+
+    def __init__(self, workers=2, heartbeat_interval=0.2, heartbeat_timeout=1.0, tasks_per_worker=1,
+                 fail_after=None, fail_mode='crash', failing_workers=1):
+        import multiprocessing
+
+        authkey = os.urandom(16)
+        self.executor = DistributedExecutor(('127.0.0.1', 0), authkey, tasks_per_worker=tasks_per_worker,
+                                            heartbeat_timeout=heartbeat_timeout)
+        # spawn: o worker começa do zero, como em outra máquina
+        context = multiprocessing.get_context('spawn')
+        self.processes = []
+        for index in range(workers):
+            failing = fail_after is not None and index < failing_workers
+            process = context.Process(target=run_worker, name=f"local-worker-{index}",
+                                      args=(self.executor.address, authkey, heartbeat_interval,
+                                            fail_after if failing else None, fail_mode),
+                                      daemon=True)
+            process.start()
+            self.processes.append(process)
+        self.executor.wait_for_workers(workers)
+
+    def __enter__(self):
+        return self.executor
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
+
+    def shutdown(self):
+        self.executor.shutdown()
+        for process in self.processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+                process.join()
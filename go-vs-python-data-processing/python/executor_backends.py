@@ -0,0 +1,67 @@
+import concurrent.futures
+import sys
+import sysconfig
+
+# Só biblioteca padrão: este módulo é importado dentro de sub-interpretadores,
+# onde extensões como numpy/pandas/psutil podem não ser suportadas
+
+
+def transform_values(values):
+    """Trabalho CPU-intensivo de um chunk (compartilhado por todos os backends)"""
+    return [(value ** 2 + value * 3 + 17) % 1000 for value in values]
+
+
+def process_chunk_plain(chunk_data):
+    """
+    Mesmo resultado de ParallelProcessor.process_chunk, como função de
+    módulo sem estado: é o que vai para backends que não recebem o processor
+    (sub-interpretadores)
+    """
+    chunk_id, data = chunk_data
+    result = transform_values(data)
+    return {
+        'chunk_id': chunk_id,
+        'original_sum': sum(data),
+        'processed_sum': sum(result),
+        'count': len(data)
+    }
+
+
+def free_threaded_build():
+    """Build CPython compilado sem GIL (3.13t/3.14t)"""
+    return bool(sysconfig.get_config_var('Py_GIL_DISABLED'))
+
+
+def gil_enabled():
+    """
+    GIL ativa neste processo. Em build free-threaded a GIL pode ser
+    reativada (PYTHON_GIL=1 ou extensão sem suporte), por isso a checagem
+    é em tempo de execução
+    """
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def interpreter_pool_executor():
+    """Classe InterpreterPoolExecutor (Python 3.14+) ou None"""
+    return getattr(concurrent.futures, 'InterpreterPoolExecutor', None)
+
+
+def detect_backends():
+    """
+    Backends extras disponíveis neste interpretador:
+    {'subinterpreters': {'available', 'reason'}, 'free_threaded': {...}}
+    """
+    version = f"Python {sys.version_info.major}.{sys.version_info.minor}"
+    if interpreter_pool_executor() is not None:
+        subinterpreters = {'available': True, 'reason': f"{version} com InterpreterPoolExecutor"}
+    else:
+        subinterpreters = {'available': False, 'reason': f"{version} sem InterpreterPoolExecutor, requer 3.14+"}
+
+    if not free_threaded_build():
+        free_threaded = {'available': False, 'reason': f"{version} compilado com GIL"}
+    elif gil_enabled():
+        free_threaded = {'available': False, 'reason': 'build free-threaded, mas a GIL foi reativada'}
+    else:
+        free_threaded = {'available': True, 'reason': 'build free-threaded com a GIL desativada'}
+    return {'subinterpreters': subinterpreters, 'free_threaded': free_threaded}
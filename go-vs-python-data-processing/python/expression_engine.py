@@ -0,0 +1,254 @@
+import ast
+import math
+import operator
+
+# Elementos por bloco: com 2-3 registradores float64 o bloco cabe no L2
+DEFAULT_BLOCK_SIZE = 16 * 1024
+
+# Fórmulas usadas no benchmark (as mesmas dos chunks de parallel_threads e do suite)
+EXPRESSIONS = {
+    'chunk_transform': '(value ** 2 + 3 * value + 17) % 1000',
+    'linear': 'value * 2 + 1',
+    'float_mix': 'sqrt(abs(value - 2500)) / 3 + value % 7'
+}
+
+# Operadores aceitos: nó do ast -> (ufunc do numpy, operador do Python)
+_BINARY = {
+    ast.Add: ('add', operator.add),
+    ast.Sub: ('subtract', operator.sub),
+    ast.Mult: ('multiply', operator.mul),
+    ast.Div: ('true_divide', operator.truediv),
+    ast.FloorDiv: ('floor_divide', operator.floordiv),
+    ast.Mod: ('remainder', operator.mod),
+    ast.Pow: ('power', operator.pow)
+}
+_UNARY = {
+    ast.USub: ('negative', operator.neg),
+    ast.UAdd: ('positive', operator.pos)
+}
+# Funções aceitas: nome -> (ufunc do numpy, função do Python)
+FUNCTIONS = {
+    'abs': ('absolute', abs),
+    'sqrt': ('sqrt', math.sqrt),
+    'exp': ('exp', math.exp),
+    'log': ('log', math.log),
+    'sin': ('sin', math.sin),
+    'cos': ('cos', math.cos)
+}
+
+
+class ExpressionError(ValueError):
+    """Expressão fora do subconjunto suportado (colunas, números, + - * / // % **, funções)"""
+
+
+class CompiledExpression:
+    """
+    Expressão sobre colunas compilada em um programa de ufuncs com
+    registradores: cada nó vira uma ufunc com out= em um buffer de bloco,
+    e um registrador é reaproveitado assim que seu valor não é mais usado
+    (x**2 + 3*x + 17 usa 2 registradores, não 4 temporários).
+
+    evaluate() percorre as colunas em blocos de block_size elementos, de
+    modo que os registradores fiquem no cache; a última ufunc de cada bloco
+    escreve direto na saída. Com workers > 1 os blocos são divididos entre
+    threads (as ufuncs liberam a GIL), cada uma com seus registradores.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        try:
+            tree = ast.parse(text.strip(), mode='eval')
+        except SyntaxError as e:
+            raise ExpressionError(f"Sintaxe inválida: {e.msg}") from e
+        self.tree = tree
+        self.columns = []
+        self.program = []
+        self._free = []
+        self.registers = 0
+        self.result = self._emit(tree.body)
+        self._free = None
+        if not self.columns:
+            raise ExpressionError("A expressão precisa usar ao menos uma coluna")
+
+    # --- compilação ---
+
+    def _alloc(self):
+        if self._free:
+            return self._free.pop()
+        self.registers += 1
+        return self.registers - 1
+
+    def _release(self, ref):
+        if ref[0] == 'reg':
+            self._free.append(ref[1])
+
+    def _instruction(self, ufunc, operands):
+        # Reaproveita o registrador de um operando como saída (ufuncs são elemento a elemento)
+        target = next((ref[1] for ref in operands if ref[0] == 'reg'), None)
+        if target is None:
+            target = self._alloc()
+        for ref in operands:
+            if ref[0] == 'reg' and ref[1] != target:
+                self._release(ref)
+        self.program.append((ufunc, tuple(operands), target))
+        return ('reg', target)
+
+    def _emit(self, node):
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return ('const', node.value)
+        if isinstance(node, ast.Name):
+            if node.id not in self.columns:
+                self.columns.append(node.id)
+            return ('col', node.id)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+            ufunc, python_op = _UNARY[type(node.op)]
+            operand = self._emit(node.operand)
+            if operand[0] == 'const':
+                return ('const', python_op(operand[1]))
+            return self._instruction(ufunc, [operand])
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            ufunc, python_op = _BINARY[type(node.op)]
+            left = self._emit(node.left)
+            # x ** 2 vira x * x (multiply é bem mais barato que power)
+            if ufunc == 'power' and isinstance(node.right, ast.Constant) and node.right.value == 2 \
+                    and left[0] != 'const':
+                return self._instruction('multiply', [left, left])
+            right = self._emit(node.right)
+            if left[0] == 'const' and right[0] == 'const':
+                return ('const', python_op(left[1], right[1]))
+            return self._instruction(ufunc, [left, right])
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS \
+                and len(node.args) == 1 and not node.keywords:
+            ufunc, python_function = FUNCTIONS[node.func.id]
+            argument = self._emit(node.args[0])
+            if argument[0] == 'const':
+                return ('const', python_function(argument[1]))
+            return self._instruction(ufunc, [argument])
+        raise ExpressionError(f"Elemento não suportado na expressão: {ast.dump(node)[:60]}")
+
+    # --- avaliação ---
+
+    def _arrays(self, columns):
+        import numpy as np
+
+        missing = [name for name in self.columns if name not in columns]
+        if missing:
+            raise ExpressionError(f"Colunas ausentes: {', '.join(missing)}")
+        arrays = {name: np.asarray(columns[name]) for name in self.columns}
+        sizes = {len(array) for array in arrays.values()}
+        if len(sizes) > 1:
+            raise ExpressionError("Colunas com tamanhos diferentes")
+        return arrays, sizes.pop()
+
+    def result_dtype(self, columns):
+        """dtype do resultado (promoção do numpy avaliando a primeira linha)"""
+        import numpy as np
+
+        arrays, size = self._arrays(columns)
+        if not size:
+            return np.dtype('float64')
+        first = {name: array[:1] for name, array in arrays.items()}
+        return np.asarray(self.evaluate_naive(first)).dtype
+
+    def _run_blocks(self, arrays, out, blocks, block_size):
+        """Executa o programa nos blocos [(início, fim), ...] com registradores próprios"""
+        import numpy as np
+
+        registers = [np.empty(block_size, dtype=out.dtype) for _ in range(self.registers)]
+        ufuncs = [(getattr(np, ufunc), operands, target) for ufunc, operands, target in self.program]
+        last = len(ufuncs) - 1
+        for start, end in blocks:
+            size = end - start
+            views = [register[:size] for register in registers]
+            for index, (ufunc, operands, target) in enumerate(ufuncs):
+                args = [views[value] if kind == 'reg' else arrays[value][start:end] if kind == 'col' else value
+                        for kind, value in operands]
+                ufunc(*args, out=out[start:end] if index == last else views[target])
+
+    def evaluate(self, columns, out=None, block_size=DEFAULT_BLOCK_SIZE, workers=1, executor=None):
+        """
+        Avalia a expressão sobre columns (dict nome -> array) e retorna o
+        array resultado (ou preenche out)
+        """
+        import numpy as np
+
+        arrays, size = self._arrays(columns)
+        if out is None:
+            out = np.empty(size, dtype=self.result_dtype(columns))
+        if self.result[0] == 'col':
+            out[:] = arrays[self.result[1]]
+            return out
+
+        blocks = [(start, min(start + block_size, size)) for start in range(0, size, block_size)]
+        workers = max(min(workers, len(blocks)), 1)
+        if workers == 1:
+            self._run_blocks(arrays, out, blocks, block_size)
+            return out
+
+        # Faixas contíguas de blocos por thread
+        step = -(-len(blocks) // workers)
+        ranges = [blocks[i:i + step] for i in range(0, len(blocks), step)]
+        own_executor = executor is None
+        if own_executor:
+            from concurrent.futures import ThreadPoolExecutor
+            executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(self._run_blocks, arrays, out, blocks_range, block_size)
+                       for blocks_range in ranges]
+            for future in futures:
+                future.result()
+        finally:
+            if own_executor:
+                executor.shutdown()
+        return out
+
+    def evaluate_naive(self, columns):
+        """Avaliação numpy direta: um array temporário do tamanho total por operação"""
+        import numpy as np
+
+        arrays, _ = self._arrays(columns)
+        namespace = {name: getattr(np, ufunc) for name, (ufunc, _) in FUNCTIONS.items()}
+        namespace['__builtins__'] = {}
+        namespace.update(arrays)
+        return eval(compile(self.tree, '<expression>', 'eval'), namespace)
+
+    def loop_function(self):
+        """Função Python escalar equivalente (uma chamada por linha)"""
+        namespace = {name: function for name, (_, function) in FUNCTIONS.items()}
+        namespace['__builtins__'] = {}
+        return eval(f"lambda {', '.join(self.columns)}: {ast.unparse(self.tree.body)}", namespace)
+
+    def evaluate_loop(self, columns):
+        """Loop Python linha a linha (como process_chunk)"""
+        arrays, _ = self._arrays(columns)
+        function = self.loop_function()
+        values = [arrays[name].tolist() for name in self.columns]
+        return [function(*row) for row in zip(*values)]
+
+    def memory_traffic(self, columns, block_size=DEFAULT_BLOCK_SIZE, workers=1):
+        """
+        Estimativa de bytes movidos da/para a memória principal.
+        naive: cada operação lê seus operandos de array e grava um temporário
+        do tamanho total. fused: colunas lidas uma vez e saída gravada uma
+        vez; os registradores (scratch_bytes por worker) ficam no cache.
+        """
+        arrays, size = self._arrays(columns)
+        itemsize = self.result_dtype(columns).itemsize
+        column_bytes = sum(array.itemsize for array in arrays.values()) * size
+        naive = 0
+        for _, operands, _ in self.program:
+            array_operands = [ref for ref in operands if ref[0] != 'const']
+            naive += (len(array_operands) + 1) * size * itemsize
+        return {
+            'naive_bytes': naive,
+            'fused_bytes': column_bytes + size * itemsize,
+            'scratch_bytes': self.registers * min(block_size, size) * itemsize * workers,
+            'operations': len(self.program),
+            'registers': self.registers
+        }
+
+
+def compile_expression(text):
+    """Compila uma expressão sobre colunas (ExpressionError se inválida)"""
+    return CompiledExpression(text)
+
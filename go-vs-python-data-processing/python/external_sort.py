@@ -0,0 +1,168 @@
+import heapq
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _line_key(key_index, key_type):
+    """Função de chave que extrai e converte a coluna de uma linha CSV"""
+    def key(line):
+        return key_type(line.split(',', key_index + 1)[key_index])
+    return key
+
+
+def _sort_run(lines, key_index, key_type, run_path, buffer_size):
+    """
+    Ordena um bloco de linhas e grava como run (executado no worker).
+    Retorna o caminho e o número de linhas.
+    """
+    lines.sort(key=_line_key(key_index, key_type))
+    with open(run_path, 'w', encoding='utf-8', buffering=buffer_size) as f:
+        f.writelines(lines)
+    return run_path, len(lines)
+
+
+def _merge_runs(run_paths, output_path, key_index, key_type, buffer_size, header=None):
+    """k-way merge com heap das runs ordenadas (estável: empates seguem a ordem das runs)"""
+    files = [open(path, 'r', encoding='utf-8', buffering=buffer_size) for path in run_paths]
+    try:
+        with open(output_path, 'w', encoding='utf-8', buffering=buffer_size) as out:
+            if header is not None:
+                out.write(header)
+            out.writelines(heapq.merge(*files, key=_line_key(key_index, key_type)))
+    finally:
+        for f in files:
+            f.close()
+
+
+def _estimate_line_size(input_path, sample_bytes=65536):
+    with open(input_path, 'rb') as f:
+        f.readline()
+        sample = f.read(sample_bytes)
+    lines = sample.count(b'\n')
+    return max(len(sample) / lines, 1) if lines else 64
+
+
+def external_sort(input_path, output_path, key='value', key_type=int, memory_mb=64, run_rows=None,
+                  workers=None, buffer_size=1024 * 1024, max_fanin=64, tmp_dir=None):
+    """
+    Ordena um CSV maior que a memória pela coluna key.
+
+    1. Divide o arquivo em runs de run_rows linhas; cada run é ordenada e
+       gravada por um processo worker (no máximo workers runs em voo).
+    2. Faz o merge k-way das runs com heap e I/O bufferizado. Com mais de
+       max_fanin runs o merge é feito em várias passadas.
+
+    Sem run_rows explícito, o tamanho da run é derivado de memory_mb: as
+    runs em voo (workers + a que está sendo lida) cabem no orçamento.
+    Retorna estatísticas das fases.
+    """
+    workers = workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+
+    with open(input_path, 'r', encoding='utf-8', buffering=buffer_size) as f:
+        header = f.readline()
+    columns = header.rstrip('\r\n').split(',')
+    if key not in columns:
+        raise ValueError(f"Coluna '{key}' não existe em {input_path}")
+    key_index = columns.index(key)
+
+    if run_rows is None:
+        line_size = _estimate_line_size(input_path)
+        # Strings Python custam ~3x o tamanho da linha em disco
+        run_rows = max(int(memory_mb * 1024 * 1024 / (line_size * 3 * (workers + 1))), 1000)
+
+    work_dir = tempfile.mkdtemp(prefix='external_sort_', dir=tmp_dir)
+    stats = {'run_rows': run_rows, 'workers': workers, 'runs': 0, 'rows': 0, 'merge_passes': 0}
+    try:
+        # Fase 1: runs ordenadas em paralelo, com submissão limitada
+        run_paths = []
+        with ProcessPoolExecutor(max_workers=workers) as executor, \
+                open(input_path, 'r', encoding='utf-8', buffering=buffer_size) as f:
+            f.readline()
+            pending = []
+            while True:
+                lines = []
+                for line in f:
+                    if not line.endswith('\n'):
+                        line += '\n'
+                    lines.append(line)
+                    if len(lines) >= run_rows:
+                        break
+                if not lines:
+                    break
+
+                run_path = os.path.join(work_dir, f"run_{len(run_paths) + len(pending):06d}.csv")
+                pending.append(executor.submit(_sort_run, lines, key_index, key_type, run_path,
+                                               buffer_size))
+                if len(pending) >= workers:
+                    path, rows = pending.pop(0).result()
+                    run_paths.append(path)
+                    stats['rows'] += rows
+            for future in pending:
+                path, rows = future.result()
+                run_paths.append(path)
+                stats['rows'] += rows
+        stats['runs'] = len(run_paths)
+        stats['run_phase_time'] = time.perf_counter() - start_time
+
+        # Fase 2: merge k-way (multi-passada se houver runs demais)
+        merge_start = time.perf_counter()
+        level = 0
+        while len(run_paths) > max_fanin:
+            merged = []
+            for i in range(0, len(run_paths), max_fanin):
+                merged_path = os.path.join(work_dir, f"merge_{level}_{i // max_fanin:06d}.csv")
+                _merge_runs(run_paths[i:i + max_fanin], merged_path, key_index, key_type, buffer_size)
+                merged.append(merged_path)
+            run_paths = merged
+            level += 1
+            stats['merge_passes'] += 1
+
+        _merge_runs(run_paths, output_path, key_index, key_type, buffer_size, header=header)
+        stats['merge_passes'] += 1
+        stats['merge_phase_time'] = time.perf_counter() - merge_start
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    stats['execution_time'] = time.perf_counter() - start_time
+    return stats
+
+
+def exact_quantiles(sorted_path, quantiles, key='value', key_type=int, total_rows=None):
+    """
+    Quantis exatos a partir de um CSV já ordenado por key, em uma passada e
+    com memória constante. Usa interpolação linear (mesma regra do pandas).
+    """
+    with open(sorted_path, 'r', encoding='utf-8') as f:
+        key_index = f.readline().rstrip('\r\n').split(',').index(key)
+        if total_rows is None:
+            total_rows = sum(1 for _ in f)
+    if total_rows == 0:
+        return {q: None for q in quantiles}
+
+    # Posições (fracionárias) de cada quantil e linhas necessárias para interpolar
+    positions = {q: q * (total_rows - 1) for q in quantiles}
+    needed = set()
+    for position in positions.values():
+        needed.add(int(position))
+        needed.add(min(int(position) + 1, total_rows - 1))
+
+    values = {}
+    with open(sorted_path, 'r', encoding='utf-8') as f:
+        f.readline()
+        for row_number, line in enumerate(f):
+            if row_number in needed:
+                values[row_number] = key_type(line.rstrip('\r\n').split(',')[key_index])
+                if len(values) == len(needed):
+                    break
+
+    result = {}
+    for q, position in positions.items():
+        lower = int(position)
+        upper = min(lower + 1, total_rows - 1)
+        fraction = position - lower
+        result[q] = values[lower] + (values[upper] - values[lower]) * fraction
+    return result
@@ -0,0 +1,210 @@
+import asyncio
+import inspect
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+# Tipos de etapa: 'cpu' roda na thread principal do worker, 'io' na pool de
+# threads (ou no event loop) do worker
+TASK_KINDS = ('cpu', 'io')
+
+# Como cada worker executa as etapas de I/O
+IO_MODES = ('threads', 'asyncio')
+
+# Estratégias comparadas no benchmark de carga mista
+MIXED_STRATEGIES = ('threads', 'processes', 'asyncio', 'hybrid', 'hybrid_asyncio')
+
+# Estado do processo worker, criado pelo initializer do pool
+_worker_state = {}
+
+
+def _check_stages(stages):
+    stages = tuple(stages)
+    for kind, _ in stages:
+        if kind not in TASK_KINDS:
+            raise ValueError(f"Tipo de etapa inválido: {kind} (opções: {', '.join(TASK_KINDS)})")
+    return stages
+
+
+def _init_worker(threads_per_process, io_mode):
+    _worker_state['io_mode'] = io_mode
+    _worker_state['concurrency'] = threads_per_process
+    if io_mode == 'threads':
+        _worker_state['threads'] = ThreadPoolExecutor(max_workers=threads_per_process,
+                                                      thread_name_prefix='hybrid-io')
+
+
+def run_pipeline(stages, payload):
+    """
+    Executa todas as etapas de um job em sequência na thread atual
+    (usado pelas estratégias só-threads e só-processos)
+    """
+    value = payload
+    for _, function in stages:
+        value = asyncio.run(function(value)) if inspect.iscoroutinefunction(function) else function(value)
+    return value
+
+
+def _run_batch_threads(stages, payloads, threads):
+    """
+    Lote de jobs em um worker: etapas 'io' vão para a pool de threads do
+    processo; etapas 'cpu' rodam uma por vez na thread principal, assim que
+    a etapa anterior do job termina. Enquanto a thread principal calcula,
+    as threads seguem esperando I/O sem disputar a GIL.
+    """
+    results = [None] * len(payloads)
+    pending = {}
+    ready = deque()
+
+    def advance(index, stage, value):
+        if stage == len(stages):
+            results[index] = value
+        elif stages[stage][0] == 'io':
+            pending[threads.submit(stages[stage][1], value)] = (index, stage)
+        else:
+            ready.append((index, stage, value))
+
+    for index, payload in enumerate(payloads):
+        advance(index, 0, payload)
+    while pending or ready:
+        while ready:
+            index, stage, value = ready.popleft()
+            advance(index, stage + 1, stages[stage][1](value))
+        if pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, stage = pending.pop(future)
+                advance(index, stage + 1, future.result())
+    return results
+
+
+async def _run_job_async(stages, value, semaphore):
+    for kind, function in stages:
+        if kind == 'cpu':
+            value = function(value)
+            continue
+        async with semaphore:
+            if inspect.iscoroutinefunction(function):
+                value = await function(value)
+            else:
+                value = await asyncio.to_thread(function, value)
+    return value
+
+
+def run_pipelines_async(stages, payloads, concurrency=8):
+    """
+    Lote de jobs em um event loop: etapas 'io' assíncronas são aguardadas
+    (no máximo concurrency ao mesmo tempo; funções síncronas vão para
+    asyncio.to_thread) e etapas 'cpu' rodam no próprio loop.
+    """
+    async def run_all():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(_run_job_async(stages, payload, semaphore)
+                                      for payload in payloads))
+    return asyncio.run(run_all())
+
+
+def _run_batch(stages, payloads):
+    """Entrada do worker: executa o lote no modo configurado no initializer"""
+    if _worker_state['io_mode'] == 'asyncio':
+        return run_pipelines_async(stages, payloads, _worker_state['concurrency'])
+    return _run_batch_threads(stages, payloads, _worker_state['threads'])
+
+
+class HybridExecutor:
+    """
+    Pool de processos em que cada worker tem a própria pool de threads
+    (io_mode='threads') ou o próprio event loop (io_mode='asyncio').
+
+    Um job é um payload que passa por etapas (tipo, função); o tipo declara
+    se a etapa é 'cpu' ou 'io'. Cada processo tem uma única via de CPU (a
+    thread principal) e threads_per_process vias de I/O, então o CPU escala
+    com os processos e a espera de I/O se sobrepõe ao cálculo sem que as
+    threads de I/O tenham que disputar a GIL entre vários cálculos.
+    Funções de etapa precisam ser serializáveis (funções de módulo ou
+    functools.partial delas).
+    """
+
+    def __init__(self, processes=None, threads_per_process=8, io_mode='threads'):
+        if io_mode not in IO_MODES:
+            raise ValueError(f"Modo de I/O inválido: {io_mode} (opções: {', '.join(IO_MODES)})")
+        self.processes = processes or os.cpu_count() or 1
+        self.threads_per_process = threads_per_process
+        self.io_mode = io_mode
+        self._pool = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                         initargs=(threads_per_process, io_mode))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
+
+    def warm_up(self):
+        """Sobe todos os processos antes de medir; retorna o tempo gasto"""
+        start_time = time.perf_counter()
+        list(self._pool.map(abs, range(self.processes)))
+        return time.perf_counter() - start_time
+
+    def map(self, stages, payloads, batches_per_process=1):
+        """
+        Executa as etapas para cada payload e retorna os resultados na ordem
+        dos payloads. Os jobs são divididos em processes * batches_per_process
+        lotes intercalados (job i vai para o lote i % lotes).
+        """
+        stages = _check_stages(stages)
+        payloads = list(payloads)
+        num_batches = max(min(len(payloads), self.processes * batches_per_process), 1)
+        batches = [list(range(batch, len(payloads), num_batches)) for batch in range(num_batches)]
+        futures = [self._pool.submit(_run_batch, stages, [payloads[index] for index in batch])
+                   for batch in batches]
+
+        results = [None] * len(payloads)
+        for batch, future in zip(batches, futures):
+            for index, result in zip(batch, future.result()):
+                results[index] = result
+        return results
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+# Carga mista sintética (fetch -> parse -> compute) usada no benchmark
+
+def simulated_fetch(job_id, io_time=0.005, values=64):
+    """I/O simulado: espera io_time e devolve uma linha CSV em bytes"""
+    time.sleep(io_time)
+    return b','.join(str((job_id * 7919 + k) % 1000).encode() for k in range(values))
+
+
+async def simulated_fetch_async(job_id, io_time=0.005, values=64):
+    """Versão assíncrona de simulated_fetch"""
+    await asyncio.sleep(io_time)
+    return b','.join(str((job_id * 7919 + k) % 1000).encode() for k in range(values))
+
+
+def parse_payload(payload):
+    """Parse da linha recebida"""
+    return [int(value) for value in payload.split(b',')]
+
+
+def compute_payload(values, iterations=10000):
+    """Cálculo CPU-bound determinístico sobre os valores"""
+    total = 0
+    size = len(values)
+    for i in range(iterations):
+        value = values[i % size]
+        total = (total + value * value + i) % 1000003
+    return total
+
+
+def mixed_stages(io_time, iterations, asynchronous=False):
+    """Etapas do job misto: fetch (io), parse (cpu), compute (cpu)"""
+    from functools import partial
+
+    fetch = simulated_fetch_async if asynchronous else simulated_fetch
+    return (('io', partial(fetch, io_time=io_time)),
+            ('cpu', parse_payload),
+            ('cpu', partial(compute_payload, iterations=iterations)))
@@ -0,0 +1,281 @@
+import hashlib
+import io
+import json
+import math
+import os
+import time
+
+from row_index import RowIndex, RowIndexBuilder
+
+# Bytes usados nas assinaturas do trecho já processado (início e fim)
+SIGNATURE_BYTES = 4096
+
+
+class RunningStats:
+    """
+    Agregado combinável de uma coluna numérica: count, sum, min, max e
+    média/M2 (Welford). Dois agregados de partes disjuntas se combinam com
+    merge (fórmula de Chan), então o estado pode ser salvo e continuado.
+    Mediana e quantis não são combináveis exatamente e ficam de fora.
+    """
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, minimum=None, maximum=None, total=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+        self.sum = total
+
+    def update(self, values):
+        """Acrescenta um bloco de valores (array numpy ou lista); NaN é ignorado"""
+        import numpy as np
+
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        mean = float(values.mean())
+        block = RunningStats(len(values), mean, float(((values - mean) ** 2).sum()),
+                             float(values.min()), float(values.max()), float(values.sum()))
+        return self.merge(block)
+
+    def merge(self, other):
+        """Combina outro agregado neste (in-place) e retorna self"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max, self.sum = other.min, other.max, other.sum
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sum += other.sum
+        return self
+
+    def result(self):
+        """Estatísticas finais (desvio padrão amostral, como o pandas)"""
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.mean if self.count else math.nan,
+            'std': math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan,
+            'min': self.min,
+            'max': self.max
+        }
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min,
+                'max': self.max, 'sum': self.sum}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['count'], data['mean'], data['m2'], data['min'], data['max'], data['sum'])
+
+
+def _signature(f, start, end):
+    """sha1 dos bytes [start, end) do arquivo"""
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
+
+
+class IncrementalStats:
+    """
+    Estatísticas de uma coluna de um CSV que só cresce (append-only).
+
+    O estado (offset do último byte processado + RunningStats) é salvo em
+    JSON ao lado do CSV. Cada update lê apenas os bytes acrescentados desde
+    o offset, até a última linha completa. Se o arquivo encolheu
+    (truncamento) ou o trecho já processado mudou (reescrita, detectada por
+    assinaturas do início e do fim desse trecho), o estado é descartado e
+    tudo é recalculado.
+
+    O índice de offsets de linha (row_index.RowIndex) sai do mesmo scan,
+    com a coluna chave lida no mesmo read_csv da coluna das estatísticas.
+    row_index=None (padrão): construído só no recálculo completo, que já lê
+    o arquivo inteiro; os updates incrementais não o estendem (o índice
+    fica desatualizado e é reconstruído sob demanda). True: também
+    estendido a cada update incremental, ao custo de converter a coluna
+    chave e regravar o índice. False: nunca.
+    """
+
+    def __init__(self, filepath, column='value', state_path=None, block_bytes=16 * 1024 * 1024,
+                 row_index=None):
+        self.filepath = filepath
+        self.column = column
+        self.state_path = state_path or f"{filepath}.{column}.stats.json"
+        self.block_bytes = block_bytes
+        self.row_index = row_index
+        self.state = self._load_state()
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return None
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('filepath') != os.path.abspath(self.filepath) or state.get('column') != self.column:
+            return None
+        return state
+
+    def _save_state(self):
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(temp_path, self.state_path)
+
+    def _check_state(self, f, size):
+        """Motivo para recalcular tudo, ou None se o estado ainda vale"""
+        if self.state is None:
+            return 'no_state'
+        offset = self.state['offset']
+        if size < offset:
+            return 'truncated'
+        if _signature(f, 0, min(offset, SIGNATURE_BYTES)) != self.state['head_signature'] or \
+                _signature(f, max(offset - SIGNATURE_BYTES, 0), offset) != self.state['tail_signature']:
+            return 'rewritten'
+        return None
+
+    def _parse_block(self, data, header, stats, index_builder=None):
+        """
+        Converte um bloco de linhas completas e acumula a coluna; com
+        index_builder, a coluna chave sai do mesmo parse e alimenta o índice
+        """
+        import pandas as pd
+
+        key_column = index_builder.key_column if index_builder is not None else None
+        columns = list(dict.fromkeys([self.column] + ([key_column] if key_column else [])))
+        df = pd.read_csv(io.BytesIO(data), header=None, names=header, usecols=columns)
+        stats.update(df[self.column].to_numpy(dtype='float64', na_value=float('nan')))
+        if index_builder is not None:
+            index_builder.feed(data, keys=df[key_column].to_numpy() if key_column else None)
+        return len(df)
+
+    def update(self):
+        """
+        Processa o que foi acrescentado desde a última execução.
+        Retorna {'mode': 'full'|'incremental'|'unchanged', 'reason', 'new_rows',
+        'bytes_parsed', 'execution_time', 'stats'}.
+        """
+        start_time = time.perf_counter()
+        size = os.path.getsize(self.filepath)
+
+        with open(self.filepath, 'rb') as f:
+            reason = self._check_state(f, size)
+            if reason is not None:
+                f.seek(0)
+                header_line = f.readline()
+                header = header_line.decode('utf-8').rstrip('\r\n').split(',')
+                if self.column not in header:
+                    raise ValueError(f"Coluna '{self.column}' não existe em {self.filepath}")
+                offset = len(header_line)
+                stats = RunningStats()
+                rows = 0
+                mode = 'full'
+                index_builder = RowIndexBuilder(header, offset) if self.row_index is not False else None
+            else:
+                header = self.state['header']
+                offset = self.state['offset']
+                stats = RunningStats.from_dict(self.state['stats'])
+                rows = self.state['rows']
+                mode = 'incremental'
+                index_builder = self._resume_row_index(offset, rows)
+
+            start_offset = offset
+            new_rows = 0
+            f.seek(offset)
+            pending = b''
+            while True:
+                block = f.read(self.block_bytes)
+                if not block:
+                    break
+                data = pending + block
+                # Só linhas completas: a última linha parcial fica para a próxima vez
+                end = data.rfind(b'\n') + 1
+                pending = data[end:]
+                if end:
+                    new_rows += self._parse_block(data[:end], header, stats, index_builder)
+                    offset += end
+
+            self.state = {
+                'filepath': os.path.abspath(self.filepath),
+                'column': self.column,
+                'header': header,
+                'offset': offset,
+                'rows': rows + new_rows,
+                'head_signature': _signature(f, 0, min(offset, SIGNATURE_BYTES)),
+                'tail_signature': _signature(f, max(offset - SIGNATURE_BYTES, 0), offset),
+                'stats': stats.to_dict(),
+                'updated_at': time.time()
+            }
+        self._save_state()
+        # Com uma linha parcial no final o índice não cobriria o arquivo todo
+        if index_builder is not None and not pending:
+            index_builder.finish(self.filepath).save()
+
+        if mode == 'incremental' and new_rows == 0:
+            mode = 'unchanged'
+        return {
+            'mode': mode,
+            'reason': reason,
+            'new_rows': new_rows,
+            'rows': rows + new_rows,
+            'bytes_parsed': offset - start_offset,
+            'execution_time': time.perf_counter() - start_time,
+            'stats': stats.result()
+        }
+
+    def _resume_row_index(self, offset, rows):
+        """
+        Builder que continua o índice salvo, se ele termina onde o estado
+        termina (só com row_index=True)
+        """
+        if not self.row_index:
+            return None
+        index = RowIndex.load(self.filepath, allow_stale=True)
+        if index is None or index.data_end != offset or index.rows != rows:
+            return None
+        return RowIndexBuilder.resume(index)
+
+    def reset(self):
+        """Apaga o estado salvo (próximo update recalcula tudo)"""
+        self.state = None
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def watch(self, interval=1.0, callback=None, max_updates=None):
+        """
+        Acompanha o arquivo: a cada interval segundos, se tamanho ou mtime
+        mudaram, executa update e chama callback(resultado) (padrão: imprime).
+        Termina com Ctrl+C ou após max_updates atualizações.
+        """
+        callback = callback or print_update
+        last_version = None
+        updates = 0
+        try:
+            while max_updates is None or updates < max_updates:
+                stat = os.stat(self.filepath)
+                version = (stat.st_size, stat.st_mtime_ns)
+                if version != last_version:
+                    callback(self.update())
+                    last_version = version
+                    updates += 1
+                else:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        return updates
+
+
+def print_update(result):
+    """Impressão padrão de um update"""
+    stats = result['stats']
+    reason = f" ({result['reason']})" if result['reason'] else ''
+    print(f"🔁 {result['mode']}{reason}: +{result['new_rows']:,} linhas "
+          f"({result['bytes_parsed'] / 1024:,.1f} KB) em {result['execution_time']:.4f}s | "
+          f"total {stats['count']:,} | média {stats['mean']:,.2f} | desvio {stats['std']:,.2f} | "
+          f"min {stats['min']} | max {stats['max']}")
@@ -0,0 +1,239 @@
+import functools
+import json
+import os
+import threading
+import time
+
+_clock = time.perf_counter_ns
+
+
+def measure_resources(process=None):
+    """Uso atual de CPU e memória do processo (psutil importado sob demanda)"""
+    if process is None:
+        import psutil
+        process = psutil.Process()
+    return {
+        'cpu_percent': process.cpu_percent(),
+        'memory_mb': process.memory_info().rss / 1024 / 1024,
+        'memory_percent': process.memory_percent()
+    }
+
+
+class Span:
+    """
+    Intervalo medido com relógio monotônico em nanossegundos.
+    A duração é sempre medida; o registro no Tracer (e o pai/profundidade)
+    só acontece quando o tracer está habilitado.
+    """
+
+    __slots__ = ('tracer', 'name', 'attrs', 'resources', 'start_ns', 'end_ns', 'depth', 'parent',
+                 'resources_before', 'resources_after')
+
+    def __init__(self, tracer, name, attrs, resources):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.resources = resources
+        self.start_ns = 0
+        self.end_ns = 0
+        self.depth = 0
+        self.parent = None
+        self.resources_before = None
+        self.resources_after = None
+
+    def __enter__(self):
+        if self.resources:
+            self.resources_before = self.tracer.measure_resources()
+        if self.tracer.enabled:
+            self.tracer._push(self)
+        self.start_ns = _clock()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = _clock()
+        if self.resources:
+            self.resources_after = self.tracer.measure_resources()
+        if self.tracer.enabled:
+            if exc_type is not None:
+                self.attrs['error'] = exc_type.__name__
+            self.tracer._pop(self)
+        return False
+
+    def set(self, **attrs):
+        """Acrescenta atributos ao span (ex.: linhas processadas)"""
+        self.attrs.update(attrs)
+        return self
+
+    @property
+    def duration_ns(self):
+        return (self.end_ns or _clock()) - self.start_ns
+
+    @property
+    def duration(self):
+        """Duração em segundos (parcial se o span ainda está aberto)"""
+        return self.duration_ns / 1e9
+
+    @property
+    def memory_diff_mb(self):
+        if self.resources_before is None or self.resources_after is None:
+            return None
+        return self.resources_after['memory_mb'] - self.resources_before['memory_mb']
+
+
+class Tracer:
+    """
+    Coleta spans aninhados (pilha por thread) para exportar em JSON ou no
+    formato de eventos do Chrome (chrome://tracing, Perfetto).
+
+    Desabilitado, span() só mede a duração: nada é registrado e não há
+    pilha, lock ou alocação além do próprio objeto Span.
+    resources=True no span amostra CPU/memória antes e depois (psutil).
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.spans = []
+        self.origin_ns = _clock()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._process = None
+
+    def __getstate__(self):
+        # Objetos com o tracer (ex.: métodos enviados a um ProcessPool) chegam
+        # ao worker com um tracer vazio e desabilitado: spans não voltam ao pai
+        return {'enabled': False}
+
+    def __setstate__(self, state):
+        self.__init__(enabled=state['enabled'])
+
+    def measure_resources(self):
+        if self._process is None:
+            import psutil
+            self._process = psutil.Process()
+        return measure_resources(self._process)
+
+    def span(self, name, resources=False, **attrs):
+        """Context manager: with tracer.span('leitura', rows=n) as span: ..."""
+        return Span(self, name, attrs, resources)
+
+    def trace(self, name=None, resources=False):
+        """Decorador: cada chamada da função vira um span"""
+        def decorator(function):
+            span_name = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with Span(self, span_name, {}, resources):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _push(self, span):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        span.depth = len(stack)
+        span.parent = stack[-1].name if stack else None
+        stack.append(span)
+
+    def _pop(self, span):
+        stack = self._local.stack
+        if stack and stack[-1] is span:
+            stack.pop()
+        record = {
+            'name': span.name,
+            'start_ns': span.start_ns - self.origin_ns,
+            'duration_ns': span.end_ns - span.start_ns,
+            'depth': span.depth,
+            'parent': span.parent,
+            'pid': os.getpid(),
+            'thread': threading.get_ident(),
+            'thread_name': threading.current_thread().name,
+            'attrs': span.attrs
+        }
+        if span.resources_before is not None:
+            record['memory_diff_mb'] = span.memory_diff_mb
+            record['memory_after_mb'] = span.resources_after['memory_mb']
+        with self._lock:
+            self.spans.append(record)
+
+    def to_json(self, filepath):
+        """Lista de spans em JSON (ordenados pelo início)"""
+        spans = sorted(self.spans, key=lambda record: record['start_ns'])
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(spans, f, indent=2, default=str)
+        return filepath
+
+    def chrome_events(self):
+        """Eventos 'X' (completos) do Trace Event Format, em microssegundos"""
+        events = []
+        threads = {}
+        for record in self.spans:
+            threads[(record['pid'], record['thread'])] = record['thread_name']
+            args = dict(record['attrs'])
+            if 'memory_diff_mb' in record:
+                args['memory_diff_mb'] = record['memory_diff_mb']
+            events.append({
+                'name': record['name'],
+                'ph': 'X',
+                'ts': record['start_ns'] / 1000,
+                'dur': record['duration_ns'] / 1000,
+                'pid': record['pid'],
+                'tid': record['thread'],
+                'args': args
+            })
+        for (pid, tid), thread_name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': thread_name}})
+        return events
+
+    def to_chrome_trace(self, filepath):
+        """Arquivo para chrome://tracing ou ui.perfetto.dev"""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.chrome_events(), 'displayTimeUnit': 'ms'}, f, default=str)
+        return filepath
+
+    def summary(self):
+        """Tempo total e contagem por nome de span"""
+        totals = {}
+        for record in self.spans:
+            entry = totals.setdefault(record['name'], {'count': 0, 'total_ns': 0})
+            entry['count'] += 1
+            entry['total_ns'] += record['duration_ns']
+        return totals
+
+
+def export_trace(tracer, results_dir, prefix, timestamp=None):
+    """
+    Grava os spans em <prefix>_<timestamp>.spans.json e no formato do Chrome
+    em <prefix>_<timestamp>.trace.json. Retorna os dois caminhos.
+    """
+    from datetime import datetime
+
+    os.makedirs(results_dir, exist_ok=True)
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    base = os.path.join(results_dir, f"{prefix}_{timestamp}")
+    paths = tracer.to_json(f"{base}.spans.json"), tracer.to_chrome_trace(f"{base}.trace.json")
+    print(f"🧭 Spans salvos em: {paths[0]}")
+    print(f"🧭 Timeline (chrome://tracing / ui.perfetto.dev): {paths[1]}")
+    return paths
+
+
+# Tracer padrão do processo: desabilitado até alguém chamar set_tracer
+_default_tracer = Tracer(enabled=False)
+
+
+def get_tracer():
+    return _default_tracer
+
+
+def set_tracer(tracer):
+    """Troca o tracer padrão (usado por quem não recebe um tracer explícito)"""
+    global _default_tracer
+    _default_tracer = tracer
+    return tracer
+
+
+def span(name, resources=False, **attrs):
+    """Span no tracer padrão"""
+    return Span(_default_tracer, name, attrs, resources)
@@ -0,0 +1,184 @@
+import csv
+import os
+import pickle
+import random
+import shutil
+import tempfile
+
+
+def generate_dimension_table(num_keys, filename='dimension.csv', data_dir='../data',
+                             coverage=0.8, seed=7):
+    """
+    Gera uma tabela dimensão (id, segment, region, weight) para joins com os
+    datasets dataset_*. Apenas uma fração (coverage) dos ids 1..num_keys
+    aparece, para que o inner join descarte linhas. Saída ordenada por id.
+    """
+    rng = random.Random(seed)
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
+
+    filepath = os.path.join(data_dir, filename)
+    segments = ['retail', 'wholesale', 'online', 'partner', 'internal']
+    regions = [f'region_{i:02d}' for i in range(12)]
+
+    with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['id', 'segment', 'region', 'weight'])
+        for key in range(1, num_keys + 1):
+            if rng.random() < coverage:
+                writer.writerow([key, rng.choice(segments), rng.choice(regions),
+                                 f"{rng.uniform(0.1, 10.0):.3f}"])
+    return filepath
+
+
+def dataframe_rows(df):
+    """Linhas de um DataFrame como tuplas (formato usado pelos joins)"""
+    return list(df.itertuples(index=False, name=None))
+
+
+def hash_join(build_rows, probe_rows, build_key=0, probe_key=0):
+    """
+    Inner hash join em memória: tabela hash do lado build, varredura do probe.
+    Retorna lista de probe_row + build_row.
+    """
+    table = {}
+    for row in build_rows:
+        table.setdefault(row[build_key], []).append(row)
+
+    output = []
+    append = output.append
+    for row in probe_rows:
+        matches = table.get(row[probe_key])
+        if matches:
+            for match in matches:
+                append(row + match)
+    return output
+
+
+def sort_merge_join(left_rows, right_rows, left_key=0, right_key=0, presorted=True):
+    """
+    Inner sort-merge join. Com presorted=True as entradas já devem estar
+    ordenadas pela chave (caso dos dataset_* ordenados por id); caso contrário
+    são ordenadas antes. Chaves duplicadas geram o produto dos grupos.
+    """
+    if not presorted:
+        left_rows = sorted(left_rows, key=lambda r: r[left_key])
+        right_rows = sorted(right_rows, key=lambda r: r[right_key])
+
+    output = []
+    i, j = 0, 0
+    n_left, n_right = len(left_rows), len(right_rows)
+    while i < n_left and j < n_right:
+        left_value = left_rows[i][left_key]
+        right_value = right_rows[j][right_key]
+        if left_value < right_value:
+            i += 1
+        elif left_value > right_value:
+            j += 1
+        else:
+            # Delimitar o grupo de chaves iguais dos dois lados
+            i_end = i + 1
+            while i_end < n_left and left_rows[i_end][left_key] == left_value:
+                i_end += 1
+            j_end = j + 1
+            while j_end < n_right and right_rows[j_end][right_key] == right_value:
+                j_end += 1
+            for left in left_rows[i:i_end]:
+                for right in right_rows[j:j_end]:
+                    output.append(left + right)
+            i, j = i_end, j_end
+    return output
+
+
+class GraceHashJoin:
+    """
+    Hash join particionado (grace): quando o lado build não cabe em
+    memory_rows linhas, os dois lados são particionados por hash da chave em
+    arquivos temporários e cada par de partições é unido em memória.
+    Partições que ainda não cabem são reparticionadas com outro salt.
+    """
+
+    def __init__(self, memory_rows=100000, partitions=16, batch_rows=4096, tmp_dir=None,
+                 max_depth=4):
+        self.memory_rows = memory_rows
+        self.partitions = partitions
+        self.batch_rows = batch_rows
+        self.tmp_dir = tmp_dir
+        self.max_depth = max_depth
+        self.stats = {'spilled_rows': 0, 'partition_files': 0, 'max_depth': 0}
+
+    def _partition(self, rows, key, directory, side, salt):
+        """Espalha as linhas em arquivos por hash(salt, chave); retorna contagens"""
+        paths = [os.path.join(directory, f"{side}_{p}.bin") for p in range(self.partitions)]
+        files = [open(path, 'wb') for path in paths]
+        buffers = [[] for _ in range(self.partitions)]
+        counts = [0] * self.partitions
+        try:
+            for row in rows:
+                p = hash((salt, row[key])) % self.partitions
+                buffers[p].append(row)
+                counts[p] += 1
+                if len(buffers[p]) >= self.batch_rows:
+                    pickle.dump(buffers[p], files[p], protocol=pickle.HIGHEST_PROTOCOL)
+                    buffers[p] = []
+            for p, buffer in enumerate(buffers):
+                if buffer:
+                    pickle.dump(buffer, files[p], protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            for f in files:
+                f.close()
+        self.stats['spilled_rows'] += sum(counts)
+        self.stats['partition_files'] += len(paths)
+        return paths, counts
+
+    @staticmethod
+    def _read_partition(path):
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+                yield from batch
+
+    def join(self, build_rows, probe_rows, build_key=0, probe_key=0):
+        """
+        Executa o join. build_rows/probe_rows podem ser iteradores (ex.: leitura
+        em streaming do CSV), então o lado build nunca precisa caber inteiro.
+        """
+        output = []
+        directory = tempfile.mkdtemp(prefix='grace_join_', dir=self.tmp_dir)
+        try:
+            self._join(build_rows, probe_rows, build_key, probe_key, directory, 0, output)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        return output
+
+    def _join(self, build_rows, probe_rows, build_key, probe_key, directory, depth, output):
+        if isinstance(build_rows, list) and len(build_rows) <= self.memory_rows:
+            output.extend(hash_join(build_rows, probe_rows, build_key, probe_key))
+            return
+
+        self.stats['max_depth'] = max(self.stats['max_depth'], depth + 1)
+        level_dir = tempfile.mkdtemp(prefix=f'level{depth}_', dir=directory)
+        build_paths, build_counts = self._partition(build_rows, build_key, level_dir, 'build', depth)
+        probe_paths, probe_counts = self._partition(probe_rows, probe_key, level_dir, 'probe', depth)
+
+        for p in range(self.partitions):
+            if build_counts[p] == 0 or probe_counts[p] == 0:
+                continue
+            if build_counts[p] > self.memory_rows and depth + 1 < self.max_depth:
+                # Partição grande demais: reparticionar em streaming
+                self._join(self._read_partition(build_paths[p]), self._read_partition(probe_paths[p]),
+                           build_key, probe_key, level_dir, depth + 1, output)
+            else:
+                build = list(self._read_partition(build_paths[p]))
+                output.extend(hash_join(build, self._read_partition(probe_paths[p]),
+                                        build_key, probe_key))
+
+
+def grace_hash_join(build_rows, probe_rows, build_key=0, probe_key=0, memory_rows=100000,
+                    partitions=16, tmp_dir=None):
+    """Atalho funcional para GraceHashJoin"""
+    return GraceHashJoin(memory_rows, partitions, tmp_dir=tmp_dir).join(
+        build_rows, probe_rows, build_key, probe_key)
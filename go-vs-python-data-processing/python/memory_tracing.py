@@ -0,0 +1,152 @@
+import linecache
+import multiprocessing
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+# Aviso impresso (uma vez por processo) e salvo junto dos resultados rastreados
+TRACING_TIMING_NOTE = ("tracemalloc ativo (--trace-memory): alocações mais lentas, "
+                       "tempos não comparáveis com execuções sem rastreamento")
+_timing_note_printed = False
+
+
+class AllocationTracer:
+    """
+    Atribuição de alocações por site (arquivo:linha) usando tracemalloc.
+
+    Cada bloco rastreado gera um relatório com os maiores sites de alocação,
+    o pico de memória rastreada e os bytes alocados por linha do dataset.
+    Blocos podem ser aninhados (ex.: fase do BenchmarkSuite contendo leituras);
+    o pico do bloco externo continua correto.
+
+    O tracemalloc é global ao processo, então só rastreamos na thread
+    principal do processo principal: em threads ou processos filhos os
+    snapshots misturariam alocações de tarefas concorrentes.
+
+    Com o rastreamento ligado cada alocação fica mais lenta e os snapshots
+    custam tempo (snapshot_seconds no relatório): abra os blocos fora dos
+    spans que medem tempo, e não compare tempos de execuções com e sem
+    rastreamento (TRACING_TIMING_NOTE).
+    """
+
+    def __init__(self, top_n=10, frames=1):
+        self.top_n = top_n
+        self.frames = frames
+        self.reports = {}
+        self._stack = []
+        global _timing_note_printed
+        if not _timing_note_printed:
+            print(f"⚠️ {TRACING_TIMING_NOTE}")
+            _timing_note_printed = True
+
+    @staticmethod
+    def can_trace():
+        """Indica se o contexto atual permite atribuição confiável"""
+        return (threading.current_thread() is threading.main_thread()
+                and multiprocessing.parent_process() is None)
+
+    @contextmanager
+    def trace(self, name, rows=None):
+        """
+        Rastreia as alocações do bloco.
+
+        Produz um dict onde o chamador pode preencher 'rows' depois de saber
+        quantas linhas foram processadas (ex.: após um read_csv).
+        """
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start(self.frames)
+
+        # reset_peak apagaria o pico do bloco externo: guardamos antes
+        if self._stack:
+            _, current_peak = tracemalloc.get_traced_memory()
+            self._stack[-1]['peak_seen'] = max(self._stack[-1]['peak_seen'], current_peak)
+        tracemalloc.reset_peak()
+
+        record = {'rows': rows}
+        frame = {'peak_seen': 0}
+        self._stack.append(frame)
+
+        snapshot_start = time.perf_counter()
+        snapshot_before = tracemalloc.take_snapshot()
+        snapshot_seconds = time.perf_counter() - snapshot_start
+        current_before, _ = tracemalloc.get_traced_memory()
+        try:
+            yield record
+        finally:
+            current_after, peak = tracemalloc.get_traced_memory()
+            snapshot_start = time.perf_counter()
+            snapshot_after = tracemalloc.take_snapshot()
+            snapshot_seconds += time.perf_counter() - snapshot_start
+            peak = max(peak, frame['peak_seen'])
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]['peak_seen'] = max(self._stack[-1]['peak_seen'], peak)
+            if started_here:
+                tracemalloc.stop()
+
+            report = self._build_report(name, record.get('rows'), snapshot_before,
+                                        snapshot_after, current_before, current_after, peak)
+            report['snapshot_seconds'] = snapshot_seconds
+            self.reports[name] = report
+            self.print_report(report)
+
+    def _build_report(self, name, rows, snapshot_before, snapshot_after,
+                      current_before, current_after, peak):
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, linecache.__file__),
+        ]
+        diffs = snapshot_after.filter_traces(filters).compare_to(
+            snapshot_before.filter_traces(filters), 'lineno')
+
+        top_sites = []
+        for stat in sorted(diffs, key=lambda s: s.size_diff, reverse=True)[:self.top_n]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            top_sites.append({
+                'site': f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                'code': linecache.getline(frame.filename, frame.lineno).strip(),
+                'size_kb': stat.size_diff / 1024,
+                'count': stat.count_diff
+            })
+
+        peak_increase = max(peak - current_before, 0)
+        net_increase = current_after - current_before
+        report = {
+            'name': name,
+            'rows': rows,
+            'peak_traced_mb': peak / (1024 * 1024),
+            'peak_increase_mb': peak_increase / (1024 * 1024),
+            'net_traced_mb': net_increase / (1024 * 1024),
+            'top_allocations': top_sites
+        }
+        if rows:
+            report['peak_bytes_per_row'] = peak_increase / rows
+            report['net_bytes_per_row'] = net_increase / rows
+        return report
+
+    def print_report(self, report):
+        """Imprime o relatório de alocações de um bloco"""
+        print(f"\n🧠 ALOCAÇÕES: {report['name']}")
+        print(f"   • Pico rastreado: {report['peak_traced_mb']:.2f} MB "
+              f"(+{report['peak_increase_mb']:.2f} MB no bloco)")
+        print(f"   • Memória retida: {report['net_traced_mb']:+.2f} MB")
+        if 'peak_bytes_per_row' in report:
+            print(f"   • Bytes por linha: {report['peak_bytes_per_row']:,.1f} (pico) | "
+                  f"{report['net_bytes_per_row']:,.1f} (retidos)")
+        for site in report['top_allocations'][:5]:
+            print(f"   • {site['site']:<28} {site['size_kb']:>10,.1f} KB "
+                  f"{site['count']:>8,} objs  {site['code'][:50]}")
+
+
+def trace_allocations(tracer, name, rows=None):
+    """Retorna o contexto de rastreamento, ou um contexto vazio se desativado"""
+    if tracer is None or not AllocationTracer.can_trace():
+        return nullcontext({'rows': rows})
+    return tracer.trace(name, rows)
@@ -0,0 +1,52 @@
+import os
+
+# Modos de page cache suportados pelos benchmarks de leitura
+PAGE_CACHE_MODES = ('cold', 'warm')
+
+
+def evict_file(filepath):
+    """
+    Remove as páginas do arquivo do page cache do SO (posix_fadvise DONTNEED).
+    Páginas sujas não são descartadas, por isso o fsync antes.
+    Retorna False quando a plataforma não suporta posix_fadvise.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+
+    fd = os.open(filepath, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
+
+
+def pretouch_file(filepath, block_size=1024 * 1024):
+    """
+    Lê o arquivo inteiro em blocos para garantir que está no page cache.
+    Retorna o número de bytes lidos.
+    """
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    total = 0
+    with open(filepath, 'rb', buffering=0) as f:
+        while True:
+            read = f.readinto(view)
+            if not read:
+                break
+            total += read
+    return total
+
+
+def prepare_page_cache(filepath, mode):
+    """
+    Coloca o arquivo no estado de page cache pedido antes de uma leitura.
+    Retorna True se o estado foi garantido (cold pode não ser suportado).
+    """
+    if mode == 'cold':
+        return evict_file(filepath)
+    if mode == 'warm':
+        pretouch_file(filepath)
+        return True
+    raise ValueError(f"Modo de page cache desconhecido: {mode}")
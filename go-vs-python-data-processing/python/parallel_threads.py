@@ -1,28 +1,58 @@
-import pandas as pd
 import time
-import psutil
 import os
+import json
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
-import threading
-import multiprocessing
-from multiprocessing import Pool
+import sys
+from memory_tracing import AllocationTracer, trace_allocations
+from instrumentation import Tracer, export_trace, get_tracer, measure_resources, set_tracer
+from worker_timeline import map_timed, print_summary, summarize, write_timeline
+from process_dispatch import (DISPATCH_CHUNK_SIZES, DISPATCH_COMPONENTS, PAYLOAD_ENCODINGS,
+                              PAYLOAD_TRANSPORT, break_even_chunk_size, breakdown, dispatch)
+from hybrid_executor import (MIXED_STRATEGIES, HybridExecutor, compute_payload, mixed_stages,
+                             parse_payload, run_pipeline, run_pipelines_async, simulated_fetch)
+from executor_backends import (detect_backends, interpreter_pool_executor, process_chunk_plain,
+                               transform_values)
+from cpu_topology import PLACEMENTS, affinity_supported, describe_topology, pinned_pool_kwargs, read_topology
+from distributed_executor import (DISTRIBUTED_COMPONENTS, DistributedExecutor, LocalCluster, authkey_from_env,
+                                  parse_address)
+
+def split_chunks(data, num_chunks):
+    """
+    Divide data em num_chunks pares (chunk_id, fatia) de tamanho igual;
+    o último chunk leva o resto da divisão
+    """
+    chunk_size = len(data) // num_chunks
+    chunks = []
+    for i in range(num_chunks):
+        start_idx = i * chunk_size
+        end_idx = start_idx + chunk_size if i < num_chunks - 1 else len(data)
+        chunks.append((i, data[start_idx:end_idx]))
+    return chunks
 
 class ParallelProcessor:
     """
     Classe para testar processamento paralelo
     """
     
-    def __init__(self):
+    def __init__(self, trace_memory=False, tracer=None):
+        import psutil
+        
         self.process = psutil.Process()
         self.results = {}
+        # Atribuição de alocações (tracemalloc) opcional
+        self.memory_tracer = AllocationTracer() if trace_memory else None
+        # Spans de cada etapa (tracer padrão: desabilitado, só mede duração)
+        self.tracer = tracer or get_tracer()
+    
+    def __getstate__(self):
+        # psutil.Process não é serializável: o worker do ProcessPool recria o seu
+        state = self.__dict__.copy()
+        state['process'] = None
+        return state
     
     def measure_resources(self):
         """Mede uso atual de CPU e memória"""
-        return {
-            'cpu_percent': self.process.cpu_percent(),
-            'memory_mb': self.process.memory_info().rss / 1024 / 1024,
-            'memory_percent': self.process.memory_percent()
-        }
+        return measure_resources(self.process)
     
     def process_chunk(self, chunk_data):
         """
@@ -31,11 +61,8 @@ class ParallelProcessor:
         chunk_id, data = chunk_data
         
         # Simular processamento CPU-intensivo
-        result = []
-        for value in data:
-            # Operações matemáticas
-            processed = (value ** 2 + value * 3 + 17) % 1000
-            result.append(processed)
+        with trace_allocations(self.memory_tracer, f"process_chunk_{chunk_id}", rows=len(data)):
+            result = transform_values(data)
         
         return {
             'chunk_id': chunk_id,
@@ -69,128 +96,470 @@ class ParallelProcessor:
         print("PROCESSAMENTO SEQUENCIAL")
         print(f"{'='*50}")
         
-        resources_before = self.measure_resources()
-        start_time = time.time()
-        
-        # Dividir dados em chunks
-        chunk_size = len(data) // num_chunks
-        chunks = []
-        for i in range(num_chunks):
-            start_idx = i * chunk_size
-            end_idx = start_idx + chunk_size if i < num_chunks - 1 else len(data)
-            chunks.append((i, data[start_idx:end_idx]))
-        
-        # Processar sequencialmente
-        results = []
-        for chunk in chunks:
-            result = self.process_chunk(chunk)
-            results.append(result)
+        with self.tracer.span('sequential_processing', resources=True, chunks=num_chunks) as span:
+            chunks = split_chunks(data, num_chunks)
+            
+            # Processar sequencialmente (com a mesma timeline dos pools)
+            results, timeline, wall_start, wall_end = map_timed(None, self.process_chunk, chunks)
         
-        end_time = time.time()
-        execution_time = end_time - start_time
-        
-        resources_after = self.measure_resources()
-        memory_diff = resources_after['memory_mb'] - resources_before['memory_mb']
+        execution_time = span.duration
+        memory_diff = span.memory_diff_mb
+        utilization = summarize(timeline, wall_start, wall_end)
         
         print(f"📊 Chunks processados: {len(results)}")
         print(f"⏱️ Tempo total: {execution_time:.4f} segundos")
         print(f"🔋 Memória usada: {memory_diff:+.1f} MB")
+        print_summary('sequencial', utilization)
         
         return {
             'method': 'sequential',
             'execution_time': execution_time,
             'memory_diff': memory_diff,
-            'results': results
+            'results': results,
+            'timeline': timeline,
+            'worker_utilization': utilization
         }
     
-    def thread_parallel_processing(self, data, num_chunks=4, max_workers=4):
+    def thread_parallel_processing(self, data, num_chunks=4, max_workers=4, free_threaded=False):
         """
         Processamento paralelo com threads
+        free_threaded=True rotula o resultado como threads sem GIL (build
+        free-threaded), para não ser comparado com threads limitadas pela GIL
         """
+        method = 'threads_free_threaded' if free_threaded else 'threads'
         print(f"\n{'='*50}")
-        print(f"PROCESSAMENTO PARALELO - THREADS ({max_workers} workers)")
+        print(f"PROCESSAMENTO PARALELO - THREADS{' SEM GIL' if free_threaded else ''} ({max_workers} workers)")
         print(f"{'='*50}")
         
-        resources_before = self.measure_resources()
-        start_time = time.time()
-        
-        # Dividir dados em chunks
-        chunk_size = len(data) // num_chunks
-        chunks = []
-        for i in range(num_chunks):
-            start_idx = i * chunk_size
-            end_idx = start_idx + chunk_size if i < num_chunks - 1 else len(data)
-            chunks.append((i, data[start_idx:end_idx]))
-        
-        # Processar com ThreadPoolExecutor
-        results = []
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_results = executor.map(self.process_chunk, chunks)
-            results = list(future_results)
+        with self.tracer.span('thread_parallel_processing', resources=True, chunks=num_chunks,
+                              workers=max_workers) as span:
+            chunks = split_chunks(data, num_chunks)
+            
+            # Processar com ThreadPoolExecutor (worker, fila, início/fim e CPU por chunk)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results, timeline, wall_start, wall_end = map_timed(executor, self.process_chunk, chunks)
         
-        end_time = time.time()
-        execution_time = end_time - start_time
-        
-        resources_after = self.measure_resources()
-        memory_diff = resources_after['memory_mb'] - resources_before['memory_mb']
+        execution_time = span.duration
+        memory_diff = span.memory_diff_mb
+        utilization = summarize(timeline, wall_start, wall_end)
         
         print(f"📊 Chunks processados: {len(results)}")
         print(f"⏱️ Tempo total: {execution_time:.4f} segundos")
         print(f"🔋 Memória usada: {memory_diff:+.1f} MB")
         print(f"🧵 Threads utilizadas: {max_workers}")
+        print_summary(method, utilization)
         
         return {
-            'method': 'threads',
+            'method': method,
             'execution_time': execution_time,
             'memory_diff': memory_diff,
             'workers': max_workers,
-            'results': results
+            'results': results,
+            'timeline': timeline,
+            'worker_utilization': utilization
         }
     
-    def process_parallel_processing(self, data, num_chunks=4, max_workers=4):
+    def process_parallel_processing(self, data, num_chunks=4, max_workers=4, placement='none'):
         """
         Processamento paralelo com processos
+        placement: estratégia de afinidade dos workers (cpu_topology.PLACEMENTS)
         """
         print(f"\n{'='*50}")
-        print(f"PROCESSAMENTO PARALELO - PROCESSOS ({max_workers} workers)")
+        print(f"PROCESSAMENTO PARALELO - PROCESSOS ({max_workers} workers, posicionamento {placement})")
         print(f"{'='*50}")
         
-        resources_before = self.measure_resources()
-        start_time = time.time()
+        pool_kwargs, cpus = pinned_pool_kwargs(max_workers, placement)
+        with self.tracer.span('process_parallel_processing', resources=True, chunks=num_chunks,
+                              workers=max_workers, placement=placement) as span:
+            chunks = split_chunks(data, num_chunks)
+            
+            # Processar com ProcessPoolExecutor (a fila inclui o start dos processos)
+            with ProcessPoolExecutor(max_workers=max_workers, **pool_kwargs) as executor:
+                results, timeline, wall_start, wall_end = map_timed(executor, self.process_chunk, chunks)
+        
+        execution_time = span.duration
+        memory_diff = span.memory_diff_mb
+        utilization = summarize(timeline, wall_start, wall_end)
         
-        # Dividir dados em chunks
-        chunk_size = len(data) // num_chunks
-        chunks = []
-        for i in range(num_chunks):
-            start_idx = i * chunk_size
-            end_idx = start_idx + chunk_size if i < num_chunks - 1 else len(data)
-            chunks.append((i, data[start_idx:end_idx]))
+        print(f"📊 Chunks processados: {len(results)}")
+        print(f"⏱️ Tempo total: {execution_time:.4f} segundos")
+        print(f"🔋 Memória usada: {memory_diff:+.1f} MB")
+        print(f"🏭 Processos utilizados: {max_workers}")
+        if cpus is not None:
+            print(f"📌 CPUs ({placement}): {cpus}")
+        print_summary('processos', utilization)
+        
+        return {
+            'method': 'processes',
+            'execution_time': execution_time,
+            'memory_diff': memory_diff,
+            'workers': max_workers,
+            'placement': placement if cpus is not None else 'none',
+            'cpus': cpus,
+            'results': results,
+            'timeline': timeline,
+            'worker_utilization': utilization
+        }
+    
+    def interpreter_parallel_processing(self, data, num_chunks=4, max_workers=4):
+        """
+        Processamento paralelo com sub-interpretadores (InterpreterPoolExecutor,
+        Python 3.14+): cada worker tem a própria GIL, sem custo de processo.
+        Usa process_chunk_plain, pois o processor não vai para o interpretador
+        """
+        executor_class = interpreter_pool_executor()
+        if executor_class is None:
+            raise RuntimeError("InterpreterPoolExecutor indisponível nesta versão do Python")
         
-        # Processar com ProcessPoolExecutor
-        results = []
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
-            future_results = executor.map(self.process_chunk, chunks)
-            results = list(future_results)
+        print(f"\n{'='*50}")
+        print(f"PROCESSAMENTO PARALELO - SUB-INTERPRETADORES ({max_workers} workers)")
+        print(f"{'='*50}")
         
-        end_time = time.time()
-        execution_time = end_time - start_time
+        with self.tracer.span('interpreter_parallel_processing', resources=True, chunks=num_chunks,
+                              workers=max_workers) as span:
+            chunks = split_chunks(data, num_chunks)
+            
+            with executor_class(max_workers=max_workers) as executor:
+                results, timeline, wall_start, wall_end = map_timed(executor, process_chunk_plain, chunks)
         
-        resources_after = self.measure_resources()
-        memory_diff = resources_after['memory_mb'] - resources_before['memory_mb']
+        execution_time = span.duration
+        memory_diff = span.memory_diff_mb
+        utilization = summarize(timeline, wall_start, wall_end)
         
         print(f"📊 Chunks processados: {len(results)}")
         print(f"⏱️ Tempo total: {execution_time:.4f} segundos")
         print(f"🔋 Memória usada: {memory_diff:+.1f} MB")
-        print(f"🏭 Processos utilizados: {max_workers}")
+        print(f"🧩 Sub-interpretadores utilizados: {max_workers}")
+        print_summary('sub-interpretadores', utilization)
         
         return {
-            'method': 'processes',
+            'method': 'subinterpreters',
             'execution_time': execution_time,
             'memory_diff': memory_diff,
             'workers': max_workers,
-            'results': results
+            'results': results,
+            'timeline': timeline,
+            'worker_utilization': utilization
+        }
+    
+    def distributed_processing(self, data, num_chunks=8, workers=2, executor=None, fail_after=None,
+                               label='distribuído'):
+        """
+        Processamento com workers remotos (DistributedExecutor). Sem executor,
+        sobe um LocalCluster com workers processos em localhost; fail_after
+        faz um dos workers morrer após essa quantidade de tarefas, para
+        exercitar o reenvio. Usa process_chunk_plain: o worker remoto só
+        precisa de executor_backends, não do processor.
+        """
+        print(f"\n{'='*50}")
+        print(f"PROCESSAMENTO DISTRIBUÍDO - {label.upper()} ({workers} workers)")
+        print(f"{'='*50}")
+        
+        chunks = split_chunks(data, num_chunks)
+        expected = [process_chunk_plain(chunk) for chunk in chunks]
+        
+        cluster = None
+        if executor is None:
+            with self.tracer.span('distributed_cluster_startup', workers=workers) as span:
+                cluster = LocalCluster(workers=workers, fail_after=fail_after)
+            executor = cluster.executor
+            print(f"🚀 Cluster local (TCP em {executor.address[0]}:{executor.address[1]}): {span.duration:.4f}s")
+        
+        first_record = len(executor.records)
+        try:
+            with self.tracer.span('distributed_processing', chunks=num_chunks, workers=workers) as span:
+                results = executor.map(process_chunk_plain, chunks)
+            stats = dict(executor.stats)
+            workers_summary = executor.worker_summary()
+            parts = executor.breakdown(executor.records[first_record:])
+        finally:
+            if cluster is not None:
+                cluster.shutdown()
+        
+        if results != expected:
+            raise RuntimeError("Resultado distribuído diverge do sequencial")
+        
+        execution_time = span.duration
+        task_total = sum(parts[component] for component in DISTRIBUTED_COMPONENTS) or 1
+        print(f"📊 Chunks processados: {len(results)} (resultados conferidos com o sequencial)")
+        print(f"⏱️ Tempo total: {execution_time:.4f} segundos")
+        print(f"📦 Enviado: {parts['bytes_sent'] / 1024:,.1f} KB | recebido: {parts['bytes_received'] / 1024:,.1f} KB")
+        print("🧮 Soma dos tempos das tarefas: " + ' | '.join(
+            f"{component} {parts[component]:.4f}s ({parts[component] / task_total:.0%})"
+            for component in DISTRIBUTED_COMPONENTS))
+        for failure in stats['failures']:
+            print(f"💥 Worker {failure['worker']} descartado ({failure['reason']}), "
+                  f"{failure['tasks_lost']} tarefa(s) reenviada(s)")
+        for name, entry in workers_summary.items():
+            print(f"   👷 {name:<24} {entry['completed']:>3} tarefas | {'ativo' if entry['alive'] else 'descartado'}")
+        
+        return {
+            'method': 'distributed',
+            'execution_time': execution_time,
+            'workers': workers,
+            'results': results,
+            'breakdown': parts,
+            'redispatched': stats['redispatched'],
+            'failed_workers': stats['failed_workers'],
+            'failures': stats['failures'],
+            'worker_summary': workers_summary
         }
     
+    def run_distributed_comparison(self, data, workers=2, listen=None, remote_workers=None):
+        """
+        Cenário distribuído: cluster local via TCP (com e sem falha injetada)
+        ou, com listen='host:porta', workers remotos iniciados com
+        python -m cli worker --connect host:porta
+        """
+        results = {}
+        data = data or list(range(1, 100001))
+        if listen:
+            executor = DistributedExecutor(parse_address(listen), authkey_from_env())
+            print(f"\n📡 Aguardando {remote_workers or workers} workers em {listen}...")
+            try:
+                executor.wait_for_workers(remote_workers or workers, timeout=300)
+                results['distributed'] = self.distributed_processing(
+                    data, workers=remote_workers or workers, executor=executor, label='remoto')
+            finally:
+                executor.shutdown()
+            return results
+        
+        results['distributed'] = self.distributed_processing(data, workers=workers, label='cluster local')
+        if workers < 2:
+            # A falha injetada mata o único worker: não há para quem reenviar
+            print("\n⚠️ Cenário com falha injetada requer 2+ workers, ignorado")
+            return results
+        results['distributed_failure'] = self.distributed_processing(
+            data, workers=workers, fail_after=1, label='cluster local com falha')
+        return results
+    
+    def placement_scaling(self, data, worker_counts=(1, 2, 4), placements=PLACEMENTS, repeats=5,
+                          chunks_per_worker=4):
+        """
+        Escala de processos por estratégia de posicionamento: para cada
+        (placement, workers) um pool fixado é aquecido e medido repeats vezes.
+        Registra vazão média (valores/s), desvio padrão e coeficiente de
+        variação, já que fixar CPUs serve tanto para vazão quanto para ruído.
+        """
+        import statistics
+        
+        topology = read_topology()
+        print(f"\n{'='*60}")
+        print("ESCALA DE PROCESSOS POR POSICIONAMENTO DE CPU")
+        print(f"{'='*60}")
+        summary = describe_topology(topology)
+        print(f"🖥️ Topologia: {summary['cpus']} CPUs, {summary['physical_cores']} núcleos físicos, "
+              f"{summary['packages']} socket(s), {summary['nodes']} nó(s) NUMA")
+        if not affinity_supported():
+            print("⚠️ os.sched_setaffinity indisponível: só o posicionamento 'none' é medido")
+            placements = [placement for placement in placements if placement == 'none']
+        
+        data = data or list(range(100000))
+        results = {'topology': summary, 'repeats': repeats, 'placements': {}}
+        print(f"\n   {'Posição':<10} {'Workers':>7} {'CPUs':<16} {'Valores/s':>12} {'Desvio':>10} "
+              f"{'CV':>6} {'Speedup':>8}")
+        for placement in placements:
+            entries = results['placements'][placement] = {}
+            for workers in worker_counts:
+                num_chunks = workers * chunks_per_worker
+                chunks = split_chunks(data, num_chunks)
+                
+                pool_kwargs, cpus = pinned_pool_kwargs(workers, placement, topology)
+                times = []
+                with ProcessPoolExecutor(max_workers=workers, **pool_kwargs) as executor:
+                    list(executor.map(abs, range(workers)))
+                    for repeat in range(repeats):
+                        with self.tracer.span(f"placement_{placement}_{workers}w", repeat=repeat) as span:
+                            list(executor.map(self.process_chunk, chunks))
+                        times.append(span.duration)
+                
+                values = len(data)
+                throughputs = [values / elapsed for elapsed in times]
+                mean = statistics.mean(throughputs)
+                stdev = statistics.stdev(throughputs) if len(throughputs) > 1 else 0.0
+                entries[workers] = {
+                    'cpus': cpus,
+                    'times': times,
+                    'mean_throughput': mean,
+                    'stdev_throughput': stdev,
+                    'cv': stdev / mean if mean else 0.0
+                }
+                base = entries[min(entries)]['mean_throughput']
+                entries[workers]['speedup'] = mean / base
+                cpu_label = ','.join(map(str, cpus)) if cpus else 'livre'
+                print(f"   {placement:<10} {workers:>7} {cpu_label[:16]:<16} {mean:>12,.0f} {stdev:>10,.0f} "
+                      f"{entries[workers]['cv']:>6.1%} {entries[workers]['speedup']:>7.2f}x")
+        return results
+    
+    def dispatch_overhead_analysis(self, data, max_workers=2, encodings=PAYLOAD_ENCODINGS,
+                                   chunk_sizes=DISPATCH_CHUNK_SIZES, tasks_per_worker=1):
+        """
+        Decompõe o custo do despacho para processos (serialização, IPC,
+        desserialização e compute) por codificação do payload e tamanho de
+        chunk. Cada ponto usa max_workers * tasks_per_worker chunks do mesmo
+        tamanho (valores de data repetidos se preciso) e compara com o
+        process_chunk sequencial nos mesmos chunks. Com mais de uma tarefa
+        por worker, ipc_send passa a incluir a espera por um worker livre.
+        """
+        print(f"\n{'='*60}")
+        print(f"DESPACHO PARA PROCESSOS - DECOMPOSIÇÃO DO OVERHEAD ({max_workers} workers)")
+        print(f"{'='*60}")
+        
+        # Workers que de fato rodam em paralelo (limita a estimativa de break-even)
+        effective_workers = min(max_workers, os.cpu_count() or 1)
+        results = {'workers': max_workers, 'effective_workers': effective_workers, 'encodings': {}}
+        
+        with self.tracer.span('dispatch_overhead_analysis', workers=max_workers) as total_span:
+            # Pool reutilizado; o start dos processos é medido à parte
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                with self.tracer.span('dispatch_pool_startup') as span:
+                    list(executor.map(abs, range(max_workers)))
+                results['pool_startup_time'] = span.duration
+                print(f"🏭 Start do pool: {span.duration:.4f}s")
+                
+                for chunk_size in chunk_sizes:
+                    num_chunks = max_workers * tasks_per_worker
+                    total = chunk_size * num_chunks
+                    values = (data * (total // max(len(data), 1) + 1))[:total] if data else list(range(total))
+                    chunks = split_chunks(values, num_chunks)
+                    
+                    with self.tracer.span(f"dispatch_sequential_{chunk_size}") as span:
+                        expected = [self.process_chunk(chunk) for chunk in chunks]
+                    sequential_time = span.duration
+                    
+                    for encoding in encodings:
+                        with self.tracer.span(f"dispatch_{encoding}_{chunk_size}", chunks=num_chunks) as span:
+                            chunk_results, records, _, _ = dispatch(executor, self.process_chunk, chunks,
+                                                                    encoding)
+                        if chunk_results != expected:
+                            raise RuntimeError(f"Resultado divergente com a codificação {encoding}")
+                        entry = results['encodings'].setdefault(
+                            encoding, {'transport': PAYLOAD_TRANSPORT[encoding], 'points': []})
+                        entry['points'].append({
+                            'chunk_size': chunk_size,
+                            'chunks': num_chunks,
+                            'sequential_time': sequential_time,
+                            'process_time': span.duration,
+                            'speedup': sequential_time / span.duration,
+                            'breakdown': breakdown(records)
+                        })
+        
+        for encoding, entry in results['encodings'].items():
+            entry['break_even'] = break_even_chunk_size(entry['points'], effective_workers)
+            self.print_dispatch_breakdown(encoding, entry)
+        
+        results['execution_time'] = total_span.duration
+        return results
+    
+    def print_dispatch_breakdown(self, encoding, entry):
+        """
+        Tabela de uma codificação: tempos, speedup e fração de cada
+        componente na soma dos tempos das tarefas
+        """
+        labels = {'encode_args': 'ser', 'ipc_send': 'ipc→', 'decode_args': 'deser',
+                  'compute': 'comp', 'encode_result': 'ser.r', 'ipc_return': 'ipc←',
+                  'decode_result': 'des.r'}
+        print(f"\n📦 Codificação: {encoding} — transporte {entry['transport']}")
+        header = ''.join(f"{labels[component]:>7}" for component in DISPATCH_COMPONENTS)
+        print(f"   {'Chunk':>8} {'KB/tarefa':>10} {'Seq (s)':>9} {'Proc (s)':>9} {'Speedup':>8} {header}")
+        for point in entry['points']:
+            parts = point['breakdown']
+            task_total = sum(parts[component] for component in DISPATCH_COMPONENTS) or 1
+            shares = ''.join(f"{parts[component] / task_total:>7.0%}" for component in DISPATCH_COMPONENTS)
+            print(f"   {point['chunk_size']:>8,} {parts['payload_bytes'] / parts['tasks'] / 1024:>10.1f} "
+                  f"{point['sequential_time']:>9.4f} {point['process_time']:>9.4f} "
+                  f"{point['speedup']:>7.2f}x {shares}")
+        break_even = entry['break_even']
+        measured = f"{break_even['measured']:,} valores" if break_even['measured'] else 'não atingido'
+        estimated = f"~{break_even['estimated']:,} valores" if break_even['estimated'] else \
+            f"nunca compensa com {break_even['workers']} worker(s) efetivo(s)"
+        print(f"   ⚖️ Break-even: medido {measured} | estimado {estimated}")
+    
+    def mixed_workload_comparison(self, cpu_ratios=(0.2, 0.5, 0.8), num_jobs=48, job_time=0.01,
+                                  max_workers=2, threads_per_process=8, strategies=MIXED_STRATEGIES):
+        """
+        Carga mista fetch (I/O) -> parse -> compute (CPU). Cada job tem custo
+        nominal job_time, dividido entre cálculo (cpu_ratio) e espera de I/O.
+        Compara threads, processos, asyncio e o HybridExecutor (processos com
+        threads ou event loop por worker) com o mesmo total de vias de I/O.
+        """
+        from functools import partial
+        
+        total_threads = max_workers * threads_per_process
+        print(f"\n{'='*60}")
+        print(f"CARGA MISTA CPU/I-O ({num_jobs} jobs de {job_time*1000:.0f} ms, "
+              f"{max_workers} processos x {threads_per_process} threads)")
+        print(f"{'='*60}")
+        
+        # Calibração: custo de uma iteração de compute_payload nesta máquina
+        sample = parse_payload(simulated_fetch(0, io_time=0))
+        with self.tracer.span('mixed_calibration') as span:
+            compute_payload(sample, 200000)
+        iteration_time = span.duration / 200000
+        effective_workers = min(max_workers, os.cpu_count() or 1)
+        
+        # Pools criadas (e aquecidas) uma vez, fora das medições
+        thread_pool = ThreadPoolExecutor(max_workers=total_threads) if 'threads' in strategies else None
+        process_pool = ProcessPoolExecutor(max_workers=max_workers) if 'processes' in strategies else None
+        hybrid = HybridExecutor(max_workers, threads_per_process) if 'hybrid' in strategies else None
+        hybrid_async = HybridExecutor(max_workers, threads_per_process, io_mode='asyncio') \
+            if 'hybrid_asyncio' in strategies else None
+        if process_pool is not None:
+            list(process_pool.map(abs, range(max_workers)))
+        for executor in (hybrid, hybrid_async):
+            if executor is not None:
+                executor.warm_up()
+        
+        results = {'num_jobs': num_jobs, 'job_time': job_time, 'workers': max_workers,
+                   'threads_per_process': threads_per_process, 'iteration_time': iteration_time,
+                   'ratios': {}}
+        try:
+            for ratio in cpu_ratios:
+                io_time = job_time * (1 - ratio)
+                iterations = max(int(job_time * ratio / iteration_time), 1)
+                stages = mixed_stages(io_time, iterations)
+                async_stages = mixed_stages(io_time, iterations, asynchronous=True)
+                payloads = range(num_jobs)
+                
+                # Limite inferior: todo o CPU dividido pelos núcleos, ou um job inteiro
+                ideal_time = max(num_jobs * job_time * ratio / effective_workers, job_time)
+                entry = {'io_time': io_time, 'iterations': iterations, 'ideal_time': ideal_time,
+                         'strategies': {}}
+                expected = None
+                for strategy in strategies:
+                    with self.tracer.span(f"mixed_{strategy}_cpu{ratio:.2f}", jobs=num_jobs) as span:
+                        if strategy == 'threads':
+                            output = list(thread_pool.map(partial(run_pipeline, stages), payloads))
+                        elif strategy == 'processes':
+                            output = list(process_pool.map(partial(run_pipeline, stages), payloads))
+                        elif strategy == 'asyncio':
+                            output = run_pipelines_async(async_stages, payloads, total_threads)
+                        elif strategy == 'hybrid':
+                            output = hybrid.map(stages, payloads)
+                        else:
+                            output = hybrid_async.map(async_stages, payloads)
+                    if expected is None:
+                        expected = output
+                    elif output != expected:
+                        raise RuntimeError(f"Resultado divergente na estratégia {strategy}")
+                    entry['strategies'][strategy] = span.duration
+                results['ratios'][ratio] = entry
+        finally:
+            for executor in (thread_pool, process_pool, hybrid, hybrid_async):
+                if executor is not None:
+                    executor.shutdown()
+        
+        serial_time = num_jobs * job_time
+        print(f"\n   {'CPU %':>6} {'Ideal (s)':>10} " + ''.join(f"{strategy:>16}" for strategy in strategies))
+        for ratio, entry in results['ratios'].items():
+            times = ''.join(f"{entry['strategies'][strategy]:>9.4f}s {serial_time / entry['strategies'][strategy]:>4.1f}x"
+                            for strategy in strategies)
+            best = min(entry['strategies'], key=entry['strategies'].get)
+            print(f"   {ratio:>6.0%} {entry['ideal_time']:>10.4f} {times}   🏆 {best}")
+        print(f"   (Nx = tempo serial nominal {serial_time:.2f}s / tempo medido; "
+              f"{effective_workers} núcleo(s) efetivo(s))")
+        return results
+    
     def io_bound_sequential(self, num_tasks=10):
         """
         Tarefas I/O bound sequenciais
@@ -199,15 +568,13 @@ class ParallelProcessor:
         print(f"I/O BOUND - SEQUENCIAL ({num_tasks} tarefas)")
         print(f"{'='*50}")
         
-        start_time = time.time()
-        
-        results = []
-        for i in range(num_tasks):
-            result = self.io_bound_task(i)
-            results.append(result)
+        with self.tracer.span('io_bound_sequential', tasks=num_tasks) as span:
+            results = []
+            for i in range(num_tasks):
+                result = self.io_bound_task(i)
+                results.append(result)
         
-        end_time = time.time()
-        execution_time = end_time - start_time
+        execution_time = span.duration
         
         print(f"📊 Tarefas completadas: {len(results)}")
         print(f"⏱️ Tempo total: {execution_time:.4f} segundos")
@@ -228,14 +595,12 @@ class ParallelProcessor:
         print(f"I/O BOUND - THREADS ({num_tasks} tarefas, {max_workers} workers)")
         print(f"{'='*50}")
         
-        start_time = time.time()
+        with self.tracer.span('io_bound_threads', tasks=num_tasks, workers=max_workers) as span:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(self.io_bound_task, i) for i in range(num_tasks)]
+                results = [future.result() for future in futures]
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [executor.submit(self.io_bound_task, i) for i in range(num_tasks)]
-            results = [future.result() for future in futures]
-        
-        end_time = time.time()
-        execution_time = end_time - start_time
+        execution_time = span.duration
         
         print(f"📊 Tarefas completadas: {len(results)}")
         print(f"⏱️ Tempo total: {execution_time:.4f} segundos")
@@ -250,9 +615,11 @@ class ParallelProcessor:
             'avg_time_per_task': execution_time / num_tasks
         }
     
-    def run_cpu_bound_comparison(self, data):
+    def run_cpu_bound_comparison(self, data, max_workers=None, placement='none'):
         """
         Executa comparação completa de CPU bound
+        max_workers=None mantém o padrão (4 threads, 2 processos)
+        placement: afinidade dos workers de processo (cpu_topology.PLACEMENTS)
         """
         print(f"\n{'='*60}")
         print("TESTE DE PERFORMANCE - CPU BOUND")
@@ -261,21 +628,38 @@ class ParallelProcessor:
         
         results = {}
         
+        # Backends extras descobertos em tempo de execução
+        backends = detect_backends()
+        for name, backend in backends.items():
+            print(f"🧩 {name}: {'disponível' if backend['available'] else 'ignorado'} ({backend['reason']})")
+        
         # Sequencial
         results['sequential'] = self.sequential_processing(data)
         
-        # Threads
-        results['threads'] = self.thread_parallel_processing(data, max_workers=4)
+        # Threads (sem GIL o resultado fica separado das threads com GIL)
+        free_threaded = backends['free_threaded']['available']
+        threads_key = 'threads_free_threaded' if free_threaded else 'threads'
+        results[threads_key] = self.thread_parallel_processing(data, max_workers=max_workers or 4,
+                                                               free_threaded=free_threaded)
+        
+        # Sub-interpretadores (Python 3.14+)
+        if backends['subinterpreters']['available']:
+            try:
+                results['subinterpreters'] = self.interpreter_parallel_processing(
+                    data, max_workers=max_workers or 4)
+            except Exception as e:
+                print(f"⚠️ Erro com sub-interpretadores: {e}")
         
         # Processos (apenas se suportado)
         try:
-            results['processes'] = self.process_parallel_processing(data, max_workers=2)
+            results['processes'] = self.process_parallel_processing(data, max_workers=max_workers or 2,
+                                                                    placement=placement)
         except Exception as e:
             print(f"⚠️ Erro com processos paralelos: {e}")
         
         return results
     
-    def run_io_bound_comparison(self):
+    def run_io_bound_comparison(self, max_workers=None):
         """
         Executa comparação completa de I/O bound
         """
@@ -289,7 +673,7 @@ class ParallelProcessor:
         results['io_sequential'] = self.io_bound_sequential(num_tasks=8)
         
         # Threads
-        results['io_threads'] = self.io_bound_threads(num_tasks=8, max_workers=4)
+        results['io_threads'] = self.io_bound_threads(num_tasks=8, max_workers=max_workers or 4)
         
         return results
     
@@ -314,41 +698,121 @@ class ParallelProcessor:
                     print(f"   • {method.upper()}: {result['execution_time']:.4f}s "
                           f"({result['avg_time_per_task']:.4f}s/tarefa)")
         
-        # Calcular speedup
-        if cpu_results and 'sequential' in cpu_results and 'threads' in cpu_results:
-            if cpu_results['sequential'] and cpu_results['threads']:
-                sequential_time = cpu_results['sequential']['execution_time']
-                thread_time = cpu_results['threads']['execution_time']
-                speedup = sequential_time / thread_time
-                print(f"\n🚀 SPEEDUP (Threads vs Sequential): {speedup:.2f}x")
+        # Calcular speedup de cada backend paralelo
+        if cpu_results and cpu_results.get('sequential'):
+            sequential_time = cpu_results['sequential']['execution_time']
+            labels = {'threads': 'Threads', 'threads_free_threaded': 'Threads sem GIL',
+                      'subinterpreters': 'Sub-interpretadores', 'processes': 'Processos'}
+            for method, label in labels.items():
+                if cpu_results.get(method):
+                    speedup = sequential_time / cpu_results[method]['execution_time']
+                    print(f"\n🚀 SPEEDUP ({label} vs Sequential): {speedup:.2f}x")
+        
+        # Utilização por worker: CPU/ocupado baixo em threads = chunks esperando a GIL
+        if cpu_results:
+            print(f"\n👷 UTILIZAÇÃO POR WORKER (CPU BOUND):")
+            for method, result in cpu_results.items():
+                if result and result.get('worker_utilization'):
+                    utilization = result['worker_utilization'].values()
+                    busy = sum(entry['busy_time'] for entry in utilization)
+                    cpu = sum(entry['cpu_time'] for entry in utilization)
+                    mean_use = sum(entry['utilization'] for entry in utilization) / len(utilization)
+                    print(f"   • {method.upper()}: {len(utilization)} workers | ocupação média {mean_use:.1%} | "
+                          f"CPU/ocupado {cpu / busy if busy else 0:.1%}")
 
-def main():
+def save_parallel_results(scenario_results, results_dir, timestamp):
+    """
+    Grava os resultados dos cenários em python_parallel_results_<timestamp>.json,
+    sem as saídas por chunk ('results') nem a timeline (salva à parte)
+    """
+    def strip(value):
+        if isinstance(value, dict):
+            return {key: strip(item) for key, item in value.items() if key not in ('results', 'timeline')}
+        return value
+    
+    os.makedirs(results_dir, exist_ok=True)
+    filepath = os.path.join(results_dir, f"python_parallel_results_{timestamp}.json")
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(strip(scenario_results), f, indent=2, default=str)
+    print(f"\n💾 Resultados salvos em: {filepath}")
+    return filepath
+
+def main(data_dir='../data', max_workers=None, scenarios=('cpu', 'io'), trace_memory=None,
+         trace=None, results_dir='../results', encodings=PAYLOAD_ENCODINGS, cpu_ratios=(0.2, 0.5, 0.8),
+         strategies=MIXED_STRATEGIES, placement='none', listen=None, remote_workers=None):
     """
     Função principal
     """
     print("🚀 INICIANDO TESTE DE PARALELISMO - PYTHON")
     print("="*60)
     
-    processor = ParallelProcessor()
+    # Atribuição de alocações opcional: python parallel_threads.py --trace-memory
+    if trace_memory is None:
+        trace_memory = '--trace-memory' in sys.argv
+    # Timeline de spans opcional: --trace
+    if trace is None:
+        trace = '--trace' in sys.argv
+    tracer = set_tracer(Tracer(enabled=trace))
+    processor = ParallelProcessor(trace_memory=trace_memory, tracer=tracer)
     
     # Carregar dados do CSV para usar nos testes
-    csv_path = '../data/large_dataset.csv'
-    if os.path.exists(csv_path):
+    csv_path = os.path.join(data_dir, 'large_dataset.csv')
+    if not {'cpu', 'dispatch', 'placement', 'distributed'} & set(scenarios):
+        data = []
+    elif os.path.exists(csv_path):
+        import pandas as pd
+        
         print(f"📄 Carregando dados de: {csv_path}")
-        df = pd.read_csv(csv_path)
-        data = df['value'].tolist()
+        with trace_allocations(processor.memory_tracer, "main_read_csv") as allocations:
+            df = pd.read_csv(csv_path)
+            allocations['rows'] = len(df)
+        with trace_allocations(processor.memory_tracer, "main_value_tolist", rows=len(df)):
+            data = df['value'].tolist()
         print(f"📊 Dados carregados: {len(data):,} valores")
     else:
         print("⚠️ Arquivo CSV não encontrado, gerando dados sintéticos...")
         data = list(range(1, 10001))  # Dados de 1 a 10000
     
     # Executar testes
-    cpu_results = processor.run_cpu_bound_comparison(data)
-    io_results = processor.run_io_bound_comparison()
+    timestamp = time.strftime('%Y%m%d_%H%M%S')
+    cpu_results = processor.run_cpu_bound_comparison(data, max_workers, placement) if 'cpu' in scenarios else {}
+    io_results = processor.run_io_bound_comparison(max_workers) if 'io' in scenarios else {}
+    scenario_results = {'scenarios': list(scenarios), 'max_workers': max_workers, 'placement': placement,
+                        'cpu': cpu_results, 'io': io_results}
+    # Decomposição do overhead de despacho para processos e break-even
+    if 'dispatch' in scenarios:
+        scenario_results['dispatch'] = processor.dispatch_overhead_analysis(data, max_workers=max_workers or 2,
+                                                                            encodings=encodings)
+    # Escala de processos por posicionamento de CPU (vazão e variância)
+    if 'placement' in scenarios:
+        worker_counts = sorted({1, 2, max_workers or os.cpu_count() or 1})
+        scenario_results['placement_scaling'] = processor.placement_scaling(data, worker_counts=worker_counts)
+    # Workers remotos via TCP (cluster local como stand-in, ou --listen)
+    if 'distributed' in scenarios:
+        scenario_results['distributed'] = processor.run_distributed_comparison(
+            data, workers=max_workers or 2, listen=listen, remote_workers=remote_workers)
+    # Carga mista fetch -> parse -> compute: threads, processos, asyncio e híbrido
+    if 'mixed' in scenarios:
+        scenario_results['mixed'] = processor.mixed_workload_comparison(
+            cpu_ratios=cpu_ratios, max_workers=max_workers or 2, strategies=strategies)
     
     # Mostrar resumo
     processor.print_comparison_summary(cpu_results, io_results)
     
+    # Timeline por chunk/worker das execuções CPU bound
+    runs = [(method, result['timeline']) for method, result in cpu_results.items()
+            if result and result.get('timeline')]
+    if runs:
+        timeline_path = os.path.join(results_dir, f"python_parallel_workers_{timestamp}.trace.json")
+        write_timeline(timeline_path, runs)
+        print(f"\n🧭 Timeline por worker (chrome://tracing / ui.perfetto.dev): {timeline_path}")
+        scenario_results['worker_timeline'] = timeline_path
+    
+    if trace:
+        export_trace(tracer, results_dir, 'python_parallel', timestamp)
+    
+    save_parallel_results(scenario_results, results_dir, timestamp)
+    
     print(f"\n✅ TESTES DE PARALELISMO CONCLUÍDOS!")
 
 if __name__ == "__main__":
@@ -1,25 +1,49 @@
-import pandas as pd
-import time
-import psutil
 import os
-from pathlib import Path
+import sys
+from memory_tracing import AllocationTracer, trace_allocations
+from instrumentation import Tracer, export_trace, get_tracer, measure_resources, set_tracer
+
+# Backends de leitura disponíveis em load_csv
+READ_METHODS = ('pandas', 'csv')
+
+def load_csv(filepath, method='pandas'):
+    """
+    Carrega o CSV em um DataFrame usando o backend escolhido.
+    pandas é importado aqui para não pesar no startup de quem não lê dados.
+    """
+    import pandas as pd
+    
+    if method == 'pandas':
+        return pd.read_csv(filepath)
+    if method == 'csv':
+        # Método alternativo usando csv padrão
+        import csv
+        with open(filepath, 'r', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            data = list(reader)
+        df = pd.DataFrame(data)
+        df['value'] = pd.to_numeric(df['value'])
+        return df
+    raise ValueError(f"Método de leitura desconhecido: {method}")
 
 class DataProcessor:
     """
     Classe para processar dados e medir performance
     """
     
-    def __init__(self):
+    def __init__(self, trace_memory=False, tracer=None):
+        import psutil
+        
         self.process = psutil.Process()
         self.results = {}
+        # Atribuição de alocações (tracemalloc) opcional
+        self.memory_tracer = AllocationTracer() if trace_memory else None
+        # Spans de cada etapa (tracer padrão: desabilitado, só mede duração)
+        self.tracer = tracer or get_tracer()
     
     def measure_resources(self):
         """Mede uso atual de CPU e memória"""
-        return {
-            'cpu_percent': self.process.cpu_percent(),
-            'memory_mb': self.process.memory_info().rss / 1024 / 1024,
-            'memory_percent': self.process.memory_percent()
-        }
+        return measure_resources(self.process)
     
     def read_csv_with_timing(self, filepath, method='pandas'):
         """
@@ -39,32 +63,20 @@ class DataProcessor:
         file_size = os.path.getsize(filepath)
         print(f"📁 Tamanho do arquivo: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)")
         
-        # Recursos iniciais
-        resources_before = self.measure_resources()
-        print(f"🔋 Recursos ANTES - CPU: {resources_before['cpu_percent']:.1f}% | "
-              f"Memória: {resources_before['memory_mb']:.1f} MB ({resources_before['memory_percent']:.1f}%)")
-        
-        # Medir tempo de leitura
-        start_time = time.time()
-        
         try:
-            if method == 'pandas':
-                df = pd.read_csv(filepath)
-            else:
-                # Método alternativo usando csv padrão
-                import csv
-                data = []
-                with open(filepath, 'r', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    data = list(reader)
-                df = pd.DataFrame(data)
-                df['value'] = pd.to_numeric(df['value'])
-            
-            end_time = time.time()
-            execution_time = end_time - start_time
+            # Tempo de leitura e recursos antes/depois
+            # Snapshots do tracemalloc fora do span: não entram no tempo medido
+            with trace_allocations(self.memory_tracer, f"read_csv_{method}_{os.path.basename(filepath)}") as allocations, \
+                    self.tracer.span(f"read_csv_{method}", resources=True, file=os.path.basename(filepath)) as span:
+                resources_before = span.resources_before
+                print(f"🔋 Recursos ANTES - CPU: {resources_before['cpu_percent']:.1f}% | "
+                      f"Memória: {resources_before['memory_mb']:.1f} MB ({resources_before['memory_percent']:.1f}%)")
+                df = load_csv(filepath, method)
+                allocations['rows'] = len(df)
+                span.set(rows=len(df))
             
-            # Recursos finais
-            resources_after = self.measure_resources()
+            execution_time = span.duration
+            resources_after = span.resources_after
             
             # Informações do dataset
             print(f"\n📊 DADOS CARREGADOS:")
@@ -116,26 +128,22 @@ class DataProcessor:
         print("EXECUTANDO CÁLCULOS BÁSICOS")
         print(f"{'='*50}")
         
-        resources_before = self.measure_resources()
-        start_time = time.time()
-        
         try:
             # Cálculos básicos
-            calculations = {
-                'soma_total': df['value'].sum(),
-                'media': df['value'].mean(),
-                'mediana': df['value'].median(),
-                'min_valor': df['value'].min(),
-                'max_valor': df['value'].max(),
-                'desvio_padrao': df['value'].std(),
-                'count': len(df)
-            }
+            with trace_allocations(self.memory_tracer, "basic_calculations", rows=len(df)), \
+                    self.tracer.span("basic_calculations", resources=True, rows=len(df)) as span:
+                calculations = {
+                    'soma_total': df['value'].sum(),
+                    'media': df['value'].mean(),
+                    'mediana': df['value'].median(),
+                    'min_valor': df['value'].min(),
+                    'max_valor': df['value'].max(),
+                    'desvio_padrao': df['value'].std(),
+                    'count': len(df)
+                }
             
-            end_time = time.time()
-            execution_time = end_time - start_time
-            
-            resources_after = self.measure_resources()
-            memory_diff = resources_after['memory_mb'] - resources_before['memory_mb']
+            execution_time = span.duration
+            memory_diff = span.memory_diff_mb
             
             print(f"\n📈 RESULTADOS DOS CÁLCULOS:")
             for key, value in calculations.items():
@@ -154,7 +162,32 @@ class DataProcessor:
             print(f"❌ Erro nos cálculos: {e}")
             return None
     
-    def compare_reading_methods(self, filepath):
+    def incremental_calculations(self, filepath, column='value', watch=False, interval=1.0,
+                                 row_index=None):
+        """
+        Estatísticas incrementais para arquivos append-only: só os bytes
+        acrescentados desde a última execução são lidos (estado salvo ao lado
+        do CSV). Com watch=True acompanha o arquivo até Ctrl+C. O índice de
+        linhas do CSV sai do recálculo completo; row_index=True também o
+        estende nos updates incrementais e False o desliga.
+        """
+        from incremental_stats import IncrementalStats, print_update
+        
+        print(f"\n{'='*50}")
+        print(f"ESTATÍSTICAS INCREMENTAIS: {os.path.basename(filepath)}")
+        print(f"{'='*50}")
+        
+        incremental = IncrementalStats(filepath, column, row_index=row_index)
+        if watch:
+            print(f"👀 Acompanhando {filepath} a cada {interval}s (Ctrl+C para sair)")
+            incremental.watch(interval)
+            return incremental.state
+        
+        result = incremental.update()
+        print_update(result)
+        return result
+    
+    def compare_reading_methods(self, filepath, methods=None):
         """
         Compara diferentes métodos de leitura
         """
@@ -162,7 +195,8 @@ class DataProcessor:
         print("COMPARAÇÃO DE MÉTODOS DE LEITURA")
         print(f"{'='*60}")
         
-        methods = ['pandas']  # Pode adicionar mais métodos depois
+        if methods is None:
+            methods = ['pandas']
         
         for method in methods:
             df = self.read_csv_with_timing(filepath, method)
@@ -192,18 +226,25 @@ class DataProcessor:
             print(f"   • Velocidade: {result['rows_per_second']:,.0f} linhas/s")
             print(f"   • Memória usada: {result['memory_diff_mb']:+.1f} MB")
 
-def main():
+def main(data_dir='../data', methods=None, trace_memory=None, trace=None, results_dir='../results'):
     """
     Função principal
     """
     print("🚀 INICIANDO TESTE DE PERFORMANCE - PYTHON")
     print("="*60)
     
-    processor = DataProcessor()
+    # Atribuição de alocações opcional: python process_data.py --trace-memory
+    if trace_memory is None:
+        trace_memory = '--trace-memory' in sys.argv
+    # Timeline de spans opcional: --trace
+    if trace is None:
+        trace = '--trace' in sys.argv
+    tracer = set_tracer(Tracer(enabled=trace))
+    processor = DataProcessor(trace_memory=trace_memory, tracer=tracer)
     
     # Caminhos dos arquivos
-    large_dataset_path = '../data/large_dataset.csv'
-    sample_dataset_path = '../data/sample_dataset.csv'
+    large_dataset_path = os.path.join(data_dir, 'large_dataset.csv')
+    sample_dataset_path = os.path.join(data_dir, 'sample_dataset.csv')
     
     # Verificar se o dataset grande existe
     if not os.path.exists(large_dataset_path):
@@ -211,22 +252,25 @@ def main():
         print("🔄 Gerando dataset...")
         
         # Importar e executar gerador
-        from generate_large_dataset import generate_large_dataset
-        generate_large_dataset()
+        from benchmark_suite import generate_large_dataset
+        generate_large_dataset(data_dir=data_dir)
     
     # Testar com dataset grande
     if os.path.exists(large_dataset_path):
         print(f"\n🎯 TESTANDO COM DATASET GRANDE")
-        processor.compare_reading_methods(large_dataset_path)
+        processor.compare_reading_methods(large_dataset_path, methods)
     
     # Testar com dataset pequeno para comparação
     if os.path.exists(sample_dataset_path):
         print(f"\n🎯 TESTANDO COM DATASET PEQUENO (comparação)")
-        processor.compare_reading_methods(sample_dataset_path)
+        processor.compare_reading_methods(sample_dataset_path, methods)
     
     # Mostrar resumo
     processor.print_summary()
     
+    if trace:
+        export_trace(tracer, results_dir, 'python_process')
+    
     print(f"\n✅ TESTE CONCLUÍDO!")
 
 if __name__ == "__main__":
@@ -0,0 +1,193 @@
+import pickle
+import threading
+import time
+from array import array
+
+# Codificações do payload (chunk_id, valores) enviado a cada tarefa
+PAYLOAD_ENCODINGS = ('pickle', 'pickle5', 'array')
+
+# Como os valores de cada codificação chegam ao worker. O ProcessPool
+# re-serializa os argumentos da tarefa em banda, então o buffer do protocolo 5
+# é copiado para bytes antes do envio: não há transporte out-of-band
+PAYLOAD_TRANSPORT = {
+    'pickle': 'in-band',
+    'pickle5': 'in-band + cópia (buffer do protocolo 5 copiado para bytes)',
+    'array': 'in-band (bytes crus do array)',
+}
+
+# Componentes do custo de uma tarefa despachada a um processo
+DISPATCH_COMPONENTS = ('encode_args', 'ipc_send', 'decode_args', 'compute', 'encode_result',
+                       'ipc_return', 'decode_result')
+
+# Tamanhos de chunk (valores por tarefa) da análise de break-even
+DISPATCH_CHUNK_SIZES = (1_000, 4_000, 16_000, 64_000, 256_000)
+
+# Relógio monotônico do sistema: comparável entre processos no mesmo host
+_clock = time.monotonic_ns
+
+
+def _typecode(values):
+    """'q' para inteiros, 'd' caso contrário (array exige tipo homogêneo)"""
+    return 'q' if all(type(value) is int for value in values) else 'd'
+
+
+def encode_payload(chunk_id, values, encoding='pickle'):
+    """
+    Serializa (chunk_id, valores) no processo pai.
+    pickle: lista inteira com o protocolo padrão (um opcode por valor).
+    pickle5: protocolo 5 com o array separado do cabeçalho pickle, que fica
+    pequeno; o buffer é copiado para bytes e viaja em banda junto com os
+    argumentos da tarefa (ver PAYLOAD_TRANSPORT).
+    array: bytes crus de array.array, sem pickle nos valores.
+    """
+    if encoding == 'pickle':
+        return pickle.dumps((chunk_id, values))
+    typecode = _typecode(values)
+    values = array(typecode, values)
+    if encoding == 'pickle5':
+        buffers = []
+        header = pickle.dumps((chunk_id, typecode, pickle.PickleBuffer(values)), protocol=5,
+                              buffer_callback=buffers.append)
+        # O executor só transporta objetos serializáveis: o buffer vira bytes
+        # (uma cópia), e esses bytes são serializados em banda com a tarefa
+        return header, [bytes(buffer.raw()) for buffer in buffers]
+    if encoding == 'array':
+        return chunk_id, typecode, values.tobytes()
+    raise ValueError(f"Codificação desconhecida: {encoding}")
+
+
+def decode_payload(payload, encoding='pickle'):
+    """
+    Reconstrói (chunk_id, valores) no worker. pickle5 e array devolvem um
+    memoryview tipado sobre os bytes recebidos, sem copiar os valores.
+    """
+    if encoding == 'pickle':
+        return pickle.loads(payload)
+    if encoding == 'pickle5':
+        header, buffers = payload
+        chunk_id, typecode, raw = pickle.loads(header, buffers=buffers)
+        return chunk_id, memoryview(raw).cast(typecode)
+    if encoding == 'array':
+        chunk_id, typecode, raw = payload
+        return chunk_id, memoryview(raw).cast(typecode)
+    raise ValueError(f"Codificação desconhecida: {encoding}")
+
+
+def payload_size(payload, encoding='pickle'):
+    """Bytes do payload codificado"""
+    if encoding == 'pickle':
+        return len(payload)
+    if encoding == 'pickle5':
+        header, buffers = payload
+        return len(header) + sum(len(buffer) for buffer in buffers)
+    return len(payload[2])
+
+
+def run_encoded(function, encoding, payload, submit_ns):
+    """
+    Lado do worker: decodifica o payload, executa function e serializa o
+    resultado, medindo cada etapa. Função de módulo para o ProcessPool.
+    """
+    start_ns = _clock()
+    chunk = decode_payload(payload, encoding)
+    decoded_ns = _clock()
+    result = function(chunk)
+    computed_ns = _clock()
+    encoded = pickle.dumps(result)
+    end_ns = _clock()
+    return encoded, {
+        'ipc_send_ns': start_ns - submit_ns,
+        'decode_args_ns': decoded_ns - start_ns,
+        'compute_ns': computed_ns - decoded_ns,
+        'encode_result_ns': end_ns - computed_ns,
+        'end_ns': end_ns
+    }
+
+
+def dispatch(executor, function, chunks, encoding='pickle'):
+    """
+    Submete function(chunk) para cada (chunk_id, valores) com o payload
+    codificado em encoding e decompõe o custo de cada tarefa:
+    encode_args (pai), ipc_send (envio + espera por um worker livre),
+    decode_args, compute e encode_result (worker), ipc_return (volta do
+    resultado até o pai) e decode_result (pai).
+    Retorna (resultados na ordem dos chunks, registros, início, fim).
+    """
+    wall_start = _clock()
+    # Chegada de cada resultado (done-callback); o callback roda depois de
+    # future.result() liberar quem espera, então a leitura pode vir antes
+    received_ns = {}
+    received_lock = threading.Lock()
+    submitted = []
+    for index, (chunk_id, values) in enumerate(chunks):
+        encode_start = _clock()
+        payload = encode_payload(chunk_id, values, encoding)
+        submit_ns = _clock()
+        future = executor.submit(run_encoded, function, encoding, payload, submit_ns)
+
+        def mark_received(_, index=index):
+            now = _clock()
+            with received_lock:
+                received_ns.setdefault(index, now)
+        future.add_done_callback(mark_received)
+        submitted.append((future, submit_ns - encode_start, payload_size(payload, encoding)))
+
+    results = []
+    records = []
+    for index, (future, encode_ns, size) in enumerate(submitted):
+        encoded, record = future.result()
+        now = _clock()
+        with received_lock:
+            received = received_ns.setdefault(index, now)
+        decode_start = _clock()
+        results.append(pickle.loads(encoded))
+        record['decode_result_ns'] = _clock() - decode_start
+        record['encode_args_ns'] = encode_ns
+        record['ipc_return_ns'] = received - record.pop('end_ns')
+        record['payload_bytes'] = size
+        records.append(record)
+    return results, records, wall_start, _clock()
+
+
+def breakdown(records):
+    """Tempo total (s) de cada componente, bytes enviados e número de tarefas"""
+    totals = {component: sum(record[f"{component}_ns"] for record in records) / 1e9
+              for component in DISPATCH_COMPONENTS}
+    totals['overhead'] = sum(totals[component] for component in DISPATCH_COMPONENTS
+                             if component != 'compute')
+    totals['payload_bytes'] = sum(record['payload_bytes'] for record in records)
+    totals['tasks'] = len(records)
+    return totals
+
+
+def break_even_chunk_size(points, workers):
+    """
+    Tamanho de chunk a partir do qual processos vencem o sequencial.
+
+    measured: menor chunk_size medido com process_time < sequential_time.
+    estimated: modelo linear por tarefa, overhead = a + b*c e compute = s*c;
+    com W workers efetivos o custo por valor é (a/c + b + s)/W, que fica
+    abaixo de s quando c > a / (s*(W-1) - b). None se W = 1 ou se o
+    overhead por valor (b) já supera o ganho: nesse caso nunca compensa.
+    """
+    measured = next((point['chunk_size'] for point in sorted(points, key=lambda p: p['chunk_size'])
+                     if point['process_time'] < point['sequential_time']), None)
+
+    # Mínimos quadrados: overhead por tarefa em função de c, compute pela origem
+    sizes = [point['chunk_size'] for point in points]
+    overheads = [point['breakdown']['overhead'] / point['breakdown']['tasks'] for point in points]
+    computes = [point['breakdown']['compute'] / point['breakdown']['tasks'] for point in points]
+    estimated = None
+    if len(points) >= 2:
+        mean_size = sum(sizes) / len(sizes)
+        mean_overhead = sum(overheads) / len(overheads)
+        variance = sum((size - mean_size) ** 2 for size in sizes)
+        slope = sum((size - mean_size) * (overhead - mean_overhead)
+                    for size, overhead in zip(sizes, overheads)) / variance if variance else 0.0
+        intercept = max(mean_overhead - slope * mean_size, 0.0)
+        per_value = sum(compute * size for compute, size in zip(computes, sizes)) / \
+            sum(size * size for size in sizes)
+        gain = per_value * (workers - 1) - slope
+        if gain > 0:
+            estimated = int(intercept / gain) + 1
+    return {'measured': measured, 'estimated': estimated, 'workers': workers}
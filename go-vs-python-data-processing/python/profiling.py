@@ -0,0 +1,218 @@
+import cProfile
+import os
+import signal
+import sys
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+
+
+class StackSampler:
+    """
+    Profiler por amostragem baseado em sinais (SIGPROF / setitimer).
+
+    A cada intervalo de tempo de CPU do processo o handler do sinal percorre
+    as pilhas de todas as threads (sys._current_frames) e acumula a pilha no
+    formato "collapsed" (frames separados por ';'), consumido diretamente por
+    ferramentas de flamegraph (flamegraph.pl, speedscope, inferno).
+
+    Limitações: só funciona em sistemas POSIX e precisa ser iniciado na thread
+    principal; chamadas longas em C (ex.: pd.read_csv) só são amostradas
+    quando devolvem o controle ao interpretador.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._previous_handler = None
+        self._running = False
+
+    @staticmethod
+    def is_supported():
+        """Indica se o sampler pode rodar neste processo"""
+        return (hasattr(signal, 'setitimer') and hasattr(signal, 'SIGPROF')
+                and threading.current_thread() is threading.main_thread())
+
+    @staticmethod
+    def _frame_label(frame):
+        code = frame.f_code
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        return f"{module}:{code.co_name}"
+
+    def _handle_signal(self, signum, frame):
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, top_frame in sys._current_frames().items():
+            # O frame do próprio handler não interessa
+            if thread_id == threading.get_ident():
+                top_frame = frame
+            labels = []
+            current = top_frame
+            while current is not None:
+                labels.append(self._frame_label(current))
+                current = current.f_back
+            labels.append(thread_names.get(thread_id, f"thread-{thread_id}"))
+            labels.reverse()
+            self.stacks[';'.join(labels)] += 1
+        self.samples += 1
+
+    def start(self):
+        """Inicia a amostragem"""
+        if self._running:
+            return
+        self._previous_handler = signal.signal(signal.SIGPROF, self._handle_signal)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        self._running = True
+
+    def stop(self):
+        """Interrompe a amostragem e restaura o handler anterior"""
+        if not self._running:
+            return
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        self._running = False
+
+    def collapsed(self):
+        """Retorna as pilhas no formato collapsed (uma por linha: pilha contagem)"""
+        lines = [f"{stack} {count}" for stack, count in sorted(self.stacks.items())]
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def write_collapsed(self, filepath):
+        """Salva as pilhas no formato collapsed"""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
+        return filepath
+
+
+def without_sampler(profiler):
+    """
+    pstats.Stats do cProfile sem as chamadas do handler do StackSampler.
+
+    Com os dois profilers no mesmo bloco o handler do SIGPROF roda sob o
+    cProfile e aparece no .pstats. Removemos o handler e _frame_label e,
+    como no gprof, descontamos das funções chamadas por eles a fração das
+    chamadas e do tempo que veio do sampler, propagando essa fração para as
+    chamadas delas (ex.: os.path.basename chamado pelo usuário e pelo
+    handler perde só a parte do handler). Fica no tempo cumulativo da
+    função interrompida (e das ancestrais) o custo das amostras, pequeno
+    perto do intervalo de amostragem.
+    """
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    entries = stats.stats
+    sampler_file = StackSampler._handle_signal.__code__.co_filename
+    # Fração das chamadas de cada função que veio do sampler
+    shares = {func: 1.0 for func in entries
+              if func[0] == sampler_file and func[2] in ('_handle_signal', '_frame_label')}
+    queue = deque(shares)
+    visited = set()
+    while queue:
+        func = queue.popleft()
+        if func in visited:
+            continue
+        visited.add(func)
+        share = min(shares[func], 1.0)
+        for callee, (cc, nc, tt, ct, callers) in list(entries.items()):
+            if callee == func or func not in callers:
+                continue
+            # callers: {chamador: (chamadas, primitivas, tt, ct)}
+            caller_nc, caller_cc, caller_tt, caller_ct = callers[func]
+            removed_nc, removed_cc = round(caller_nc * share), round(caller_cc * share)
+            # Chamada do handler com a própria função interrompida na pilha é
+            # recursiva na entrada (nc - cc), mas primitiva no par chamador->função
+            entry_removed_cc = max(removed_cc - (nc - cc), 0)
+            if share >= 1.0:
+                del callers[func]
+            else:
+                callers[func] = (caller_nc - removed_nc, caller_cc - removed_cc,
+                                 caller_tt * (1 - share), caller_ct * (1 - share))
+            entries[callee] = (cc - entry_removed_cc, nc - removed_nc, max(tt - caller_tt * share, 0.0),
+                               max(ct - caller_ct * share, 0.0), callers)
+            if removed_nc:
+                shares[callee] = shares.get(callee, 0.0) + removed_nc / nc
+                queue.append(callee)
+        if share >= 1.0:
+            del entries[func]
+
+    # Totais recalculados sobre as entradas que sobraram
+    stats.total_calls = stats.prim_calls = 0
+    stats.total_tt = 0
+    stats.top_level = set()
+    stats.max_name_len = 0
+    stats.get_top_level_stats()
+    return stats
+
+
+class BenchmarkProfiler:
+    """
+    Captura de profiling por caso de benchmark.
+
+    Para cada caso gera <caso>.pstats (cProfile, determinístico) e
+    <caso>.collapsed (StackSampler, amostragem) dentro de output_dir.
+    Os dois rodam juntos; o handler do sampler é filtrado do .pstats
+    (without_sampler).
+    """
+
+    PROFILERS = ('cprofile', 'sampling')
+
+    def __init__(self, output_dir, profilers=PROFILERS, interval=0.005):
+        unknown = set(profilers) - set(self.PROFILERS)
+        if unknown:
+            raise ValueError(f"Profilers desconhecidos: {sorted(unknown)}")
+        self.output_dir = output_dir
+        self.profilers = tuple(profilers)
+        self.interval = interval
+        self.cases = {}
+
+    @contextmanager
+    def profile(self, case_name):
+        """
+        Context manager que perfila o bloco e salva os arquivos do caso
+        """
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+
+        profiler = cProfile.Profile() if 'cprofile' in self.profilers else None
+        sampler = None
+        if 'sampling' in self.profilers:
+            if StackSampler.is_supported():
+                sampler = StackSampler(self.interval)
+            else:
+                print(f"   ⚠️ Sampler indisponível neste ambiente, ignorando amostragem de {case_name}")
+
+        if sampler:
+            sampler.start()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            if sampler:
+                sampler.stop()
+
+            files = {}
+            if profiler:
+                pstats_path = os.path.join(self.output_dir, f"{case_name}.pstats")
+                if sampler:
+                    without_sampler(profiler).dump_stats(pstats_path)
+                else:
+                    profiler.dump_stats(pstats_path)
+                files['pstats'] = pstats_path
+            if sampler:
+                collapsed_path = os.path.join(self.output_dir, f"{case_name}.collapsed")
+                sampler.write_collapsed(collapsed_path)
+                files['collapsed'] = collapsed_path
+                files['samples'] = sampler.samples
+
+            self.cases[case_name] = files
+            print(f"   🔬 Profiling salvo: {', '.join(os.path.basename(p) for k, p in files.items() if k != 'samples')}")
+
+
+def profile_case(profiler, case_name):
+    """Retorna o contexto de profiling do caso, ou um contexto vazio se desativado"""
+    if profiler is None:
+        return nullcontext()
+    return profiler.profile(case_name)
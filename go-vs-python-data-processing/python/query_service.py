@@ -0,0 +1,329 @@
+import http.client
+import json
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode
+
+from dataset_cache import DatasetCache
+
+# Estatísticas aceitas pelo serviço (as mesmas de benchmark_calculations)
+QUERY_STATS = ('sum', 'mean', 'median', 'std', 'min', 'max', 'count', 'nunique', 'quantile')
+
+DEFAULT_PORT = 8765
+
+
+class QueryError(ValueError):
+    """Consulta inválida (vira HTTP 400)"""
+
+
+class QueryService:
+    """
+    Mantém datasets carregados em memória e responde consultas estatísticas
+    sem reler o CSV a cada análise.
+
+    Os DataFrames ficam no DatasetCache (validado por tamanho/mtime do
+    arquivo). Os resultados ficam num LRU indexado por (arquivo, versão,
+    consulta): quando o CSV muda a versão muda e as entradas antigas deixam
+    de ser usadas.
+    """
+
+    def __init__(self, data_dir='../data', cache_budget_mb=512, result_cache_size=1024):
+        self.data_dir = os.path.abspath(data_dir)
+        self.datasets = DatasetCache(cache_budget_mb * 1024 * 1024)
+        self.result_cache_size = result_cache_size
+        self._results = OrderedDict()
+        self._datasets_lock = threading.Lock()
+        self._results_lock = threading.Lock()
+        self.queries = 0
+        self.result_hits = 0
+
+    def _resolve(self, dataset):
+        """Caminho do dataset; apenas arquivos diretamente em data_dir"""
+        if not dataset or os.path.basename(dataset) != dataset:
+            raise QueryError(f"Dataset inválido: {dataset!r}")
+        filepath = os.path.join(self.data_dir, dataset)
+        if not os.path.isfile(filepath):
+            raise QueryError(f"Dataset não encontrado: {dataset}")
+        return filepath
+
+    @staticmethod
+    def _normalize(stat, column, q=None, gt=None, lt=None):
+        if stat not in QUERY_STATS:
+            raise QueryError(f"Estatística desconhecida: {stat}")
+        try:
+            q = float(q) if q is not None else (0.5 if stat == 'quantile' else None)
+            gt = float(gt) if gt is not None else None
+            lt = float(lt) if lt is not None else None
+        except ValueError:
+            raise QueryError("q, gt e lt devem ser numéricos")
+        if q is not None and not 0 <= q <= 1:
+            raise QueryError("q deve estar em [0, 1]")
+        return stat, column, q, gt, lt
+
+    def query(self, dataset, stat, column='value', q=None, gt=None, lt=None):
+        """
+        Executa uma consulta: estatística de column, opcionalmente filtrada
+        por gt < column < lt. Retorna (valor, veio_do_cache).
+        """
+        filepath = self._resolve(dataset)
+        query = self._normalize(stat, column, q, gt, lt)
+        key = (filepath, DatasetCache._file_version(filepath), query)
+
+        with self._results_lock:
+            self.queries += 1
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.result_hits += 1
+                return self._results[key], True
+
+        with self._datasets_lock:
+            df = self.datasets.get_dataframe(filepath)
+        value = self._compute(df, *query)
+
+        if self.result_cache_size:
+            with self._results_lock:
+                self._results[key] = value
+                while len(self._results) > self.result_cache_size:
+                    self._results.popitem(last=False)
+        return value, False
+
+    @staticmethod
+    def _compute(df, stat, column, q, gt, lt):
+        if column not in df.columns:
+            raise QueryError(f"Coluna desconhecida: {column}")
+        series = df[column]
+        if gt is not None:
+            series = series[series > gt]
+        if lt is not None:
+            series = series[series < lt]
+
+        if stat == 'count':
+            value = len(series)
+        elif stat == 'quantile':
+            value = series.quantile(q)
+        else:
+            value = getattr(series, stat)()
+        # Escalares numpy não são serializáveis em JSON
+        return value.item() if hasattr(value, 'item') else value
+
+    def stats(self):
+        """Contadores do serviço e do cache de datasets"""
+        with self._results_lock:
+            return {
+                'queries': self.queries,
+                'result_hits': self.result_hits,
+                'result_entries': len(self._results),
+                'datasets': self.datasets.stats()
+            }
+
+
+def _json_safe(value):
+    """Cópia de value com floats NaN/inf (também em dicts e listas) trocados por None"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /query?dataset=...&stat=...[&column=value&q=&gt=&lt=]
+    GET /stats
+    GET /health
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalho e corpo saem em writes separados: sem TCP_NODELAY o Nagle
+    # espera o ACK atrasado do cliente (~40 ms por resposta)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        path, _, query_string = self.path.partition('?')
+        params = dict(parse_qsl(query_string))
+        service = self.server.service
+
+        if path == '/health':
+            return self._send(200, {'status': 'ok'})
+        if path == '/stats':
+            try:
+                return self._send(200, service.stats())
+            except Exception as e:
+                return self._send(500, {'error': f"{type(e).__name__}: {e}"})
+        if path != '/query':
+            return self._send(404, {'error': f"Rota desconhecida: {path}"})
+
+        start_time = time.perf_counter()
+        try:
+            value, cached = service.query(params.get('dataset'), params.get('stat'),
+                                          params.get('column', 'value'), params.get('q'),
+                                          params.get('gt'), params.get('lt'))
+        except QueryError as e:
+            return self._send(400, {'error': str(e)})
+        except Exception as e:
+            # Falha inesperada vira 500 em vez de derrubar a conexão
+            return self._send(500, {'error': f"{type(e).__name__}: {e}"})
+        self._send(200, {'result': value, 'cached': cached,
+                         'elapsed_ms': (time.perf_counter() - start_time) * 1000})
+
+    def _send(self, status, payload):
+        # NaN/inf não existem em JSON: viram null
+        body = json.dumps(_json_safe(payload), allow_nan=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Log por requisição distorce o benchmark de carga
+        pass
+
+
+def create_server(service, host='127.0.0.1', port=DEFAULT_PORT):
+    """Servidor HTTP multi-thread ligado ao serviço (port=0 escolhe uma porta livre)"""
+    server = ThreadingHTTPServer((host, port), QueryRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve(data_dir='../data', host='127.0.0.1', port=DEFAULT_PORT, cache_budget_mb=512,
+          result_cache_size=1024, preload=(), ready=None):
+    """
+    Executa o serviço em primeiro plano até Ctrl+C.
+    preload: datasets carregados antes de aceitar conexões
+    ready: callable(porta) chamado quando o servidor está escutando
+    """
+    service = QueryService(data_dir, cache_budget_mb, result_cache_size)
+    for dataset in preload:
+        service.datasets.get_dataframe(service._resolve(dataset))
+
+    server = create_server(service, host, port)
+    port = server.server_address[1]
+    print(f"🛰️ Serviço de consultas em http://{host}:{port} (datasets em {service.data_dir})")
+    if ready is not None:
+        ready(port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _serve_in_child(port_queue, data_dir, host, cache_budget_mb, result_cache_size, preload):
+    serve(data_dir, host, 0, cache_budget_mb=cache_budget_mb, result_cache_size=result_cache_size,
+          preload=preload, ready=port_queue.put)
+
+
+def start_server_process(data_dir='../data', host='127.0.0.1', cache_budget_mb=512, result_cache_size=1024,
+                         preload=(), timeout=60):
+    """
+    Sobe o serviço em outro processo (porta livre) para que o gerador de carga
+    não dispute a GIL com o servidor. Retorna (processo, porta).
+    """
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve_in_child,
+                                      args=(port_queue, data_dir, host, cache_budget_mb,
+                                            result_cache_size, tuple(preload)),
+                                      daemon=True)
+    process.start()
+    port = port_queue.get(timeout=timeout)
+    if not wait_until_ready(host, port, timeout):
+        process.terminate()
+        raise RuntimeError("Serviço de consultas não respondeu ao /health")
+    return process, port
+
+
+def percentile(sorted_values, fraction):
+    """Percentil com interpolação linear de uma lista já ordenada"""
+    if not sorted_values:
+        return None
+    position = fraction * (len(sorted_values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def run_load(host, port, queries, clients=8, requests_per_client=200):
+    """
+    Gerador de carga: clients threads, cada uma com conexão HTTP persistente,
+    enviando requests_per_client consultas (em rodízio sobre queries).
+    Falha de conexão conta como erro e o cliente reconecta para a próxima.
+    Retorna QPS e percentis de latência em ms.
+    """
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+    paths = [f"/query?{urlencode(query)}" for query in queries]
+    barrier = threading.Barrier(clients + 1)
+
+    def client(index):
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        barrier.wait()
+        try:
+            for i in range(requests_per_client):
+                path = paths[(index + i) % len(paths)]
+                start_time = time.perf_counter()
+                try:
+                    connection.request('GET', path)
+                    response = connection.getresponse()
+                    response.read()
+                except (OSError, http.client.HTTPException):
+                    errors[index] += 1
+                    # Conexão em estado indefinido: a próxima consulta usa uma nova
+                    connection.close()
+                    connection = http.client.HTTPConnection(host, port, timeout=30)
+                    continue
+                latencies[index].append((time.perf_counter() - start_time) * 1000)
+                if response.status != 200:
+                    errors[index] += 1
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start_time
+
+    all_latencies = sorted(latency for client_latencies in latencies for latency in client_latencies)
+    return {
+        'clients': clients,
+        'requests': len(all_latencies),
+        'errors': sum(errors),
+        'elapsed': elapsed,
+        'qps': len(all_latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(all_latencies, 0.50),
+        'p95_ms': percentile(all_latencies, 0.95),
+        'p99_ms': percentile(all_latencies, 0.99),
+        'max_ms': all_latencies[-1] if all_latencies else None
+    }
+
+
+def wait_until_ready(host, port, timeout=30):
+    """Espera o /health responder 200 (False se o prazo acabar)"""
+    deadline = time.time() + timeout
+    while True:
+        connection = http.client.HTTPConnection(host, port, timeout=1)
+        try:
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return True
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            connection.close()
+        if time.time() > deadline:
+            return False
+        time.sleep(0.05)
@@ -0,0 +1,198 @@
+import math
+from collections import deque
+
+# Estatísticas de janela suportadas
+ROLLING_STATS = ('mean', 'sum', 'min', 'max', 'std')
+
+
+def rolling_vectorized(values, window, stats=ROLLING_STATS):
+    """
+    Janela móvel de window linhas sobre o array inteiro, com numpy.
+    sum/mean/std saem de somas acumuladas; min/max de uma visão deslizante.
+    As primeiras window-1 posições ficam NaN (mesma regra do pandas.rolling).
+    std é o desvio amostral (ddof=1).
+    """
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    values = np.asarray(values, dtype='float64')
+    n = len(values)
+    results = {}
+    if n < window:
+        return {stat: np.full(n, np.nan) for stat in stats}
+
+    head = np.full(window - 1, np.nan)
+    if {'sum', 'mean', 'std'} & set(stats):
+        # Centralizar antes de acumular reduz o cancelamento em sum de quadrados
+        shift = values[:window].mean()
+        centered = values - shift
+        cumsum = np.concatenate(([0.0], np.cumsum(centered)))
+        window_sum = cumsum[window:] - cumsum[:-window]
+        if 'sum' in stats:
+            results['sum'] = np.concatenate((head, window_sum + shift * window))
+        if 'mean' in stats:
+            results['mean'] = np.concatenate((head, window_sum / window + shift))
+        if 'std' in stats:
+            cumsq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+            window_sq = cumsq[window:] - cumsq[:-window]
+            variance = (window_sq - window_sum * window_sum / window) / (window - 1) if window > 1 \
+                else np.full(len(window_sum), np.nan)
+            results['std'] = np.concatenate((head, np.sqrt(np.maximum(variance, 0.0))))
+    if 'min' in stats or 'max' in stats:
+        view = sliding_window_view(values, window)
+        if 'min' in stats:
+            results['min'] = np.concatenate((head, view.min(axis=1)))
+        if 'max' in stats:
+            results['max'] = np.concatenate((head, view.max(axis=1)))
+    return {stat: results[stat] for stat in stats}
+
+
+def rolling_pandas(values, window, stats=ROLLING_STATS):
+    """Referência: Series.rolling do pandas"""
+    import pandas as pd
+
+    roller = pd.Series(values, dtype='float64').rolling(window)
+    return {stat: getattr(roller, stat)().to_numpy() for stat in stats}
+
+
+def ewma_vectorized(values, alpha):
+    """EWMA do array inteiro (ewm do pandas, adjust=False: y = a*x + (1-a)*y_anterior)"""
+    import pandas as pd
+
+    return pd.Series(values, dtype='float64').ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+class RollingWindow:
+    """
+    Janela móvel em streaming: custo O(1) amortizado por linha.
+
+    sum/mean/std mantêm média e soma de quadrados (Welford com remoção);
+    min/max usam deques monotônicos de (posição, valor), então cada valor
+    entra e sai de cada deque no máximo uma vez.
+    O estado persiste entre chamadas, o que permite alimentar a janela com
+    chunks sucessivos de uma leitura em streaming.
+    """
+
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("window deve ser >= 1")
+        self.window = window
+        self.count = 0
+        self._values = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = deque()
+        self._max = deque()
+
+    def push(self, value):
+        """Acrescenta um valor e retorna (mean, sum, min, max, std) da janela atual"""
+        value = float(value)
+        position = self.count
+        self.count += 1
+        values = self._values
+
+        if len(values) == self.window:
+            # Janela cheia: troca o valor mais antigo pelo novo
+            old = values.popleft()
+            old_mean = self._mean
+            self._mean = old_mean + (value - old) / self.window
+            self._m2 += (value - old) * (value - self._mean + old - old_mean)
+        else:
+            delta = value - self._mean
+            self._mean += delta / (len(values) + 1)
+            self._m2 += delta * (value - self._mean)
+        values.append(value)
+
+        low, high = self._min, self._max
+        while low and low[-1][1] >= value:
+            low.pop()
+        low.append((position, value))
+        while high and high[-1][1] <= value:
+            high.pop()
+        high.append((position, value))
+        expired = position - self.window
+        if low[0][0] <= expired:
+            low.popleft()
+        if high[0][0] <= expired:
+            high.popleft()
+
+        size = len(values)
+        if size < self.window:
+            return (math.nan,) * 5
+        std = math.sqrt(max(self._m2, 0.0) / (size - 1)) if size > 1 else math.nan
+        return self._mean, self._mean * size, low[0][1], high[0][1], std
+
+    def update(self, values, stats=ROLLING_STATS):
+        """Processa um bloco de valores; retorna {estatística: lista} do bloco"""
+        indexes = [('mean', 'sum', 'min', 'max', 'std').index(stat) for stat in stats]
+        outputs = [[] for _ in stats]
+        push = self.push
+        for value in values:
+            window_stats = push(value)
+            for output, index in zip(outputs, indexes):
+                output.append(window_stats[index])
+        return dict(zip(stats, outputs))
+
+
+class StreamingEWMA:
+    """EWMA em streaming (equivalente ao ewm do pandas com adjust=False)"""
+
+    def __init__(self, alpha):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha deve estar em (0, 1]")
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, values):
+        """Processa um bloco de valores; retorna a lista de médias"""
+        alpha = self.alpha
+        current = self.value
+        output = []
+        for value in values:
+            current = float(value) if current is None else current + alpha * (value - current)
+            output.append(current)
+        self.value = current
+        return output
+
+
+def iter_rolling_csv(filepath, window, alpha=None, column='value', order_by='id',
+                     chunk_rows=65536, stats=ROLLING_STATS):
+    """
+    Janelas móveis lendo o CSV em chunks: gera {estatística: lista} (e
+    'ewma' quando alpha é informado) de cada chunk, na ordem do arquivo.
+    Só o chunk atual e o estado das janelas ficam em memória, desde que o
+    chamador não acumule as saídas. O arquivo deve estar ordenado por order_by.
+    """
+    import pandas as pd
+
+    rolling = RollingWindow(window)
+    ewma = StreamingEWMA(alpha) if alpha is not None else None
+
+    last_key = None
+    for chunk in pd.read_csv(filepath, usecols=[order_by, column], chunksize=chunk_rows):
+        keys = chunk[order_by]
+        if not keys.is_monotonic_increasing or (last_key is not None and keys.iloc[0] < last_key):
+            raise ValueError(f"{filepath} não está ordenado por '{order_by}'")
+        last_key = keys.iloc[-1]
+
+        values = chunk[column].tolist()
+        output = rolling.update(values, stats)
+        if ewma is not None:
+            output['ewma'] = ewma.update(values)
+        yield output
+
+
+def rolling_stream_csv(filepath, window, alpha=None, column='value', order_by='id',
+                       chunk_rows=65536, stats=ROLLING_STATS):
+    """
+    Resultado completo de iter_rolling_csv: a leitura é em chunks, mas as
+    saídas de todas as linhas são acumuladas (memória proporcional ao arquivo).
+    Retorna {estatística: lista} (e 'ewma' quando alpha é informado).
+    """
+    results = {stat: [] for stat in stats}
+    if alpha is not None:
+        results['ewma'] = []
+    for output in iter_rolling_csv(filepath, window, alpha, column, order_by, chunk_rows, stats):
+        for stat, values in output.items():
+            results[stat].extend(values)
+    return results
@@ -0,0 +1,370 @@
+import bisect
+import csv
+import io
+import json
+import os
+import random
+import time
+
+# Uma entrada no índice a cada ROW_INDEX_STRIDE linhas: acesso a qualquer
+# linha lê no máximo um bloco de stride linhas a partir do offset anterior
+ROW_INDEX_STRIDE = 1024
+
+# Blocos lidos durante a construção
+BUILD_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def index_path_for(filepath):
+    """Caminho do índice persistido ao lado do CSV"""
+    return f"{filepath}.rowindex.json"
+
+
+def _file_version(filepath):
+    stat = os.stat(filepath)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _convert(value):
+    """int, float ou str (mesma inferência do scan linha a linha)"""
+    for converter in (int, float):
+        try:
+            return converter(value)
+        except ValueError:
+            continue
+    return value
+
+
+def _fields(line):
+    """Campos de uma linha bruta (csv só se houver aspas)"""
+    line = line.decode('utf-8').rstrip('\r')
+    return next(csv.reader([line])) if '"' in line else line.split(',')
+
+
+def _split_lines(data):
+    """Linhas (sem terminador) de um bloco que termina em \\n"""
+    lines = data.split(b'\n')
+    if lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+class RowIndexBuilder:
+    """
+    Constrói o índice incrementalmente a partir de blocos de linhas
+    completas, na ordem do arquivo. É o que permite gerar o índice como
+    subproduto de um scan completo (ver IncrementalStats.update) sem uma
+    passada extra sobre o arquivo.
+
+    Supõe uma linha por registro (sem quebras de linha dentro de campos
+    entre aspas), como o resto dos leitores em blocos do projeto.
+    """
+
+    def __init__(self, header, data_start, stride=ROW_INDEX_STRIDE, key_column='id'):
+        self.header = header
+        self.data_start = data_start
+        self.stride = stride
+        self.key_column = key_column if key_column in header else None
+        self.offsets = []
+        self.keys = []
+        self.rows = 0
+        self.end = data_start
+        self.key_sorted = self.key_column is not None
+        self._last_key = None
+
+    @classmethod
+    def resume(cls, index):
+        """Continua um índice existente (arquivo que recebeu linhas no final)"""
+        builder = cls(index.header, index.data_start, index.stride, index.key_column)
+        builder.offsets = list(index.offsets)
+        builder.keys = list(index.keys)
+        builder.rows = index.rows
+        builder.end = index.data_end
+        builder.key_sorted = index.key_sorted
+        builder._last_key = index.last_key
+        return builder
+
+    def feed(self, data, keys=None):
+        """
+        Acrescenta um bloco de linhas completas que começa no byte self.end.
+        keys: valores da coluna chave já convertidos pelo chamador (uma
+        entrada por linha), para não ler o bloco de novo
+        """
+        import numpy as np
+
+        if not data:
+            return
+        newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord('\n'))
+        starts = np.concatenate(([0], newlines[:-1] + 1))
+        first = (-self.rows) % self.stride
+        sparse_rows = range(first, len(starts), self.stride)
+        self.offsets.extend(self.end + int(starts[row]) for row in sparse_rows)
+
+        if self.key_column is not None:
+            if keys is None or len(keys) != len(starts):
+                # Sem chaves, ou o parse do chamador pulou linhas em branco
+                keys = self._parse_keys(data)
+            if len(keys) != len(starts):
+                raise ValueError("CSV com registros em mais de uma linha não é suportado pelo índice")
+            if self.key_sorted:
+                self.key_sorted = bool((keys[1:] >= keys[:-1]).all() and
+                                       (self._last_key is None or not len(keys) or keys[0] >= self._last_key))
+            if len(keys):
+                self._last_key = keys[-1].item()
+            self.keys.extend(keys[first::self.stride].tolist())
+
+        self.rows += len(starts)
+        self.end += len(data)
+
+    def _parse_keys(self, data):
+        import pandas as pd
+
+        return pd.read_csv(io.BytesIO(data), header=None, names=self.header, usecols=[self.key_column],
+                           skip_blank_lines=False)[self.key_column].to_numpy()
+
+    def finish(self, filepath, version=None):
+        """RowIndex final, validado pela versão (tamanho, mtime) do arquivo"""
+        size, mtime_ns = version or _file_version(filepath)
+        return RowIndex(filepath, {
+            'filepath': os.path.abspath(filepath),
+            'header': self.header,
+            'data_start': self.data_start,
+            'data_end': self.end,
+            'stride': self.stride,
+            'rows': self.rows,
+            'offsets': self.offsets,
+            'key_column': self.key_column,
+            'keys': self.keys,
+            'key_sorted': self.key_sorted,
+            'last_key': self._last_key,
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'built_at': time.time()
+        })
+
+
+class RowIndex:
+    """
+    Índice esparso de offsets de linha de um CSV, persistido em JSON ao
+    lado do arquivo (<csv>.rowindex.json).
+
+    Guarda o offset em bytes de uma linha a cada stride e, se o CSV tem a
+    coluna key_column, o valor dela nessas linhas. Com isso:
+    - read_rows/get_row: seek até a entrada anterior e leitura de no
+      máximo stride linhas extras, sem parse do arquivo inteiro;
+    - read_id_range/find_id: busca binária nas chaves (coluna ordenada);
+    - sample: amostra uniforme de linhas, lendo só os blocos sorteados.
+
+    O índice vale para uma versão do arquivo (tamanho + mtime): se o CSV
+    mudar, is_stale() fica verdadeiro e load() o descarta.
+    """
+
+    def __init__(self, filepath, data):
+        self.filepath = filepath
+        self.index_path = index_path_for(filepath)
+        self.header = data['header']
+        self.data_start = data['data_start']
+        self.data_end = data['data_end']
+        self.stride = data['stride']
+        self.rows = data['rows']
+        self.offsets = data['offsets']
+        self.key_column = data['key_column']
+        self.keys = data['keys']
+        self.key_sorted = data['key_sorted']
+        self.last_key = data['last_key']
+        self.version = (data['size'], data['mtime_ns'])
+        self._data = data
+
+    # --- construção e persistência ---
+
+    @classmethod
+    def build(cls, filepath, stride=ROW_INDEX_STRIDE, key_column='id', block_bytes=BUILD_BLOCK_BYTES):
+        """
+        Constrói o índice com uma passada em blocos de bytes (só procura
+        quebras de linha e lê a coluna chave, sem converter o resto)
+        """
+        version = _file_version(filepath)
+        with open(filepath, 'rb') as f:
+            header_line = f.readline()
+            header = header_line.decode('utf-8').rstrip('\r\n').split(',')
+            builder = RowIndexBuilder(header, len(header_line), stride, key_column)
+            pending = b''
+            while True:
+                block = f.read(block_bytes)
+                if not block:
+                    break
+                data = pending + block
+                end = data.rfind(b'\n') + 1
+                pending = data[end:]
+                builder.feed(data[:end])
+        if pending:
+            # Última linha sem terminador também é um registro
+            builder.feed(pending + b'\n')
+            builder.end -= 1
+        return builder.finish(filepath, version)
+
+    @classmethod
+    def load(cls, filepath, allow_stale=False):
+        """
+        Índice salvo do arquivo, ou None se não existe ou está desatualizado
+        (allow_stale=True devolve mesmo assim, para ser continuado)
+        """
+        index_path = index_path_for(filepath)
+        if not os.path.exists(index_path):
+            return None
+        with open(index_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('filepath') != os.path.abspath(filepath):
+            return None
+        index = cls(filepath, data)
+        return None if index.is_stale() and not allow_stale else index
+
+    def save(self):
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f)
+        os.replace(temp_path, self.index_path)
+        return self.index_path
+
+    def is_stale(self):
+        """O CSV mudou (tamanho ou mtime) desde a construção do índice"""
+        try:
+            return _file_version(self.filepath) != self.version
+        except OSError:
+            return True
+
+    # --- leitura ---
+
+    def _check_rows(self, start, stop):
+        if start < 0 or stop > self.rows or start > stop:
+            raise IndexError(f"Linhas [{start}, {stop}) fora do arquivo ({self.rows} linhas)")
+
+    def _check_keys(self):
+        if self.key_column is None:
+            raise ValueError("Índice sem coluna chave")
+        if not self.key_sorted:
+            raise ValueError(f"Coluna '{self.key_column}' não está ordenada: busca por faixa indisponível")
+
+    def _block_bounds(self, first_block, last_block):
+        """Bytes [início, fim) dos blocos first_block..last_block-1"""
+        end = self.offsets[last_block] if last_block < len(self.offsets) else self.data_end
+        return self.offsets[first_block], end
+
+    def _read_lines(self, f, start, stop):
+        """Linhas brutas [start, stop) lendo só os blocos que as contêm"""
+        if start >= stop:
+            return []
+        first_block = start // self.stride
+        begin, end = self._block_bounds(first_block, -(-stop // self.stride))
+        f.seek(begin)
+        lines = _split_lines(f.read(end - begin))
+        skip = first_block * self.stride
+        return lines[start - skip:stop - skip]
+
+    def _frame(self, lines):
+        """DataFrame das linhas brutas (mesmo parse do read_csv)"""
+        import pandas as pd
+
+        if not lines:
+            return pd.read_csv(io.BytesIO(b','.join(name.encode() for name in self.header) + b'\n'))
+        return pd.read_csv(io.BytesIO(b'\n'.join(lines) + b'\n'), header=None, names=self.header)
+
+    def read_rows(self, start, stop):
+        """Linhas [start, stop) (0 = primeira linha de dados) como DataFrame"""
+        self._check_rows(start, stop)
+        with open(self.filepath, 'rb') as f:
+            return self._frame(self._read_lines(f, start, stop))
+
+    def get_row(self, row):
+        """Uma linha como dict, sem pandas (acesso pontual)"""
+        self._check_rows(row, row + 1)
+        with open(self.filepath, 'rb') as f:
+            line = self._read_lines(f, row, row + 1)[0]
+        return dict(zip(self.header, (_convert(value) for value in _fields(line))))
+
+    def find_id(self, key):
+        """Linha com key_column == key (dict) ou None; exige a coluna ordenada"""
+        self._check_keys()
+        block = bisect.bisect_right(self.keys, key) - 1
+        if block < 0:
+            return None
+        key_index = self.header.index(self.key_column)
+        start = block * self.stride
+        with open(self.filepath, 'rb') as f:
+            lines = self._read_lines(f, start, min(start + self.stride, self.rows))
+        # Busca binária dentro do bloco: só a chave das linhas visitadas é convertida
+        low, high = 0, len(lines)
+        while low < high:
+            middle = (low + high) // 2
+            if _convert(_fields(lines[middle])[key_index]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(lines):
+            return None
+        fields = _fields(lines[low])
+        if _convert(fields[key_index]) != key:
+            return None
+        return dict(zip(self.header, (_convert(field) for field in fields)))
+
+    def read_id_range(self, low, high):
+        """Linhas com low <= key_column <= high (DataFrame); exige a coluna ordenada"""
+        self._check_keys()
+        first_block = max(bisect.bisect_left(self.keys, low) - 1, 0)
+        last_block = bisect.bisect_right(self.keys, high)
+        if last_block <= first_block:
+            return self._frame([])
+        df = self.read_rows(first_block * self.stride, min(last_block * self.stride, self.rows))
+        column = df[self.key_column]
+        return df[(column >= low) & (column <= high)].reset_index(drop=True)
+
+    def sample(self, n, seed=None):
+        """
+        Amostra uniforme de n linhas distintas (sem reposição), na ordem do
+        arquivo. Cada bloco sorteado é lido uma única vez.
+        """
+        rows = sorted(random.Random(seed).sample(range(self.rows), min(n, self.rows)))
+        lines = []
+        with open(self.filepath, 'rb') as f:
+            position = 0
+            while position < len(rows):
+                block = rows[position] // self.stride
+                block_start = block * self.stride
+                block_lines = self._read_lines(f, block_start, min(block_start + self.stride, self.rows))
+                while position < len(rows) and rows[position] // self.stride == block:
+                    lines.append(block_lines[rows[position] - block_start])
+                    position += 1
+        df = self._frame(lines)
+        df.index = rows
+        return df
+
+    def describe(self):
+        """Resumo do índice para o relatório"""
+        return {
+            'rows': self.rows,
+            'stride': self.stride,
+            'entries': len(self.offsets),
+            'key_column': self.key_column,
+            'key_sorted': self.key_sorted,
+            'index_bytes': os.path.getsize(self.index_path) if os.path.exists(self.index_path) else None
+        }
+
+
+def open_row_index(filepath, stride=ROW_INDEX_STRIDE, key_column='id'):
+    """
+    Índice salvo do CSV ou, se ausente/desatualizado (ou com outro stride),
+    construído agora e salvo. Retorna (índice, True se foi construído).
+    """
+    index = RowIndex.load(filepath)
+    if index is not None and index.stride == stride and index.key_column == (
+            key_column if key_column in index.header else None):
+        return index, False
+    index = RowIndex.build(filepath, stride, key_column)
+    index.save()
+    return index, True
+
+
+def discard_row_index(filepath):
+    """Apaga o índice salvo do CSV, se existir"""
+    index_path = index_path_for(filepath)
+    if os.path.exists(index_path):
+        os.remove(index_path)
@@ -0,0 +1,287 @@
+import csv
+import itertools
+import operator
+import time
+
+# Operadores aceitos nos predicados (coluna, operador, valor)
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+    'between': lambda value, bounds: bounds[0] <= value <= bounds[1],
+    'in': lambda value, options: value in options,
+}
+
+SCAN_ENGINES = ('python', 'pandas')
+
+
+def _text(value):
+    """Conversor de colunas texto: campo vazio é nulo"""
+    return value if value else None
+
+
+# Alargamento do tipo de uma coluna quando um valor não converte
+_WIDER = {int: float, float: _text}
+
+
+def _infer_converter(sample):
+    """Escolhe int, float ou texto a partir de um valor de exemplo"""
+    if not sample:
+        # Vazio não diz nada: começa pelo mais estreito e alarga se preciso
+        return int
+    for converter in (int, float):
+        try:
+            converter(sample)
+            return converter
+        except ValueError:
+            continue
+    return _text
+
+
+def _convert(converters, index, value):
+    """
+    Caminho lento da conversão (o conversor atual falhou): campo vazio vira
+    None e, para os demais, o tipo da coluna é alargado int -> float -> texto
+    até o valor converter. O conversor alargado vale para as linhas seguintes.
+    """
+    if not value:
+        return None
+    while True:
+        converters[index] = _WIDER[converters[index]]
+        try:
+            return converters[index](value)
+        except ValueError:
+            continue
+
+
+def _literal_for(converter, op, value):
+    """
+    Literal do predicado no tipo atual da coluna: coluna que virou texto
+    compara como texto (str do literal), em vez de TypeError entre str e número
+    """
+    if converter is not _text:
+        return value
+    if op == 'between':
+        return str(value[0]), str(value[1])
+    if op == 'in':
+        return [str(option) for option in value]
+    return str(value)
+
+
+def frames_match(left, right):
+    """
+    Mesmo conteúdo (valores e colunas, na ordem), ignorando índice e dtype
+    (ex.: int64 de um engine x float64 de outro, None x NaN)
+    """
+    from pandas.testing import assert_frame_equal
+
+    try:
+        assert_frame_equal(left.reset_index(drop=True), right.reset_index(drop=True), check_dtype=False)
+    except AssertionError:
+        return False
+    return True
+
+
+def _upper_bound(op, value):
+    """Limite superior do predicado, usado para parar cedo em colunas ordenadas"""
+    if op in ('<', '<=', '=='):
+        return value
+    if op == 'between':
+        return value[1]
+    if op == 'in':
+        return max(value)
+    return None
+
+
+def _validate(predicates, header):
+    for column, op, _ in predicates:
+        if column not in header:
+            raise ValueError(f"Coluna '{column}' não existe no CSV")
+        if op not in OPERATORS:
+            raise ValueError(f"Operador desconhecido: {op}")
+
+
+def predicate_mask(df, predicates):
+    """Máscara vetorizada (pandas) dos predicados combinados com AND"""
+    import pandas as pd
+
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in predicates:
+        series = df[column]
+        if op == 'between':
+            mask &= series.between(value[0], value[1])
+        elif op == 'in':
+            mask &= series.isin(value)
+        else:
+            mask &= OPERATORS[op](series, value)
+    return mask
+
+
+def scan_csv(filepath, predicates=(), columns=None, engine='python', sorted_by=None,
+             chunk_rows=65536):
+    """
+    Lê o CSV aplicando predicados e projeção durante o parse: linhas que
+    falham no predicado nunca viram objetos nem entram no DataFrame.
+
+    predicates: lista de (coluna, operador, valor), combinados com AND
+    columns: colunas projetadas (None = todas)
+    engine: 'python' avalia o predicado linha a linha antes de converter o
+            resto da linha; 'pandas' lê em chunks só as colunas necessárias e
+            filtra cada chunk com máscara vetorizada
+    sorted_by: coluna sabidamente ordenada (ascendente); com predicado de
+            limite superior nela o scan para assim que o limite é passado
+
+    Retorna (DataFrame, estatísticas do scan). A seletividade das estatísticas
+    é relativa às linhas lidas (com parada antecipada nem todas são lidas).
+    """
+    import pandas as pd
+
+    if engine not in SCAN_ENGINES:
+        raise ValueError(f"Engine desconhecido: {engine}")
+
+    start_time = time.perf_counter()
+    if engine == 'python':
+        data, stats = _scan_python(filepath, predicates, columns, sorted_by)
+        df = pd.DataFrame(data)
+        for column in df.columns:
+            # Coluna só com nulos (None): float64 com NaN, como no read_csv
+            if len(df) and df[column].dtype == object and df[column].isna().all():
+                df[column] = df[column].astype('float64')
+    else:
+        df, stats = _scan_pandas(filepath, predicates, columns, chunk_rows)
+
+    stats['rows_matched'] = len(df)
+    stats['selectivity'] = len(df) / stats['rows_scanned'] if stats['rows_scanned'] else 0.0
+    stats['execution_time'] = time.perf_counter() - start_time
+    stats['engine'] = engine
+    return df, stats
+
+
+def _scan_python(filepath, predicates, columns, sorted_by):
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        header = f.readline().rstrip('\r\n').split(',')
+        _validate(predicates, header)
+        projection = list(columns) if columns is not None else header
+        projected = [header.index(name) for name in projection]
+
+        first_line = f.readline()
+        if not first_line:
+            return {name: [] for name in projection}, {'rows_scanned': 0, 'stopped_early': False}
+        sample = next(csv.reader([first_line]))
+        converters = [_infer_converter(value) for value in sample]
+
+        # Parada antecipada na coluna ordenada
+        stop_index, stop_value = None, None
+        if sorted_by is not None:
+            bounds = [_upper_bound(op, value) for column, op, value in predicates if column == sorted_by]
+            bounds = [b for b in bounds if b is not None]
+            if bounds:
+                stop_index = header.index(sorted_by)
+                stop_value = min(bounds)
+
+        def compile_predicates():
+            # (índice, função, literal no tipo atual da coluna, nulo passa,
+            # posição); como no pandas, nulo (campo vazio) só passa em !=
+            return [(header.index(column), OPERATORS[op],
+                     _literal_for(converters[header.index(column)], op, value), op == '!=', position)
+                    for position, (column, op, value) in enumerate(predicates)]
+
+        compiled = compile_predicates()
+
+        def widen(index, value):
+            """Caminho lento: converte alargando a coluna e recompila os predicados"""
+            nonlocal compiled, stop_index
+            converter = converters[index]
+            field = _convert(converters, index, value)
+            if converters[index] is not converter:
+                compiled = compile_predicates()
+                if stop_index is not None and converters[stop_index] is _text:
+                    # Ordem de texto não é a ordem numérica: sem parada antecipada
+                    stop_index = None
+            return field
+
+        output = [[] for _ in projected]
+        rows_scanned = 0
+        stopped_early = False
+
+        for line in itertools.chain([first_line], f):
+            if '"' in line:
+                fields = next(csv.reader([line]))
+            else:
+                fields = line.rstrip('\r\n').split(',')
+            if len(fields) < len(header):
+                continue
+            rows_scanned += 1
+
+            if stop_index is not None:
+                try:
+                    stop_field = converters[stop_index](fields[stop_index])
+                except ValueError:
+                    stop_field = widen(stop_index, fields[stop_index])
+                if stop_index is not None and stop_field is not None and stop_field > stop_value:
+                    stopped_early = True
+                    break
+
+            for index, predicate, value, null_passes, position in compiled:
+                try:
+                    field = converters[index](fields[index])
+                except ValueError:
+                    field = widen(index, fields[index])
+                    # Literal da coluna alargada (o laço segue na lista antiga)
+                    value = compiled[position][2]
+                if field is None:
+                    if not null_passes:
+                        break
+                elif not predicate(field, value):
+                    break
+            else:
+                # Só as linhas aprovadas são convertidas e materializadas
+                for out, index in zip(output, projected):
+                    try:
+                        out.append(converters[index](fields[index]))
+                    except ValueError:
+                        out.append(widen(index, fields[index]))
+
+        # Coluna que virou texto no meio do arquivo: valores anteriores também
+        for out, index in zip(output, projected):
+            if converters[index] is _text:
+                out[:] = [value if value is None or isinstance(value, str) else str(value) for value in out]
+
+    data = dict(zip(projection, output))
+    return data, {'rows_scanned': rows_scanned, 'stopped_early': stopped_early}
+
+
+def _scan_pandas(filepath, predicates, columns, chunk_rows):
+    import pandas as pd
+
+    header = pd.read_csv(filepath, nrows=0).columns.tolist()
+    _validate(predicates, header)
+    projection = list(columns) if columns is not None else header
+    needed = list(dict.fromkeys(projection + [column for column, _, _ in predicates]))
+
+    parts = []
+    rows_scanned = 0
+    for chunk in pd.read_csv(filepath, usecols=needed, chunksize=chunk_rows):
+        rows_scanned += len(chunk)
+        parts.append(chunk.loc[predicate_mask(chunk, predicates), projection])
+
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=projection)
+    return df, {'rows_scanned': rows_scanned, 'stopped_early': False}
+
+
+def load_then_filter(filepath, predicates=(), columns=None):
+    """
+    Referência: carrega o CSV inteiro e só depois filtra (caminho atual
+    com read_csv_with_timing). Retorna (DataFrame, tempo).
+    """
+    import pandas as pd
+
+    start_time = time.perf_counter()
+    df = pd.read_csv(filepath)
+    mask = predicate_mask(df, predicates)
+    projection = list(columns) if columns is not None else list(df.columns)
+    result = df.loc[mask, projection].reset_index(drop=True)
+    return result, time.perf_counter() - start_time
@@ -0,0 +1,150 @@
+import glob
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from incremental_stats import RunningStats
+
+
+def _read_split(path, start, end, header_size):
+    """
+    Bytes das linhas que começam em [start, end) de um shard. Uma split que
+    começa no meio de uma linha pula até o próximo \\n (a linha pertence à
+    split anterior); a última linha é lida até o fim mesmo passando de end.
+    """
+    with open(path, 'rb') as f:
+        if start <= header_size:
+            f.seek(header_size)
+        else:
+            f.seek(start - 1)
+            f.readline()
+        begin = f.tell()
+        if begin >= end:
+            return b''
+        data = f.read(end - begin)
+        if not data.endswith(b'\n'):
+            data += f.readline()
+    return data
+
+
+def _map_split(index, path, start, end, header_size, header, column):
+    """Map: agregado parcial de uma split (executado no worker)"""
+    import pandas as pd
+
+    start_time = time.perf_counter()
+    data = _read_split(path, start, end, header_size)
+    stats = RunningStats()
+    rows = 0
+    if data:
+        df = pd.read_csv(io.BytesIO(data), header=None, names=header, usecols=[column])
+        stats.update(df[column].to_numpy(dtype='float64', na_value=float('nan')))
+        rows = len(df)
+    return {
+        'index': index,
+        'path': path,
+        'bytes': end - start,
+        'rows': rows,
+        'stats': stats.to_dict(),
+        'pid': os.getpid(),
+        'task_time': time.perf_counter() - start_time
+    }
+
+
+class ShardedDataset:
+    """
+    Dataset formado por vários CSVs (part files) com o mesmo cabeçalho.
+
+    source pode ser um diretório (todos os *.csv), um padrão glob ou uma
+    lista de arquivos. Os shards são ordenados pelo caminho, o que torna a
+    ordem de redução (e o resultado em ponto flutuante) determinística.
+    """
+
+    def __init__(self, source):
+        if isinstance(source, (list, tuple)):
+            paths = list(source)
+        elif os.path.isdir(source):
+            paths = glob.glob(os.path.join(source, '*.csv'))
+        else:
+            paths = glob.glob(source)
+        self.shards = sorted(paths)
+        if not self.shards:
+            raise ValueError(f"Nenhum shard encontrado em {source}")
+
+        with open(self.shards[0], 'rb') as f:
+            self.header_line = f.readline()
+        self.header = self.header_line.decode('utf-8').rstrip('\r\n').split(',')
+        self.sizes = [os.path.getsize(path) for path in self.shards]
+
+    @property
+    def total_bytes(self):
+        return sum(self.sizes)
+
+    def splits(self, split_bytes=None):
+        """
+        Tarefas (índice, shard, início, fim) em bytes. split_bytes=None gera uma
+        tarefa por shard; caso contrário shards maiores que split_bytes são
+        quebrados em faixas, para que um shard grande não vire retardatário.
+        """
+        tasks = []
+        header_size = len(self.header_line)
+        for path, size in zip(self.shards, self.sizes):
+            step = max(split_bytes or size, 1)
+            for start in range(0, max(size, 1), step):
+                tasks.append((len(tasks), path, start, min(start + step, size), header_size))
+        return tasks
+
+    def aggregate(self, column='value', workers=None, rebalance=True, tasks_per_worker=4,
+                  executor=None):
+        """
+        Map-reduce: cada split vira um RunningStats parcial em um processo
+        do pool; os parciais são combinados na ordem das splits.
+
+        rebalance=True: splits de ~total/(workers*tasks_per_worker) bytes,
+        submetidas da maior para a menor (LPT), de modo que os workers
+        terminem juntos mesmo com shards de tamanhos diferentes.
+        """
+        if column not in self.header:
+            raise ValueError(f"Coluna '{column}' não existe nos shards")
+        workers = workers or os.cpu_count() or 1
+        start_time = time.perf_counter()
+
+        split_bytes = None
+        if rebalance:
+            split_bytes = max(self.total_bytes // (workers * tasks_per_worker), 64 * 1024)
+        tasks = self.splits(split_bytes)
+        if rebalance:
+            tasks.sort(key=lambda task: task[3] - task[2], reverse=True)
+
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(_map_split, *task, self.header, column) for task in tasks]
+            partials = [future.result() for future in as_completed(futures)]
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        # Reduce em ordem fixa: o resultado não depende da ordem de término
+        partials.sort(key=lambda partial: partial['index'])
+        stats = RunningStats()
+        for partial in partials:
+            stats.merge(RunningStats.from_dict(partial['stats']))
+
+        task_times = [partial['task_time'] for partial in partials]
+        busy_by_worker = {}
+        for partial in partials:
+            busy_by_worker[partial['pid']] = busy_by_worker.get(partial['pid'], 0) + partial['task_time']
+        return {
+            'stats': stats.result(),
+            'rows': sum(partial['rows'] for partial in partials),
+            'shards': len(self.shards),
+            'tasks': len(tasks),
+            'workers': workers,
+            'rebalance': rebalance,
+            'max_task_time': max(task_times),
+            'mean_task_time': sum(task_times) / len(task_times),
+            'worker_busy_time': busy_by_worker,
+            'execution_time': time.perf_counter() - start_time
+        }
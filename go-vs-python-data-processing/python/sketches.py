@@ -0,0 +1,364 @@
+import base64
+import math
+import random
+
+# Tipos de sketch, na ordem do relatório
+SKETCH_TYPES = ('hll', 'kll', 'countmin')
+
+
+def _normalize(values):
+    """
+    Array numpy sem nulos. Floats inteiros (coluna int que ganhou NaN em
+    algum chunk) viram int64, para terem o mesmo hash nos dois casos.
+    """
+    import numpy as np
+
+    values = np.asarray(values)
+    if values.dtype.kind in 'iub':
+        return values.astype(np.int64, copy=False)
+    if values.dtype.kind == 'f':
+        values = values[~np.isnan(values)]
+        if len(values) and np.abs(values).max() < 2**63 and (values == np.round(values)).all():
+            return values.astype(np.int64)
+        return values
+    return values[[value is not None and value == value for value in values]]
+
+
+def _hash64(values, key='sketches-hash-00'):
+    """Hash determinístico de 64 bits (igual em qualquer processo)"""
+    import pandas as pd
+
+    return pd.util.hash_array(values, hash_key=key)
+
+
+def _bit_length(x):
+    """int.bit_length vetorizado para uint64 (busca binária nos bits)"""
+    import numpy as np
+
+    x = x.copy()
+    length = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = x >= (np.uint64(1) << np.uint64(shift))
+        length[mask] += shift
+        x[mask] >>= np.uint64(shift)
+    return length + (x > 0)
+
+
+def _encode(array):
+    return base64.b64encode(array.tobytes()).decode('ascii')
+
+
+def _decode(text, dtype, shape=None):
+    import numpy as np
+
+    array = np.frombuffer(base64.b64decode(text), dtype=dtype).copy()
+    return array.reshape(shape) if shape is not None else array
+
+
+class HyperLogLog:
+    """
+    Contagem aproximada de distintos (nunique) em 2**precision bytes.
+    Erro padrão relativo ~1.04 / sqrt(2**precision) (1.6% com precision=12).
+    Dois sketches de mesma precisão se combinam pelo máximo dos registradores,
+    então chunks e processos podem ser processados separadamente.
+    """
+
+    def __init__(self, precision=12):
+        import numpy as np
+
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision deve estar entre 4 e 18: {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        """Acrescenta um bloco de valores (array ou lista)"""
+        import numpy as np
+
+        values = _normalize(values)
+        if not len(values):
+            return self
+        hashes = _hash64(values)
+        suffix_bits = 64 - self.precision
+        index = (hashes >> np.uint64(suffix_bits)).astype(np.intp)
+        rank = suffix_bits - _bit_length(hashes & np.uint64((1 << suffix_bits) - 1)) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+        return self
+
+    def merge(self, other):
+        import numpy as np
+
+        if other.precision != self.precision:
+            raise ValueError("HyperLogLog com precisões diferentes")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """Estimativa de distintos (contagem linear para cardinalidades pequenas)"""
+        import numpy as np
+
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / float(np.ldexp(1.0, -self.registers.astype(np.int64)).sum())
+        zeros = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return estimate
+
+    def memory_bytes(self):
+        return self.registers.nbytes
+
+    def to_dict(self):
+        return {'type': 'hll', 'precision': self.precision, 'registers': _encode(self.registers)}
+
+    @classmethod
+    def from_dict(cls, data):
+        import numpy as np
+
+        sketch = cls(data['precision'])
+        sketch.registers = _decode(data['registers'], np.uint8)
+        return sketch
+
+
+class KLLSketch:
+    """
+    Quantis aproximados (KLL): compactadores em níveis, o nível h guarda
+    itens de peso 2**h. Quando um nível passa da capacidade, ele é ordenado
+    e metade dos itens (pares ou ímpares, sorteado) sobe para o nível
+    seguinte. A capacidade cai geometricamente (fator 2/3) dos níveis altos
+    para os baixos, então a memória fica em O(k) itens. Erro de rank
+    ~1.7/k (1% com k=200); sketches de mesmo k se combinam nível a nível.
+    """
+
+    def __init__(self, k=200, seed=None):
+        import numpy as np
+
+        if k < 8:
+            raise ValueError(f"k deve ser ao menos 8: {k}")
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = random.Random(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        import numpy as np
+
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            # Com quantidade ímpar um item fica no nível (o peso total se mantém exato)
+            keep, items = (items[-1:], items[:-1]) if len(items) % 2 else (items[:0], items)
+            promoted = items[self._rng.randrange(2)::2]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            self.levels[level] = keep
+            # Um nível novo reduz a capacidade dos de baixo: recomeça a verificação
+            level = 0
+
+    def update(self, values):
+        """Acrescenta um bloco de valores numéricos (NaN é ignorado)"""
+        import numpy as np
+
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        import numpy as np
+
+        if other.k != self.k:
+            raise ValueError("KLL com k diferentes")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _weighted(self):
+        import numpy as np
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.int64)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Quantil(es) q em [0, 1]: float para um q, lista para vários"""
+        import numpy as np
+
+        if self.n == 0:
+            return math.nan if np.isscalar(q) else [math.nan] * len(q)
+        items, cumulative = self._weighted()
+        targets = np.atleast_1d(np.asarray(q, dtype='float64')) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, targets, side='left'), len(items) - 1)
+        result = items[positions].tolist()
+        return result[0] if np.isscalar(q) else result
+
+    def rank(self, value):
+        """Fração estimada de itens <= value"""
+        import numpy as np
+
+        if self.n == 0:
+            return math.nan
+        items, cumulative = self._weighted()
+        position = np.searchsorted(items, value, side='right')
+        return float(cumulative[position - 1] / cumulative[-1]) if position else 0.0
+
+    def retained(self):
+        return sum(len(items) for items in self.levels)
+
+    def memory_bytes(self):
+        return self.retained() * 8
+
+    def to_dict(self):
+        return {'type': 'kll', 'k': self.k, 'n': self.n, 'levels': [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data):
+        import numpy as np
+
+        sketch = cls(data['k'])
+        sketch.n = data['n']
+        sketch.levels = [np.asarray(items, dtype='float64') for items in data['levels']]
+        return sketch
+
+
+class CountMinSketch:
+    """
+    Frequências aproximadas (count-min): depth linhas de width contadores,
+    cada linha com um hash próprio; a estimativa de um valor é o menor dos
+    seus contadores e nunca fica abaixo da contagem real. Superestima no
+    máximo e/width * n com probabilidade 1 - exp(-depth).
+
+    Para heavy hitters guarda também os heavy_hitters valores candidatos de
+    maior estimativa (o sketch em si não guarda valores). Sketches de mesmo
+    formato se combinam somando as tabelas.
+    """
+
+    def __init__(self, width=2048, depth=4, heavy_hitters=20):
+        import numpy as np
+
+        self.width = width
+        self.depth = depth
+        self.capacity = heavy_hitters
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.n = 0
+        self.candidates = {}
+
+    def _columns(self, values):
+        # hash_key do pandas precisa de exatamente 16 caracteres
+        return [(_hash64(values, key=f"countmin{row:08d}") % self.width).astype('intp')
+                for row in range(self.depth)]
+
+    def update(self, values):
+        """Acrescenta um bloco de valores (cada valor distinto é hasheado uma vez)"""
+        import numpy as np
+
+        values = _normalize(values)
+        if not len(values):
+            return self
+        uniques, counts = np.unique(values, return_counts=True)
+        for row, columns in enumerate(self._columns(uniques)):
+            self.table[row] += np.bincount(columns, weights=counts, minlength=self.width).astype(np.int64)
+        self.n += int(counts.sum())
+
+        # Candidatos: os mais frequentes do bloco + os atuais, reavaliados no sketch
+        top = uniques[np.argsort(counts)[-self.capacity:]]
+        self._track(top)
+        return self
+
+    def _track(self, values):
+        import numpy as np
+
+        pool = list(dict.fromkeys(list(self.candidates) + [value.item() if hasattr(value, 'item') else value
+                                                           for value in values]))
+        estimates = self.estimate(np.asarray(pool)) if pool else []
+        ranked = sorted(zip(pool, estimates), key=lambda item: -item[1])[:self.capacity]
+        self.candidates = {value: int(estimate) for value, estimate in ranked}
+
+    def estimate(self, values):
+        """Frequência estimada de cada valor (array)"""
+        import numpy as np
+
+        values = _normalize(values)
+        columns = self._columns(values)
+        return np.min([self.table[row, columns[row]] for row in range(self.depth)], axis=0)
+
+    def heavy_hitters(self, phi=None):
+        """[(valor, frequência estimada)] em ordem decrescente; com phi, só os >= phi * n"""
+        items = sorted(self.candidates.items(), key=lambda item: -item[1])
+        if phi is not None:
+            items = [(value, count) for value, count in items if count >= phi * self.n]
+        return items
+
+    def merge(self, other):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Count-min com formatos diferentes")
+        self.table += other.table
+        self.n += other.n
+        self._track(list(other.candidates))
+        return self
+
+    def memory_bytes(self):
+        return self.table.nbytes + 16 * len(self.candidates)
+
+    def to_dict(self):
+        return {'type': 'countmin', 'width': self.width, 'depth': self.depth, 'n': self.n,
+                'heavy_hitters': self.capacity, 'table': _encode(self.table),
+                'candidates': [[value, count] for value, count in self.candidates.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        import numpy as np
+
+        sketch = cls(data['width'], data['depth'], data['heavy_hitters'])
+        sketch.n = data['n']
+        sketch.table = _decode(data['table'], np.int64, (data['depth'], data['width']))
+        sketch.candidates = {value: count for value, count in data['candidates']}
+        return sketch
+
+
+SKETCH_CLASSES = {'hll': HyperLogLog, 'kll': KLLSketch, 'countmin': CountMinSketch}
+
+
+def sketch_from_dict(data):
+    """Reconstrói um sketch serializado com to_dict (JSON dos resultados ou de outro processo)"""
+    if data.get('type') not in SKETCH_CLASSES:
+        raise ValueError(f"Tipo de sketch desconhecido: {data.get('type')}")
+    return SKETCH_CLASSES[data['type']].from_dict(data)
+
+
+def sketch_chunk(values, hll_precision=12, kll_k=200, countmin_width=2048, countmin_depth=4, seed=None):
+    """
+    Sketches serializados de um chunk: função de módulo para rodar em
+    workers de processo e combinar no pai com merge_sketches
+    """
+    return {
+        'hll': HyperLogLog(hll_precision).update(values).to_dict(),
+        'kll': KLLSketch(kll_k, seed=seed).update(values).to_dict(),
+        'countmin': CountMinSketch(countmin_width, countmin_depth).update(values).to_dict()
+    }
+
+
+def merge_sketches(serialized):
+    """Combina uma lista de saídas de sketch_chunk em {tipo: sketch}"""
+    merged = {}
+    for chunk in serialized:
+        for kind, data in chunk.items():
+            sketch = sketch_from_dict(data)
+            merged[kind] = merged[kind].merge(sketch) if kind in merged else sketch
+    return merged
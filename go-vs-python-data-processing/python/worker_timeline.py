@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+
+# Relógio monotônico do sistema: comparável entre processos no mesmo host
+_clock = time.monotonic_ns
+
+
+def run_timed(function, payload, chunk_id, submit_ns):
+    """
+    Executa function(payload) no worker e devolve (resultado, registro).
+    O registro tem o worker (pid + thread), quando a tarefa foi submetida,
+    começou e terminou, e o tempo de CPU da thread durante a execução.
+    Precisa ser função de módulo para funcionar com ProcessPoolExecutor.
+    """
+    start_ns = _clock()
+    cpu_start = time.thread_time_ns()
+    result = function(payload)
+    cpu_ns = time.thread_time_ns() - cpu_start
+    end_ns = _clock()
+    thread = threading.current_thread()
+    return result, {
+        'chunk_id': chunk_id,
+        'pid': os.getpid(),
+        'thread_id': threading.get_ident(),
+        'worker': f"{os.getpid()}:{thread.name}",
+        'submit_ns': submit_ns,
+        'start_ns': start_ns,
+        'end_ns': end_ns,
+        'queue_ns': start_ns - submit_ns,
+        'cpu_ns': cpu_ns
+    }
+
+
+def map_timed(executor, function, payloads):
+    """
+    executor.map com timeline: submete tudo, espera e retorna
+    (resultados na ordem dos payloads, registros, início, fim).
+    executor=None executa sequencialmente na thread atual.
+    """
+    wall_start = _clock()
+    if executor is None:
+        outputs = [run_timed(function, payload, i, _clock()) for i, payload in enumerate(payloads)]
+    else:
+        futures = [executor.submit(run_timed, function, payload, i, _clock())
+                   for i, payload in enumerate(payloads)]
+        outputs = [future.result() for future in futures]
+    wall_end = _clock()
+    results = [result for result, _ in outputs]
+    records = [record for _, record in outputs]
+    return results, records, wall_start, wall_end
+
+
+def summarize(records, wall_start, wall_end):
+    """
+    Utilização por worker dentro da janela [wall_start, wall_end]:
+    busy = soma das execuções, idle = janela - busy,
+    cpu_ratio = CPU / busy (bem abaixo de 1 em threads CPU-bound indica
+    espera pela GIL: a thread estava "executando" sem usar CPU).
+    """
+    wall_ns = max(wall_end - wall_start, 1)
+    workers = {}
+    for record in records:
+        entry = workers.setdefault(record['worker'], {'tasks': 0, 'busy_ns': 0, 'cpu_ns': 0,
+                                                      'queue_ns': 0})
+        entry['tasks'] += 1
+        entry['busy_ns'] += record['end_ns'] - record['start_ns']
+        entry['cpu_ns'] += record['cpu_ns']
+        entry['queue_ns'] += record['queue_ns']
+
+    summary = {}
+    for worker, entry in sorted(workers.items()):
+        summary[worker] = {
+            'tasks': entry['tasks'],
+            'busy_time': entry['busy_ns'] / 1e9,
+            'cpu_time': entry['cpu_ns'] / 1e9,
+            'idle_time': (wall_ns - entry['busy_ns']) / 1e9,
+            'utilization': entry['busy_ns'] / wall_ns,
+            'cpu_ratio': entry['cpu_ns'] / entry['busy_ns'] if entry['busy_ns'] else 0.0,
+            'mean_queue_time': entry['queue_ns'] / entry['tasks'] / 1e9
+        }
+    return summary
+
+
+def print_summary(label, summary):
+    """Tabela de utilização por worker"""
+    print(f"   👷 Workers ({label}):")
+    for worker, entry in summary.items():
+        print(f"      {worker:<28} {entry['tasks']:>3} tarefas | ocupado {entry['utilization']:6.1%} | "
+              f"CPU/ocupado {entry['cpu_ratio']:6.1%} | fila média {entry['mean_queue_time']*1000:8.2f} ms")
+
+
+def chrome_events(label, records, origin_ns):
+    """
+    Eventos do Trace Event Format para uma execução: um evento por chunk
+    na linha do worker e, antes dele, o tempo que o chunk passou na fila.
+    """
+    events = []
+    threads = {}
+    for record in records:
+        tid = record['thread_id']
+        threads[(record['pid'], tid)] = record['worker']
+        args = {'chunk_id': record['chunk_id'], 'queue_ms': record['queue_ns'] / 1e6,
+                'cpu_ms': record['cpu_ns'] / 1e6,
+                'wall_ms': (record['end_ns'] - record['start_ns']) / 1e6}
+        if record['queue_ns'] > 0:
+            events.append({'name': f"fila chunk {record['chunk_id']}", 'cat': f"{label},queue",
+                           'ph': 'X', 'ts': (record['submit_ns'] - origin_ns) / 1000,
+                           'dur': record['queue_ns'] / 1000, 'pid': record['pid'], 'tid': tid,
+                           'args': args})
+        events.append({'name': f"{label} chunk {record['chunk_id']}", 'cat': label, 'ph': 'X',
+                       'ts': (record['start_ns'] - origin_ns) / 1000,
+                       'dur': (record['end_ns'] - record['start_ns']) / 1000,
+                       'pid': record['pid'], 'tid': tid, 'args': args})
+    for (pid, tid), worker in threads.items():
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                       'args': {'name': worker}})
+    return events
+
+
+def write_timeline(filepath, runs):
+    """
+    Grava várias execuções [(rótulo, registros), ...] em um único arquivo
+    para chrome://tracing ou ui.perfetto.dev, com tempo relativo ao
+    primeiro evento.
+    """
+    origin_ns = min((record['submit_ns'] for _, records in runs for record in records), default=0)
+    events = []
+    for label, records in runs:
+        events.extend(chrome_events(label, records, origin_ns))
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return filepath
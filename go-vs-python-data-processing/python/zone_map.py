@@ -0,0 +1,389 @@
+import io
+import json
+import os
+import time
+
+from row_index import BUILD_BLOCK_BYTES, RowIndexBuilder
+from scan import OPERATORS, predicate_mask
+
+# Linhas por bloco do zone map
+ZONE_BLOCK_ROWS = 8192
+
+# Estatísticas guardadas por bloco e coluna numérica
+ZONE_STATS = ('min', 'max', 'count', 'sum')
+
+# Classificação de um bloco frente aos predicados
+SKIP, PARTIAL, FULL = 'skip', 'partial', 'full'
+
+
+def zone_map_path_for(filepath):
+    """Caminho do zone map persistido ao lado do CSV"""
+    return f"{filepath}.zonemap.json"
+
+
+def _file_version(filepath):
+    stat = os.stat(filepath)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _scalar(value):
+    """Escalar numpy -> Python (JSON); NaN vira None"""
+    value = value.item() if hasattr(value, 'item') else value
+    return None if value != value else value
+
+
+def _merge_stats(left, right):
+    """Combina (min, max, count, sum) de duas partes de um bloco"""
+    lows = [value for value in (left[0], right[0]) if value is not None]
+    highs = [value for value in (left[1], right[1]) if value is not None]
+    return (min(lows) if lows else None, max(highs) if highs else None,
+            left[2] + right[2], left[3] + right[3])
+
+
+def _classify(predicate, rows, stats):
+    """
+    SKIP se nenhuma linha do bloco pode satisfazer o predicado, FULL se
+    todas satisfazem (sem nulos na coluna), PARTIAL caso contrário.
+    stats: (min, max, count, sum) da coluna no bloco, ou None sem estatística.
+    """
+    if stats is None:
+        return PARTIAL
+    low, high, count, _ = stats
+    _, op, value = predicate
+    complete = count == rows
+    if count == 0:
+        # Só nulos: falham em tudo, menos em != (NaN != v no pandas)
+        return PARTIAL if op == '!=' else SKIP
+
+    if op == 'between':
+        if high < value[0] or low > value[1]:
+            return SKIP
+        return FULL if complete and value[0] <= low and high <= value[1] else PARTIAL
+    if op == 'in':
+        inside = [option for option in value if low <= option <= high]
+        if not inside:
+            return SKIP
+        return FULL if complete and low == high else PARTIAL
+    if op == '!=':
+        if complete and low == high == value:
+            return SKIP
+        return FULL if complete and (value < low or value > high) else PARTIAL
+    if op == '==':
+        if value < low or value > high:
+            return SKIP
+        return FULL if complete and low == high else PARTIAL
+
+    # Comparações: o bloco inteiro passa se o pior caso passa, nenhum se o melhor falha
+    compare = OPERATORS[op]
+    worst, best = (low, high) if op in ('>', '>=') else (high, low)
+    if not compare(best, value):
+        return SKIP
+    return FULL if complete and compare(worst, value) else PARTIAL
+
+
+class ZoneMap:
+    """
+    Estatísticas por bloco (min, max, count, sum) das colunas numéricas de
+    um CSV, persistidas em JSON ao lado do arquivo (<csv>.zonemap.json),
+    junto com o offset em bytes de cada bloco de block_rows linhas.
+
+    Um filtro classifica cada bloco pelos min/max: blocos que não podem
+    ter linhas aprovadas são pulados sem leitura; em agregados, blocos em
+    que todas as linhas passam são respondidos só com os metadados. Apenas
+    os blocos parciais são lidos (com seek) e filtrados linha a linha.
+
+    Como o RowIndex, vale para uma versão (tamanho + mtime) do arquivo.
+    Ganha quando a coluna filtrada tem localidade (ex.: id ordenado); em
+    colunas aleatórias todo bloco cobre quase toda a faixa de valores.
+    """
+
+    def __init__(self, filepath, data):
+        self.filepath = filepath
+        self.path = zone_map_path_for(filepath)
+        self.header = data['header']
+        self.block_rows = data['block_rows']
+        self.offsets = data['offsets']
+        self.data_end = data['data_end']
+        self.rows = data['rows']
+        self.block_sizes = data['block_sizes']
+        self.stats = data['stats']
+        self.version = (data['size'], data['mtime_ns'])
+        self._data = data
+
+    # --- construção e persistência ---
+
+    @classmethod
+    def build(cls, filepath, block_rows=ZONE_BLOCK_ROWS, block_bytes=BUILD_BLOCK_BYTES):
+        """
+        Constrói o zone map em uma passada: cada bloco de bytes com linhas
+        completas alimenta os offsets (RowIndexBuilder com stride=block_rows)
+        e é convertido com pandas para as estatísticas, agrupando as linhas
+        por número de bloco (um bloco pode atravessar dois blocos de bytes).
+        """
+        import numpy as np
+        import pandas as pd
+
+        version = _file_version(filepath)
+        stats = None
+        rows = 0
+
+        def add_block(data):
+            nonlocal stats, rows
+            df = pd.read_csv(io.BytesIO(data), header=None, names=header)
+            if stats is None:
+                stats = {column: {stat: [] for stat in ZONE_STATS} for column in header
+                         if df[column].dtype.kind in 'iuf'}
+            for column in [c for c in stats if df[c].dtype.kind not in 'iuf']:
+                # Coluna deixou de ser numérica em algum trecho: sem zone map para ela
+                del stats[column]
+
+            blocks = np.arange(rows, rows + len(df)) // block_rows
+            grouped = df[list(stats)].groupby(blocks).agg(list(ZONE_STATS))
+            for column, column_stats in stats.items():
+                per_stat = [[_scalar(value) for value in grouped[(column, stat)].to_numpy()]
+                            for stat in ZONE_STATS]
+                for block, values in zip(grouped.index, zip(*per_stat)):
+                    if block < len(column_stats['count']):
+                        # Continuação do último bloco do trecho anterior
+                        values = _merge_stats([column_stats[stat][block] for stat in ZONE_STATS], values)
+                        for stat, value in zip(ZONE_STATS, values):
+                            column_stats[stat][block] = value
+                    else:
+                        for stat, value in zip(ZONE_STATS, values):
+                            column_stats[stat].append(value)
+            rows += len(df)
+
+        with open(filepath, 'rb') as f:
+            header_line = f.readline()
+            header = header_line.decode('utf-8').rstrip('\r\n').split(',')
+            offsets = RowIndexBuilder(header, len(header_line), stride=block_rows, key_column=None)
+            pending = b''
+            while True:
+                block = f.read(block_bytes)
+                if not block:
+                    break
+                data = pending + block
+                end = data.rfind(b'\n') + 1
+                pending = data[end:]
+                if end:
+                    offsets.feed(data[:end])
+                    add_block(data[:end])
+        if pending:
+            offsets.feed(pending + b'\n')
+            offsets.end -= 1
+            add_block(pending + b'\n')
+
+        blocks = len(offsets.offsets)
+        return cls(filepath, {
+            'filepath': os.path.abspath(filepath),
+            'header': header,
+            'block_rows': block_rows,
+            'offsets': offsets.offsets,
+            'data_end': offsets.end,
+            'rows': rows,
+            'block_sizes': [min(block_rows, rows - block * block_rows) for block in range(blocks)],
+            'stats': stats or {},
+            'size': version[0],
+            'mtime_ns': version[1],
+            'built_at': time.time()
+        })
+
+    @classmethod
+    def load(cls, filepath):
+        """Zone map salvo do arquivo, ou None se não existe ou está desatualizado"""
+        path = zone_map_path_for(filepath)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('filepath') != os.path.abspath(filepath):
+            return None
+        zone_map = cls(filepath, data)
+        return None if zone_map.is_stale() else zone_map
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f)
+        os.replace(temp_path, self.path)
+        return self.path
+
+    def is_stale(self):
+        """O CSV mudou (tamanho ou mtime) desde a construção"""
+        try:
+            return _file_version(self.filepath) != self.version
+        except OSError:
+            return True
+
+    # --- consultas ---
+
+    def block_stats(self, column, block):
+        """(min, max, count, sum) da coluna no bloco, ou None se não há estatística"""
+        column_stats = self.stats.get(column)
+        if column_stats is None:
+            return None
+        return tuple(column_stats[stat][block] for stat in ZONE_STATS)
+
+    def classify(self, predicates):
+        """Classificação (SKIP/PARTIAL/FULL) de cada bloco para os predicados (AND)"""
+        for column, op, _ in predicates:
+            if column not in self.header:
+                raise ValueError(f"Coluna '{column}' não existe no CSV")
+            if op not in OPERATORS:
+                raise ValueError(f"Operador desconhecido: {op}")
+        classes = []
+        for block, rows in enumerate(self.block_sizes):
+            kinds = {_classify(predicate, rows, self.block_stats(predicate[0], block)) for predicate in predicates}
+            classes.append(SKIP if SKIP in kinds else PARTIAL if PARTIAL in kinds else FULL)
+        return classes
+
+    def _read_blocks(self, blocks, columns):
+        """
+        DataFrame das linhas dos blocos pedidos: blocos consecutivos viram
+        uma leitura contígua e tudo é convertido em um único read_csv
+        """
+        import pandas as pd
+
+        parts = []
+        with open(self.filepath, 'rb') as f:
+            position = 0
+            while position < len(blocks):
+                first = last = blocks[position]
+                while position + 1 < len(blocks) and blocks[position + 1] == last + 1:
+                    position += 1
+                    last = blocks[position]
+                position += 1
+                begin = self.offsets[first]
+                end = self.offsets[last + 1] if last + 1 < len(self.offsets) else self.data_end
+                f.seek(begin)
+                data = f.read(end - begin)
+                parts.append(data if data.endswith(b'\n') else data + b'\n')
+        data = b''.join(parts)
+        if not data:
+            return self._empty_frame(columns), 0
+        df = pd.read_csv(io.BytesIO(data), header=None, names=self.header, usecols=columns)
+        return df, len(data)
+
+    def _empty_frame(self, columns):
+        """
+        DataFrame vazio com os dtypes do CSV (parse da primeira linha de
+        dados), em vez de colunas object, quando todos os blocos são pulados
+        """
+        import pandas as pd
+
+        data = b''
+        if self.offsets:
+            with open(self.filepath, 'rb') as f:
+                f.seek(self.offsets[0])
+                data = f.readline()
+        if not data.strip():
+            return pd.DataFrame({column: [] for column in columns})
+        df = pd.read_csv(io.BytesIO(data if data.endswith(b'\n') else data + b'\n'), header=None,
+                         names=self.header, usecols=columns)
+        return df.iloc[0:0]
+
+    def _plan_stats(self, classes):
+        return {
+            'blocks': len(classes),
+            'blocks_skipped': classes.count(SKIP),
+            'blocks_full': classes.count(FULL),
+            'blocks_partial': classes.count(PARTIAL)
+        }
+
+    def filter(self, predicates, columns=None):
+        """
+        Linhas que satisfazem os predicados (lista de (coluna, operador,
+        valor) como em scan.scan_csv), lendo só os blocos não pulados.
+        Retorna (DataFrame, estatísticas da execução).
+        """
+        start_time = time.perf_counter()
+        classes = self.classify(predicates)
+        projection = list(columns) if columns is not None else list(self.header)
+        needed = list(dict.fromkeys(projection + [column for column, _, _ in predicates]))
+
+        blocks = [block for block, kind in enumerate(classes) if kind != SKIP]
+        df, bytes_read = self._read_blocks(blocks, needed)
+        df = df.loc[predicate_mask(df, predicates), projection].reset_index(drop=True)
+
+        stats = self._plan_stats(classes)
+        stats.update({
+            'rows_scanned': sum(self.block_sizes[block] for block in blocks),
+            'rows_matched': len(df),
+            'bytes_read': bytes_read,
+            'execution_time': time.perf_counter() - start_time
+        })
+        return df, stats
+
+    def aggregate(self, column, predicates=()):
+        """
+        count, sum, min, max e mean de column nas linhas que satisfazem os
+        predicados. Blocos FULL entram pelos metadados, blocos PARTIAL são
+        lidos e filtrados, blocos SKIP são ignorados.
+        Retorna (agregados, estatísticas da execução).
+        """
+        import math
+
+        start_time = time.perf_counter()
+        if column not in self.stats:
+            raise ValueError(f"Coluna '{column}' sem estatísticas no zone map (não numérica)")
+        classes = self.classify(predicates)
+
+        count, total, low, high = 0, 0, None, None
+        for block, kind in enumerate(classes):
+            if kind == FULL:
+                block_low, block_high, block_count, block_sum = self.block_stats(column, block)
+                if block_count:
+                    count += block_count
+                    total += block_sum
+                    low = block_low if low is None else min(low, block_low)
+                    high = block_high if high is None else max(high, block_high)
+
+        partial = [block for block, kind in enumerate(classes) if kind == PARTIAL]
+        needed = list(dict.fromkeys([column] + [name for name, _, _ in predicates]))
+        df, bytes_read = self._read_blocks(partial, needed)
+        values = df.loc[predicate_mask(df, predicates), column].dropna()
+        if len(values):
+            count += len(values)
+            total += _scalar(values.sum())
+            low = _scalar(values.min()) if low is None else min(low, _scalar(values.min()))
+            high = _scalar(values.max()) if high is None else max(high, _scalar(values.max()))
+
+        stats = self._plan_stats(classes)
+        stats.update({
+            'rows_scanned': sum(self.block_sizes[block] for block in partial),
+            'bytes_read': bytes_read,
+            'execution_time': time.perf_counter() - start_time
+        })
+        result = {'count': count, 'sum': total, 'min': low, 'max': high,
+                  'mean': total / count if count else math.nan}
+        return result, stats
+
+    def describe(self):
+        """Resumo para o relatório"""
+        return {
+            'rows': self.rows,
+            'block_rows': self.block_rows,
+            'blocks': len(self.offsets),
+            'columns': list(self.stats),
+            'zone_map_bytes': os.path.getsize(self.path) if os.path.exists(self.path) else None
+        }
+
+
+def open_zone_map(filepath, block_rows=ZONE_BLOCK_ROWS):
+    """
+    Zone map salvo do CSV ou, se ausente/desatualizado (ou com outro
+    block_rows), construído agora e salvo. Retorna (zone map, True se foi construído).
+    """
+    zone_map = ZoneMap.load(filepath)
+    if zone_map is not None and zone_map.block_rows == block_rows:
+        return zone_map, False
+    zone_map = ZoneMap.build(filepath, block_rows)
+    zone_map.save()
+    return zone_map, True
+
+
+def discard_zone_map(filepath):
+    """Apaga o zone map salvo do CSV, se existir"""
+    path = zone_map_path_for(filepath)
+    if os.path.exists(path):
+        os.remove(path)